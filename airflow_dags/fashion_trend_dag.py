@@ -8,14 +8,15 @@ from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
+import asyncio
 import sys
 import os
 
 # 프로젝트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from langgraph_agents.workflow import FashionWorkflow
-from langgraph_agents.state import FashionState
+from langgraph_agents.batch import BatchRunner
+from langgraph_agents.sentiment_aggregator import SentimentAggregator
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -53,32 +54,24 @@ def collect_trend_data(**context):
             "Y2K 패션", "레트로", "빈티지", "지속가능 패션"
         ]
         
-        # 워크플로우 실행
-        workflow = FashionWorkflow()
-        initial_state = FashionState(
-            session_id=f"airflow_trend_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            user_request="일일 패션 트렌드 데이터 수집 및 분석",
-            keywords=trend_keywords,
-            collected_data={},
-            analysis_results={},
-            generated_content={},
-            feedback_history=[],
-            token_usage={"total_tokens": 0, "cost": 0.0},
-            human_feedback_required=False,
-            feedback_count=0
-        )
-        
-        # 비동기 실행을 동기로 래핑
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(workflow.run_async(initial_state))
-        
-        logger.info(f"트렌드 수집 완료: {len(result.get('collected_data', {}))}개 데이터")
-        
-        # 결과를 XCom에 저장
-        context['task_instance'].xcom_push(key='trend_data', value=result)
+        # 키워드별 요청을 배치로 동시 실행 (동시성/타임아웃은 settings 기준)
+        # 실행일 기준 고정 session_id를 사용하므로 태스크 재시도 시 완료된 단계는 체크포인트에서 복원
+        requests = [
+            {
+                "user_request": f"{keyword} 트렌드 분석",
+                "target_category": keyword,
+                "session_id": f"trend_{context['ds_nodash']}_{index:02d}"
+            }
+            for index, keyword in enumerate(trend_keywords)
+        ]
+        output_path = f"/tmp/fashion_ai_trends_{context['ds_nodash']}.jsonl"
+        
+        summary = asyncio.run(BatchRunner().run(requests, output_path))
+        
+        logger.info(f"트렌드 수집 완료: {summary['succeeded'] + summary['partial']}/{summary['total']}개 세션")
+        
+        # 전체 상태 대신 결과 파일 경로와 요약을 XCom에 저장
+        context['task_instance'].xcom_push(key='trend_data', value=summary)
         
         return "트렌드 데이터 수집 성공"
         
@@ -87,7 +80,7 @@ def collect_trend_data(**context):
         raise
 
 def analyze_sentiment(**context):
-    """감성 분석 함수"""
+    """감성 분석 함수 (세션별 채점 결과는 감성 분석 노드가 시간 구간 집계에 누적하므로 이력을 다시 계산하지 않고 조회)"""
     try:
         logger.info("감성 분석 시작")
         
@@ -98,8 +91,17 @@ def analyze_sentiment(**context):
             logger.warning("분석할 데이터가 없습니다.")
             return "감성 분석 스킵"
         
-        # 감성 분석 수행 (실제 구현에서는 워크플로우 호출)
-        logger.info("감성 분석 완료")
+        # 최근 1일/7일 이동 창 집계 조회
+        aggregator = SentimentAggregator()
+        sentiment_summary = {
+            "daily_categories": aggregator.ranking("category", "day", 1),
+            "weekly_categories": aggregator.ranking("category", "day", 7),
+            "weekly_keywords": aggregator.ranking("keyword", "day", 7, limit=20),
+            "weekly_brands": aggregator.ranking("brand", "day", 7, limit=20)
+        }
+        
+        context['task_instance'].xcom_push(key='sentiment_summary', value=sentiment_summary)
+        logger.info(f"감성 분석 완료: 최근 7일 카테고리 {len(sentiment_summary['weekly_categories'])}개")
         
         return "감성 분석 성공"
         
@@ -2,8 +2,12 @@
 Global settings configuration for Fashion AI Automation System
 """
 
+import hashlib
 import os
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import yaml
 import streamlit as st
 
 try:
@@ -21,6 +25,70 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4-1106-preview"
     openai_temperature: float = 0.7
     max_tokens: int = 4000
+    max_prompt_tokens: int = 16000  # 요청당 입력 토큰 상한 (초과 시 사용자 프롬프트 가운데를 생략)
+    prompt_data_tokens: int = 3000  # 분석 프롬프트에 넣는 수집 데이터 토큰 상한 (템플릿 제외)
+    
+    # LLM 게이트웨이 설정 (모든 LLM 호출 공통)
+    llm_max_concurrency: int = 16  # 전체 동시 요청 수
+    llm_model_concurrency: int = 8  # 모델별 동시 요청 수
+    llm_tokens_per_minute: int = 200000  # 모델별 분당 토큰 한도 (공급자 할당량에 맞게 조정, 0이면 제한 없음)
+    llm_max_retries: int = 4  # 429/5xx 재시도 횟수
+    llm_retry_backoff: float = 1.0  # 첫 재시도 대기 시간 (초, 이후 2배씩 증가)
+    llm_request_timeout: float = 120.0  # 요청 타임아웃 (초)
+    
+    # 모델 라우팅 설정 (작업별 모델 등급, 등급 설정에서 생략한 값은 위의 기본값 사용)
+    llm_model_tiers: Dict[str, Dict[str, Any]] = {
+        "premium": {},  # openai_model
+        "standard": {"model": "gpt-4o", "temperature": 0.7, "max_tokens": 2000, "cost_per_1k_input": 0.0025, "cost_per_1k_output": 0.01},
+        "fast": {"model": "gpt-4o-mini", "temperature": 0.3, "max_tokens": 1000, "cost_per_1k_input": 0.00015, "cost_per_1k_output": 0.0006},
+    }
+    llm_task_tiers: Dict[str, str] = {
+        "trend_analysis": "premium",
+        "content_generation": "premium",
+        "human_feedback": "standard",
+        "sentiment_analysis": "fast",
+        "mcp:trend_analyzer": "standard",
+        "mcp:content_generator": "standard",
+        "mcp:sentiment_analyzer": "fast",
+    }
+    llm_tier_fallbacks: Dict[str, str] = {"premium": "standard", "standard": "fast"}
+    llm_routing_fallback_enabled: bool = True
+    llm_fallback_min_seconds: float = 20.0  # 세션 마감까지 남은 시간이 이보다 적으면 대체 등급 사용
+    
+    # LLM 비용 예산 설정 (호출 전 검사, 한도가 0이면 해당 예산 미적용)
+    budget_enabled: bool = True
+    budget_db_path: str = "data/llm_budget.sqlite"
+    budget_session_usd: float = 1.0  # 세션당 예산
+    budget_user_daily_usd: float = 10.0  # 사용자별 일 예산
+    budget_interactive_daily_usd: float = 50.0  # 대화형(Streamlit) 풀 일 예산
+    budget_batch_daily_usd: float = 20.0  # 배치(Airflow/BatchRunner) 풀 일 예산
+    budget_batch_usd_per_minute: float = 1.0  # 배치 풀 분당 지출 한도 (초과 시 대기, 0이면 제한 없음)
+    budget_low_ratio: float = 0.2  # 남은 예산 비율이 이보다 낮으면 대체 등급 사용
+    budget_min_prompt_tokens: int = 1000  # 예산에 맞춘 프롬프트 축소 하한 (이보다 작아야 하면 호출 거부)
+    budget_reservation_ttl_seconds: float = 600.0  # 예상 비용 예약 만료 시간 (정산하지 못하고 종료된 워커의 예약 해제)
+    
+    # 헤지 요청 설정 (짧고 멱등인 작업은 관측 p95 안에 응답이 없으면 같은 요청을 한 번 더 보내 먼저 온 응답 사용)
+    llm_hedged_tasks: List[str] = ["sentiment_analysis"]
+    llm_hedge_quantile: float = 0.95  # 헤지 요청을 보내기 전 기다리는 응답 시간 분위수
+    llm_hedge_budget_ratio: float = 0.1  # 헤지 대상 호출 수 대비 추가 요청 수 상한
+    llm_hedge_min_samples: int = 20  # 분위수 계산에 필요한 (모델, 작업)별 최소 응답 시간 표본 수 (부족하면 헤지 안 함)
+    llm_hedge_window: int = 200  # (모델, 작업)별로 보관하는 최근 응답 시간 표본 수
+    
+    # LLM 응답 캐시 설정 (같은 모델/temperature/프롬프트 재호출 방지)
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "data/llm_cache.sqlite"
+    llm_cache_ttl: float = 86400.0  # 유효 시간 (초, 기본 24시간)
+    llm_cache_max_entries: int = 2000
+    
+    # 로컬 LLM 대체 서버 설정 (부하 테스트용, 활성화 시 모든 LLM 호출을 대체 서버로 보내고 응답 캐시 미사용)
+    llm_stub_enabled: bool = False
+    llm_stub_host: str = "127.0.0.1"
+    llm_stub_port: int = 8765
+    llm_stub_latency_ms: float = 800.0  # 첫 토큰까지 지연 중앙값 (밀리초)
+    llm_stub_latency_sigma: float = 0.5  # 지연 로그정규 분포 sigma (꼬리 지연)
+    llm_stub_tokens_per_second: float = 50.0  # 출력 토큰 생성 속도 (0이면 지연 없음)
+    llm_stub_error_rate: float = 0.0  # 500 오류 비율
+    llm_stub_rate_limit_rate: float = 0.0  # 429 오류 비율
     
     # Naver API 설정
     naver_client_id: str = ""
@@ -36,6 +104,49 @@ class Settings(BaseSettings):
     app_env: str = "development"
     log_level: str = "INFO"
     
+    # 감성 분석 설정 (감성 사전으로 모든 텍스트를 먼저 채점하고 LLM 채점 대상은 묶음 단위로 동시 채점)
+    sentiment_scoring_mode: str = "hybrid"  # hybrid: 신뢰도가 낮은 텍스트만 LLM 채점, llm: 모든 텍스트 LLM 채점
+    sentiment_escalation_confidence: float = 0.5  # hybrid 모드에서 감성 사전 신뢰도가 이보다 낮으면 LLM 채점
+    sentiment_escalation_max_items: int = 60  # hybrid 모드의 세션당 LLM 채점 텍스트 수 상한 (0이면 감성 사전만 사용)
+    sentiment_batch_tokens: int = 1500  # LLM 채점 요청당 텍스트 토큰 합 상한
+    sentiment_batch_max_items: int = 40  # LLM 채점 요청당 텍스트 수 상한 (응답 배열 길이)
+    sentiment_batch_concurrency: int = 4  # 동시에 보내는 채점 요청 수 (게이트웨이 동시성/토큰 한도도 함께 적용)
+    sentiment_text_tokens: int = 200  # LLM 채점 텍스트별 최대 토큰 수
+    sentiment_cache_enabled: bool = True  # 텍스트별 채점 결과를 세션 간에 재사용
+    sentiment_cache_path: str = "data/sentiment_cache.sqlite"
+    sentiment_cache_ttl: float = 2592000.0  # 유효 시간 (초, 기본 30일)
+    sentiment_cache_max_entries: int = 200000
+    sentiment_aggregate_enabled: bool = True  # 확정된 채점 결과를 카테고리/브랜드/키워드별 시간 구간에 누적
+    sentiment_aggregate_path: str = "data/sentiment_aggregate.sqlite"
+    sentiment_aggregate_retention: Dict[str, int] = {"hour": 336, "day": 400, "week": 260}  # 시간 단위별 보관 구간 수
+    sentiment_aggregate_dedupe_seconds: float = 2592000.0  # 같은 텍스트를 다시 집계하지 않는 기간 (초, 기본 30일)
+    
+    # 배치 실행 설정
+    batch_concurrency: int = 8  # 동시에 실행할 세션 수
+    batch_session_timeout: float = 300.0  # 세션별 최대 실행 시간 (초)
+    
+    # 콘텐츠 생성 설정 (제품 기획서/마케팅 문구/콘텐츠 제안 동시 생성)
+    content_generation_concurrency: int = 3  # 동시에 생성할 콘텐츠 수
+    content_generation_timeout: float = 90.0  # 콘텐츠별 생성 타임아웃 (초)
+    
+    # 세션 마감 시간 설정 (초과 시 부분/샘플 결과를 degraded로 표시하여 반환)
+    interactive_deadline_seconds: float = 60.0  # Streamlit 대화형 실행
+    batch_deadline_ratio: float = 0.9  # 배치 세션 타임아웃 대비 마감 비율
+    
+    # 체크포인트 설정 (session_id 기준 단계별 재개)
+    checkpoint_enabled: bool = True
+    checkpoint_db_path: str = "data/checkpoints.sqlite"
+    
+    # 성능 계측 설정 (노드/도구별 레코드는 항상 상태의 metrics에 기록)
+    metrics_collector_enabled: bool = False  # 프로세스 전역 수집기 사용 여부
+    metrics_trace_memory: bool = False  # tracemalloc 기반 메모리 증감 측정 (오버헤드 있음)
+    
+    # 워크플로우 결과 캐시 설정 (동일 요청 재실행 방지)
+    result_cache_enabled: bool = True
+    result_cache_path: str = "data/result_cache.sqlite"
+    result_cache_ttl: float = 21600.0  # 유효 시간 (초, 기본 6시간)
+    result_cache_max_entries: int = 500
+    
     # 토큰 추적 설정
     token_tracking_enabled: bool = True
     token_cost_per_1k_input: float = 0.01  # GPT-4 가격
@@ -64,4 +175,23 @@ class Settings(BaseSettings):
 
 
 # 전역 설정 인스턴스
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+
+# 프롬프트 템플릿 경로 (실행 위치와 무관하게 config 디렉토리 기준)
+PROMPTS_PATH = Path(__file__).resolve().parent / "prompts.yaml"
+
+
+@lru_cache(maxsize=1)
+def load_prompts() -> Dict[str, Any]:
+    """프롬프트 템플릿을 한 번만 읽어 프로세스 전체에서 공유합니다"""
+    with open(PROMPTS_PATH, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {} 
+
+
+@lru_cache(maxsize=1)
+def get_prompts_version() -> str:
+    """프롬프트 템플릿 버전 (파일 내용 해시, 템플릿이 바뀌면 결과 캐시가 무효화됨)"""
+    try:
+        return hashlib.sha256(PROMPTS_PATH.read_bytes()).hexdigest()[:12]
+    except OSError:
+        return "default"
@@ -4,5 +4,7 @@ LangGraph Agents for Fashion AI Automation System
 
 from .workflow import FashionWorkflow
 from .state import FashionState
+from .registry import NodeRegistry, get_registry
+from .checkpoint import CheckpointStore
 
-__all__ = ["FashionWorkflow", "FashionState"] 
\ No newline at end of file
+__all__ = ["FashionWorkflow", "FashionState", "NodeRegistry", "get_registry", "CheckpointStore"] 
\ No newline at end of file
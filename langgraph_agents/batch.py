@@ -0,0 +1,235 @@
+"""
+Fashion AI Automation System - Batch Workflow Runner
+
+JSONL 파일의 요청들(create_initial_state 파라미터)을 제한된 동시성으로
+FashionWorkflow에 실행하고, 완료되는 순서대로 결과를 JSONL로 기록합니다.
+요청에 "use_cache": false를 지정하면 결과 캐시를 우회합니다.
+세션 마감 시간(deadline_seconds, 기본값은 타임아웃의 90%)을 넘기면
+노드들이 부분 결과를 반환하며, 해당 세션은 "partial"로 기록됩니다.
+LLM 비용은 대화형 사용자와 분리된 배치 예산 풀로 집계됩니다.
+
+사용 예:
+    python -m langgraph_agents.batch requests.jsonl results.jsonl --concurrency 8 --timeout 300
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Any, Optional, Callable, TextIO
+
+from langgraph.graph import END
+
+from config.settings import settings
+from utils.logger import setup_logger
+from tools.llm_budget import BATCH_POOL
+from .state import create_initial_state
+from .workflow import FashionWorkflow
+
+
+logger = setup_logger(__name__)
+
+# create_initial_state에 전달 가능한 요청 파라미터
+REQUEST_FIELDS = (
+    "user_request", "target_category", "target_demographics", "analysis_period", "session_id", "deadline_seconds",
+    "user_id"
+)
+
+
+def load_batch_requests(input_path: str) -> List[Dict[str, Any]]:
+    """JSONL 파일에서 요청 목록 로드 (빈 줄은 무시)"""
+    
+    requests = []
+    
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            
+            try:
+                requests.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{input_path}:{line_number} JSON 파싱 오류: {str(e)}")
+    
+    return requests
+
+
+class BatchRunner:
+    """여러 요청을 제한된 동시성으로 실행하는 배치 실행기"""
+    
+    def __init__(
+        self,
+        workflow: Optional[FashionWorkflow] = None,
+        concurrency: Optional[int] = None,
+        session_timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        update_callback: Optional[Callable[[int, str, Dict[str, Any]], None]] = None
+    ):
+        self.workflow = workflow or FashionWorkflow()
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+        self.session_timeout = session_timeout or settings.batch_session_timeout
+        self.progress_callback = progress_callback
+        self.update_callback = update_callback
+    
+    async def run(self, requests: List[Dict[str, Any]], output_path: Optional[str] = None) -> Dict[str, Any]:
+        """요청 목록 실행 후 요약 반환 (output_path가 있으면 완료 즉시 기록)"""
+        
+        started_at = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        progress = {
+            "total": len(requests),
+            "completed": 0,
+            "succeeded": 0,
+            "partial": 0,
+            "failed": 0,
+            "timed_out": 0
+        }
+        
+        output_file = open(output_path, "w", encoding="utf-8") if output_path else None
+        
+        try:
+            tasks = [
+                asyncio.create_task(self._run_one(index, params, semaphore))
+                for index, params in enumerate(requests)
+            ]
+            
+            # 완료되는 순서대로 결과 기록 및 진행률 보고
+            for task in asyncio.as_completed(tasks):
+                record = await task
+                self._update_progress(progress, record, started_at)
+                
+                if output_file:
+                    self._write_record(output_file, record)
+        
+        finally:
+            if output_file:
+                output_file.close()
+        
+        progress["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+        progress["output_path"] = output_path
+        
+        logger.info(
+            f"배치 실행 완료: {progress['completed']}/{progress['total']}건 "
+            f"({progress['elapsed_seconds']}초)"
+        )
+        
+        return progress
+    
+    async def _run_one(self, index: int, params: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """세션 하나를 동시성 제한과 타임아웃 하에서 실행"""
+        
+        async with semaphore:
+            started_at = time.monotonic()
+            record = {"index": index, "request": params}
+            
+            try:
+                request_params = {key: params[key] for key in REQUEST_FIELDS if key in params}
+                # 강제 타임아웃 전에 부분 결과를 반환하도록 세션 마감 시간 설정
+                request_params.setdefault("deadline_seconds", self.session_timeout * settings.batch_deadline_ratio)
+                # 배치 세션은 대화형 사용자와 분리된 배치 예산 풀 사용 (분당 지출 한도로 대기)
+                request_params["budget_pool"] = BATCH_POOL
+                initial_state = create_initial_state(**request_params)
+                record["session_id"] = initial_state["session_id"]
+                
+                final_state = await asyncio.wait_for(
+                    self._consume_stream(index, initial_state, params.get("use_cache", True)),
+                    timeout=self.session_timeout
+                )
+                
+                record["status"] = "partial" if final_state.get("errors") or final_state.get("degraded") else "success"
+                record["state"] = final_state
+            
+            except asyncio.TimeoutError:
+                record["status"] = "timeout"
+                record["error"] = f"세션 실행 시간 초과 ({self.session_timeout}초)"
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+            
+            record["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+            return record
+    
+    async def _consume_stream(self, index: int, initial_state: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """워크플로우 스트림을 순회하며 노드별 결과를 콜백으로 전달하고 최종 상태 반환"""
+        
+        if not self.update_callback:
+            return await self.workflow.run(initial_state, use_cache=use_cache)
+        
+        final_state = initial_state
+        
+        async for node_name, payload in self.workflow.astream(initial_state, use_cache=use_cache):
+            if node_name == END:
+                final_state = payload
+                continue
+            
+            try:
+                self.update_callback(index, node_name, payload)
+            except Exception as e:
+                logger.warning(f"노드 결과 콜백 오류: {e}")
+        
+        return final_state
+    
+    def _update_progress(self, progress: Dict[str, Any], record: Dict[str, Any], started_at: float):
+        """진행 상황 갱신 및 보고"""
+        
+        status_keys = {
+            "success": "succeeded",
+            "partial": "partial",
+            "failed": "failed",
+            "timeout": "timed_out"
+        }
+        
+        progress["completed"] += 1
+        progress[status_keys[record["status"]]] += 1
+        
+        logger.info(
+            f"배치 진행률 {progress['completed']}/{progress['total']} "
+            f"(성공 {progress['succeeded']}, 부분 {progress['partial']}, "
+            f"실패 {progress['failed']}, 시간초과 {progress['timed_out']}) "
+            f"- #{record['index']} {record['status']} {record['elapsed_seconds']}초, "
+            f"경과 {time.monotonic() - started_at:.1f}초"
+        )
+        
+        if self.progress_callback:
+            try:
+                self.progress_callback(dict(progress))
+            except Exception as e:
+                logger.warning(f"진행률 콜백 오류: {e}")
+    
+    def _write_record(self, output_file: TextIO, record: Dict[str, Any]):
+        """결과 한 건을 JSONL로 즉시 기록"""
+        output_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        output_file.flush()
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: Optional[int] = None,
+    session_timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """JSONL 입력 파일의 요청들을 실행하고 결과를 JSONL 출력 파일에 기록"""
+    
+    requests = load_batch_requests(input_path)
+    runner = BatchRunner(concurrency=concurrency, session_timeout=session_timeout)
+    
+    return await runner.run(requests, output_path)
+
+
+def main():
+    """배치 실행 CLI"""
+    
+    parser = argparse.ArgumentParser(description="Fashion AI 워크플로우 배치 실행")
+    parser.add_argument("input_path", help="요청 JSONL 파일 (한 줄에 create_initial_state 파라미터 하나)")
+    parser.add_argument("output_path", help="결과 JSONL 파일")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 실행 세션 수")
+    parser.add_argument("--timeout", type=float, default=None, help="세션별 최대 실행 시간 (초)")
+    args = parser.parse_args()
+    
+    summary = asyncio.run(run_batch(args.input_path, args.output_path, args.concurrency, args.timeout))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
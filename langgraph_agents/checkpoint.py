@@ -0,0 +1,206 @@
+"""
+Fashion AI Automation System - Workflow Checkpoint Store
+
+session_id 기준으로 단계별 실행 결과(증분)를 로컬 SQLite에 저장합니다.
+같은 session_id로 다시 실행하면 완료된 단계는 저장된 결과로 복원되고
+실패했거나 실행되지 않은 단계부터 이어서 실행됩니다.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+from config.settings import settings
+from .state import FashionState
+
+
+# 분석 완료 시점까지의 단계 (콘텐츠 생성 분기 기준점)
+ANALYSIS_STEPS = ("data_collection", "trend_analysis", "sentiment_analysis")
+
+
+class CheckpointStore:
+    """세션별 단계 체크포인트 저장소 (SQLite)"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.checkpoint_db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._initialize()
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """요청마다 새 연결 사용 (스레드/이벤트 루프 간 공유하지 않음)"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _initialize(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    initial_state TEXT NOT NULL,
+                    parent_session_id TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    session_id TEXT NOT NULL,
+                    step TEXT NOT NULL,
+                    iteration INTEGER NOT NULL,
+                    delta TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (session_id, step, iteration)
+                )
+            """)
+    
+    def save_session(self, initial_state: FashionState, parent_session_id: Optional[str] = None) -> bool:
+        """세션 초기 상태 저장 (이미 있으면 기존 값 유지)"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?)",
+                    (
+                        initial_state["session_id"],
+                        json.dumps(initial_state, ensure_ascii=False, default=str),
+                        parent_session_id,
+                        datetime.now().isoformat()
+                    )
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"체크포인트 세션 저장 오류: {e}")
+            return False
+    
+    def load_session(self, session_id: str) -> Optional[FashionState]:
+        """세션 초기 상태 조회"""
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT initial_state FROM sessions WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except sqlite3.Error as e:
+            print(f"체크포인트 세션 조회 오류: {e}")
+            return None
+    
+    def save_step(self, session_id: str, step: str, iteration: int, delta: Dict[str, Any]) -> bool:
+        """단계 실행 결과(증분) 저장"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                    (
+                        session_id,
+                        step,
+                        iteration,
+                        json.dumps(delta, ensure_ascii=False, default=str),
+                        datetime.now().isoformat()
+                    )
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"체크포인트 저장 오류: {e}")
+            return False
+    
+    def load_step(self, session_id: str, step: str, iteration: int) -> Optional[Dict[str, Any]]:
+        """저장된 단계 결과 조회 (없으면 None)"""
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT delta FROM checkpoints WHERE session_id = ? AND step = ? AND iteration = ?",
+                    (session_id, step, iteration)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except sqlite3.Error as e:
+            print(f"체크포인트 조회 오류: {e}")
+            return None
+    
+    def list_steps(self, session_id: str) -> List[Dict[str, Any]]:
+        """세션의 완료된 단계 목록"""
+        try:
+            with self._lock, self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT step, iteration, created_at FROM checkpoints "
+                    "WHERE session_id = ? ORDER BY created_at",
+                    (session_id,)
+                ).fetchall()
+            return [
+                {"step": step, "iteration": iteration, "created_at": created_at}
+                for step, iteration, created_at in rows
+            ]
+        except sqlite3.Error as e:
+            print(f"체크포인트 목록 조회 오류: {e}")
+            return []
+    
+    def branch_session(
+        self,
+        source_session_id: str,
+        steps: Iterable[str] = ANALYSIS_STEPS,
+        new_session_id: Optional[str] = None,
+        overrides: Optional[Dict[str, Any]] = None
+    ) -> Optional[FashionState]:
+        """저장된 세션의 일부 단계를 복사하여 새 세션을 분기
+        
+        기본값은 분석 완료 시점(수집/트렌드/감성)까지 복사하므로
+        새 세션은 재수집/재분석 없이 콘텐츠 생성부터 실행됩니다.
+        """
+        source_state = self.load_session(source_session_id)
+        if source_state is None:
+            return None
+        
+        if not new_session_id:
+            new_session_id = f"{source_session_id}_branch_{uuid.uuid4().hex[:8]}"
+        
+        initial_state = {**source_state, **(overrides or {})}
+        initial_state["session_id"] = new_session_id
+        initial_state["timestamp"] = datetime.now().isoformat()
+        
+        steps = list(steps)
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                    (
+                        new_session_id,
+                        json.dumps(initial_state, ensure_ascii=False, default=str),
+                        source_session_id,
+                        datetime.now().isoformat()
+                    )
+                )
+                conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO checkpoints
+                    SELECT ?, step, iteration, delta, created_at FROM checkpoints
+                    WHERE session_id = ? AND iteration = 0
+                    AND step IN ({", ".join("?" for _ in steps)})
+                    """,
+                    (new_session_id, source_session_id, *steps)
+                )
+            return initial_state
+        except sqlite3.Error as e:
+            print(f"체크포인트 분기 오류: {e}")
+            return None
+    
+    def delete_session(self, session_id: str) -> bool:
+        """세션과 체크포인트 삭제"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            return True
+        except sqlite3.Error as e:
+            print(f"체크포인트 삭제 오류: {e}")
+            return False
@@ -2,41 +2,53 @@
 Fashion AI Automation System - Content Generation Node
 """
 
-import yaml
-from typing import Dict, List, Any
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..state import FashionState, update_state_step, add_error_to_state, update_token_usage
-from config.settings import settings
+from config.settings import settings, load_prompts
+from tools.llm_gateway import GatewayChatModel, served_model
+from tools.llm_router import get_routed_llm, model_pricing
+from tools.llm_cache import is_cached_response
+from utils.metrics import track, record_llm_call
+from utils.token_counter import count_tokens, count_message_tokens
+from utils.helpers import content_hash
+from utils.deadline import DeadlineExceeded, with_deadline, mark_degraded
+from utils.streaming import stream_kwargs
+
+
+# 콘텐츠 타입별 표시 이름
+CONTENT_LABELS = {
+    "product_proposal": "제품 기획서",
+    "marketing_copy": "마케팅 문구",
+    "content_suggestions": "콘텐츠 제안"
+}
 
 
 class ContentGenerationNode:
     """콘텐츠 생성을 담당하는 LangGraph 노드"""
     
-    def __init__(self):
+    def __init__(self, llm: Optional[GatewayChatModel] = None):
+        # 동시 생성 스레드의 토큰 사용량 누적 보호
+        self._usage_lock = threading.Lock()
+        
         try:
-            # OpenAI 설정
-            api_key = settings.openai_api_key
-            if not api_key:
-                try:
-                    import streamlit as st
-                    api_key = st.secrets.get("OPENAI_API_KEY", "")
-                except:
-                    pass
+            # 레지스트리에서 공유 LLM이 주입되지 않은 경우 라우팅 테이블의 등급으로 생성
+            if llm is None:
+                llm = get_routed_llm("content_generation")
             
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=settings.openai_temperature,
-                max_tokens=settings.max_tokens,
-                api_key=api_key
-            )
+            self.llm = llm
             
             # 프롬프트 템플릿 로드
             self.prompts = self._load_prompts()
-            
+        
         except Exception as e:
             print(f"ContentGenerationNode 초기화 오류: {str(e)}")
             self.llm = None
@@ -59,28 +71,41 @@ class ContentGenerationNode:
                 state = add_error_to_state(state, "콘텐츠 생성을 위한 분석 결과가 없습니다.")
                 return state
             
-            # 사용자 요청 분석
-            user_request = state["user_request"]
-            content_type = self._determine_content_type(user_request)
+            # 입력이 바뀌었거나 피드백으로 무효화된 콘텐츠만 서로 독립적으로 동시에 다시 생성
+            plan = self._plan_generation(state)
+            results = self._generate_concurrently(plan, state)
+            self._store_results(state, plan, results)
+            
+            state = update_state_step(state, "콘텐츠 생성 완료")
             
-            # 콘텐츠 생성
-            if "제품" in user_request or "기획" in user_request:
-                product_proposal = self._generate_product_proposal(state)
-                state["product_proposal"] = product_proposal
+        except Exception as e:
+            state = add_error_to_state(state, f"콘텐츠 생성 오류: {str(e)}")
+        
+        return state
+    
+    async def aexecute(self, state: FashionState) -> FashionState:
+        """콘텐츠 생성 노드 비동기 실행"""
+        
+        try:
+            state = update_state_step(state, "콘텐츠 생성 시작")
             
-            if "마케팅" in user_request or "문구" in user_request:
-                marketing_copy = self._generate_marketing_copy(state)
-                state["marketing_copy"] = marketing_copy
+            if not self.llm:
+                raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
             
-            if "콘텐츠" in user_request or "제안" in user_request:
-                content_suggestions = self._generate_content_suggestions(state)
-                state["content_suggestions"] = content_suggestions
+            if not state.get("trend_analysis") and not state.get("sentiment_analysis"):
+                state = add_error_to_state(state, "콘텐츠 생성을 위한 분석 결과가 없습니다.")
+                return state
             
-            # 기본적으로 모든 콘텐츠 생성 (사용자 요청이 명확하지 않은 경우)
-            if not state.get("product_proposal") and not state.get("marketing_copy") and not state.get("content_suggestions"):
-                state["product_proposal"] = self._generate_product_proposal(state)
-                state["marketing_copy"] = self._generate_marketing_copy(state)
-                state["content_suggestions"] = self._generate_content_suggestions(state)
+            plan = self._plan_generation(state)
+            semaphore = asyncio.Semaphore(settings.content_generation_concurrency)
+            results = await asyncio.gather(
+                *(
+                    self._agenerate_one(system_prompt, user_prompt, state, semaphore, content_type)
+                    for content_type, _, system_prompt, user_prompt in plan
+                ),
+                return_exceptions=True
+            )
+            self._store_results(state, plan, results)
             
             state = update_state_step(state, "콘텐츠 생성 완료")
             
@@ -89,11 +114,165 @@ class ContentGenerationNode:
         
         return state
     
+    def _generate_concurrently(self, plan: List[Tuple[str, str, str, str]], state: FashionState) -> List[Any]:
+        """계획된 콘텐츠를 스레드로 동시에 생성 (결과 또는 예외를 계획 순서대로 반환)"""
+        
+        if not plan:
+            return []
+        
+        workers = max(1, min(len(plan), settings.content_generation_concurrency))
+        timeout = settings.content_generation_timeout
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="content_generation")
+        started_at = time.monotonic()
+        results = []
+        
+        try:
+            # 마감 시간과 메트릭 수집 contextvar를 작업 스레드에도 전달
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._complete, system_prompt, user_prompt, state, content_type)
+                for content_type, _, system_prompt, user_prompt in plan
+            ]
+            
+            for index, future in enumerate(futures):
+                # 대기열에서 기다린 시간은 제외하도록 실행 순번 기준으로 콘텐츠별 제한 시간 계산
+                call_deadline = started_at + timeout * (index // workers + 1)
+                try:
+                    results.append(future.result(timeout=max(0.0, call_deadline - time.monotonic())))
+                except FutureTimeoutError:
+                    future.cancel()
+                    results.append(TimeoutError(f"응답 시간 초과 ({timeout:.0f}초)"))
+                except Exception as e:
+                    results.append(e)
+        finally:
+            # 시간 초과된 호출은 기다리지 않음 (게이트웨이 요청 타임아웃으로 정리됨)
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
+    
+    async def _agenerate_one(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        state: FashionState,
+        semaphore: asyncio.Semaphore,
+        content_type: Optional[str] = None
+    ) -> str:
+        """동시 실행 수와 콘텐츠별 타임아웃 하에서 콘텐츠 하나 생성"""
+        
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._acomplete(system_prompt, user_prompt, state, content_type),
+                    timeout=settings.content_generation_timeout
+                )
+            except DeadlineExceeded:
+                raise
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"응답 시간 초과 ({settings.content_generation_timeout:.0f}초)")
+    
+    def _store_results(self, state: FashionState, plan: List[Tuple[str, str, str, str]], results: List[Any]):
+        """동시 생성 결과를 계획 순서대로 기록 (실패한 콘텐츠가 있어도 성공한 콘텐츠는 보존)"""
+        
+        failures = []
+        
+        for (content_type, input_hash, _, _), result in zip(plan, results):
+            if isinstance(result, DeadlineExceeded):
+                # 마감 시간 초과 시 완료된 콘텐츠만 반환
+                mark_degraded(f"{CONTENT_LABELS[content_type]} 생성 생략 (마감 시간 초과)")
+            elif isinstance(result, BaseException):
+                failures.append(f"{CONTENT_LABELS[content_type]} 생성 오류: {str(result)}")
+            else:
+                self._store_generated(state, content_type, input_hash, result)
+        
+        if failures:
+            raise Exception("; ".join(failures))
+    
+    def _select_content_types(self, state: FashionState) -> List[str]:
+        """사용자 요청을 바탕으로 이번 실행에서 제공할 콘텐츠 결정"""
+        
+        user_request = state["user_request"]
+        content_types = []
+        
+        if "제품" in user_request or "기획" in user_request:
+            content_types.append("product_proposal")
+        
+        if "마케팅" in user_request or "문구" in user_request:
+            content_types.append("marketing_copy")
+        
+        if "콘텐츠" in user_request or "제안" in user_request:
+            content_types.append("content_suggestions")
+        
+        # 기본적으로 모든 콘텐츠 생성 (사용자 요청이 명확하지 않은 경우)
+        if not content_types:
+            content_types = list(CONTENT_LABELS)
+        
+        return content_types
+    
+    def _plan_generation(self, state: FashionState) -> List[Tuple[str, str, str, str]]:
+        """다시 생성해야 하는 콘텐츠와 프롬프트 결정
+        
+        콘텐츠별 프롬프트(입력) 해시가 이전 생성 때와 같고 피드백으로 무효화되지 않았다면
+        기존 결과(피드백 노드가 개선한 결과 포함)를 재사용합니다.
+        
+        Returns:
+            (콘텐츠 타입, 입력 해시, 시스템 프롬프트, 사용자 프롬프트) 목록
+        """
+        builders = {
+            "product_proposal": self._build_product_proposal_prompts,
+            "marketing_copy": self._build_marketing_copy_prompts,
+            "content_suggestions": self._build_content_suggestion_prompts
+        }
+        
+        # 이전 상태와 공유되지 않도록 복사 후 갱신
+        versions = dict(state.get("content_versions") or {})
+        state["content_versions"] = versions
+        stale_content = set(state.get("stale_content") or [])
+        plan = []
+        
+        for content_type in self._select_content_types(state):
+            system_prompt, user_prompt = builders[content_type](state)
+            input_hash = content_hash(system_prompt, user_prompt)
+            
+            current = state.get(content_type)
+            version = versions.get(content_type) or {}
+            
+            if current and content_type not in stale_content and version.get("input_hash", input_hash) == input_hash:
+                # 피드백 노드가 개선한 결과도 출력 해시로 구분하여 그대로 사용
+                output_hash = content_hash(current)
+                reason = "피드백 반영본 재사용" if version.get("output_hash") not in (None, output_hash) else "변경 없음, 재사용"
+                versions[content_type] = {**version, "input_hash": input_hash, "output_hash": output_hash}
+                update_state_step(state, f"{CONTENT_LABELS[content_type]} {reason}")
+                continue
+            
+            # 피드백으로 무효화된 콘텐츠는 이전 결과와 피드백을 함께 전달하여 개선
+            if content_type in stale_content and current and state.get("human_feedback"):
+                user_prompt += f"\n\n**이전 결과:**\n{current}\n\n**개선 요청:**\n{state['human_feedback']}"
+            
+            plan.append((content_type, input_hash, system_prompt, user_prompt))
+        
+        return plan
+    
+    def _store_generated(self, state: FashionState, content_type: str, input_hash: str, content: str):
+        """생성 결과와 입력/출력 해시 기록"""
+        
+        result = self._parse_content_suggestions(content) if content_type == "content_suggestions" else content
+        
+        state[content_type] = result
+        state["content_versions"] = {
+            **(state.get("content_versions") or {}),
+            content_type: {
+                "input_hash": input_hash,
+                "output_hash": content_hash(result),
+                "iteration": state.get("feedback_iteration", 0)
+            }
+        }
+        state["stale_content"] = [t for t in state.get("stale_content") or [] if t != content_type]
+        update_state_step(state, f"{CONTENT_LABELS[content_type]} 생성")
+    
     def _load_prompts(self) -> Dict[str, Any]:
         """프롬프트 템플릿을 로드합니다"""
         try:
-            with open("config/prompts.yaml", "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+            return load_prompts()
         except Exception as e:
             print(f"프롬프트 로드 오류: {str(e)}")
             return self._get_default_prompts()
@@ -185,151 +364,130 @@ class ContentGenerationNode:
         
         return content_types
     
-    def _generate_product_proposal(self, state: FashionState) -> str:
-        """제품 기획서 생성"""
+    def _build_product_proposal_prompts(self, state: FashionState) -> Tuple[str, str]:
+        """제품 기획서 프롬프트 구성"""
         
-        try:
-            # 분석 결과 준비
-            trend_analysis = state.get("trend_analysis", {})
-            trend_summary = trend_analysis.get("raw_analysis", "트렌드 분석 결과 없음")
-            
-            # 타겟 정보 준비
-            demographics = state.get("target_demographics", {})
-            target_category = state.get("target_category", "전체")
-            
-            # 프롬프트 구성
-            prompts = self.prompts.get("product_planning", self._get_default_prompts()["product_planning"])
-            
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                trend_analysis=trend_summary,
-                target_gender=demographics.get("gender", "전체"),
-                target_age=demographics.get("age_range", "20-40"),
-                price_range=demographics.get("income_level", "중간"),
-                product_category=target_category
-            )
-            
-            # LLM 호출
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            
-            # 토큰 사용량 추적
-            input_tokens = len(system_prompt + user_prompt) // 4
-            output_tokens = len(response.content) // 4
-            
-            state = update_token_usage(
-                state, 
-                input_tokens, 
-                output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
-            )
-            
-            return response.content
-            
-        except Exception as e:
-            raise Exception(f"제품 기획서 생성 오류: {str(e)}")
+        # 분석 결과 준비
+        trend_analysis = state.get("trend_analysis") or {}
+        trend_summary = trend_analysis.get("raw_analysis", "트렌드 분석 결과 없음")
+        
+        # 타겟 정보 준비
+        demographics = state.get("target_demographics", {})
+        target_category = state.get("target_category", "전체")
+        
+        prompts = self.prompts.get("product_planning", self._get_default_prompts()["product_planning"])
+        
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"].format(
+            trend_analysis=trend_summary,
+            target_gender=demographics.get("gender", "전체"),
+            target_age=demographics.get("age_range", "20-40"),
+            price_range=demographics.get("income_level", "중간"),
+            product_category=target_category
+        )
+        
+        return system_prompt, user_prompt
     
-    def _generate_marketing_copy(self, state: FashionState) -> str:
-        """마케팅 문구 생성"""
+    def _build_marketing_copy_prompts(self, state: FashionState) -> Tuple[str, str]:
+        """마케팅 문구 프롬프트 구성"""
         
-        try:
-            # 분석 결과 준비
-            sentiment_analysis = state.get("sentiment_analysis", {})
-            sentiment_summary = sentiment_analysis.get("raw_analysis", "감성 분석 결과 없음")
-            
-            # 제품 정보 준비
-            target_category = state.get("target_category", "패션 제품")
-            product_info = f"카테고리: {target_category}"
-            
-            # 프롬프트 구성
-            prompts = self.prompts.get("marketing_copy", self._get_default_prompts()["marketing_copy"])
-            
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                product_info=product_info,
-                sentiment_analysis=sentiment_summary,
-                marketing_channel="온라인 쇼핑몰, SNS"
-            )
-            
-            # LLM 호출
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            
-            # 토큰 사용량 추적
-            input_tokens = len(system_prompt + user_prompt) // 4
-            output_tokens = len(response.content) // 4
-            
-            state = update_token_usage(
-                state, 
-                input_tokens, 
-                output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
-            )
-            
-            return response.content
-            
-        except Exception as e:
-            raise Exception(f"마케팅 문구 생성 오류: {str(e)}")
+        # 분석 결과 준비
+        sentiment_analysis = state.get("sentiment_analysis") or {}
+        sentiment_summary = sentiment_analysis.get("raw_analysis", "감성 분석 결과 없음")
+        
+        # 제품 정보 준비
+        target_category = state.get("target_category", "패션 제품")
+        product_info = f"카테고리: {target_category}"
+        
+        prompts = self.prompts.get("marketing_copy", self._get_default_prompts()["marketing_copy"])
+        
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"].format(
+            product_info=product_info,
+            sentiment_analysis=sentiment_summary,
+            marketing_channel="온라인 쇼핑몰, SNS"
+        )
+        
+        return system_prompt, user_prompt
     
-    def _generate_content_suggestions(self, state: FashionState) -> List[str]:
-        """콘텐츠 제안 생성"""
+    def _build_content_suggestion_prompts(self, state: FashionState) -> Tuple[str, str]:
+        """콘텐츠 제안 프롬프트 구성"""
         
-        try:
-            # 분석 결과 준비
-            trend_analysis = state.get("trend_analysis", {})
-            trend_summary = trend_analysis.get("raw_analysis", "트렌드 분석 결과 없음")
-            
-            # 브랜드 정보 준비
-            target_category = state.get("target_category", "패션")
-            brand_info = f"패션 브랜드 - 전문 분야: {target_category}"
-            
-            # 프롬프트 구성
-            prompts = self.prompts.get("content_suggestion", self._get_default_prompts()["content_suggestion"])
-            
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                brand_info=brand_info,
-                recent_trends=trend_summary,
-                competitor_analysis="경쟁사 분석 데이터 부족"
-            )
-            
-            # LLM 호출
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            
-            # 토큰 사용량 추적
-            input_tokens = len(system_prompt + user_prompt) // 4
-            output_tokens = len(response.content) // 4
-            
-            state = update_token_usage(
+        # 분석 결과 준비
+        trend_analysis = state.get("trend_analysis") or {}
+        trend_summary = trend_analysis.get("raw_analysis", "트렌드 분석 결과 없음")
+        
+        # 브랜드 정보 준비
+        target_category = state.get("target_category", "패션")
+        brand_info = f"패션 브랜드 - 전문 분야: {target_category}"
+        
+        prompts = self.prompts.get("content_suggestion", self._get_default_prompts()["content_suggestion"])
+        
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"].format(
+            brand_info=brand_info,
+            recent_trends=trend_summary,
+            competitor_analysis="경쟁사 분석 데이터 부족"
+        )
+        
+        return system_prompt, user_prompt
+    
+    def _complete(self, system_prompt: str, user_prompt: str, state: FashionState, content_type: Optional[str] = None) -> str:
+        """LLM 호출 후 토큰 사용량을 기록하고 응답 텍스트 반환 (스트리밍 시 content_type별로 토큰 전달)"""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        with track("llm", "content_generation", model=getattr(self.llm, "model_name", None)) as record:
+            response = self.llm.invoke(messages, **stream_kwargs(state, "content_generation", content_type))
+            record_llm_call(record, messages, response)
+        self._track_tokens(system_prompt, user_prompt, response.content, state, cached=is_cached_response(response), model=served_model(response, self.llm))
+        
+        return response.content
+    
+    async def _acomplete(self, system_prompt: str, user_prompt: str, state: FashionState, content_type: Optional[str] = None) -> str:
+        """LLM 비동기 호출 후 토큰 사용량을 기록하고 응답 텍스트 반환 (스트리밍 시 content_type별로 토큰 전달)"""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        with track("llm", "content_generation", model=getattr(self.llm, "model_name", None)) as record:
+            response = await with_deadline(self.llm.ainvoke(messages, **stream_kwargs(state, "content_generation", content_type)))
+            record_llm_call(record, messages, response)
+        self._track_tokens(system_prompt, user_prompt, response.content, state, cached=is_cached_response(response), model=served_model(response, self.llm))
+        
+        return response.content
+    
+    def _track_tokens(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        content: str,
+        state: FashionState,
+        cached: bool = False,
+        model: Optional[str] = None
+    ):
+        """토큰 사용량 추적 (캐시된 응답은 토큰 사용 없음, model은 응답을 실제로 생성한 모델)"""
+        
+        if cached:
+            return
+        
+        # 토큰 사용량 추적 (로컬 토크나이저 기준)
+        model = model or getattr(self.llm, "model_name", None)
+        input_tokens = count_message_tokens([system_prompt, user_prompt], model)
+        output_tokens = count_tokens(content, model)
+        
+        with self._usage_lock:
+            update_token_usage(
                 state, 
                 input_tokens, 
                 output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
+                *model_pricing(model)
             )
-            
-            # 응답을 리스트로 분할
-            suggestions = self._parse_content_suggestions(response.content)
-            
-            return suggestions
-            
-        except Exception as e:
-            raise Exception(f"콘텐츠 제안 생성 오류: {str(e)}")
     
     def _parse_content_suggestions(self, content: str) -> List[str]:
         """콘텐츠 제안 텍스트를 리스트로 파싱"""
@@ -3,22 +3,44 @@ Fashion AI Automation System - Data Collection Node
 """
 
 import asyncio
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from ..state import FashionState, update_state_step, add_error_to_state
 from tools.naver_api import NaverAPIClient
 from tools.web_scraper import WebScraper
 from tools.opensearch_client import OpenSearchClient
+from utils.keyword_matcher import KeywordMatcher
 
 
 class DataCollectionNode:
     """데이터 수집을 담당하는 LangGraph 노드"""
     
-    def __init__(self):
-        self.naver_client = NaverAPIClient()
-        self.web_scraper = WebScraper()
-        self.opensearch_client = OpenSearchClient()
+    # 웹 스크래핑 대상 (예: 패션 블로그, 뉴스)
+    FASHION_URLS = [
+        "https://www.vogue.co.kr",
+        "https://www.elle.co.kr",
+        "https://www.harpersbazaar.co.kr"
+    ]
+    
+    # 요청에서 추출할 패션 키워드 (간단한 방식)
+    FASHION_TERM_MATCHER = KeywordMatcher([
+        "트렌드", "패션", "스타일", "의류", "액세서리", "신발", "가방",
+        "여름", "겨울", "봄", "가을", "시즌",
+        "20대", "30대", "40대", "여성", "남성",
+        "캐주얼", "포멀", "스포츠", "빈티지", "미니멀"
+    ])
+    
+    def __init__(
+        self,
+        naver_client: Optional[NaverAPIClient] = None,
+        web_scraper: Optional[WebScraper] = None,
+        opensearch_client: Optional[OpenSearchClient] = None
+    ):
+        # 레지스트리에서 공유 클라이언트를 주입받지 않은 경우에만 새로 생성
+        self.naver_client = naver_client or NaverAPIClient()
+        self.web_scraper = web_scraper or WebScraper()
+        self.opensearch_client = opensearch_client or OpenSearchClient()
     
     def execute(self, state: FashionState) -> FashionState:
         """데이터 수집 노드 실행"""
@@ -52,24 +74,42 @@ class DataCollectionNode:
         
         return state
     
+    async def aexecute(self, state: FashionState) -> FashionState:
+        """데이터 수집 노드 비동기 실행 (네이버/스크래핑 요청을 동시에 수행)"""
+        
+        try:
+            state = update_state_step(state, "데이터 수집 노드 실행 시작")
+            
+            # 키워드 추출
+            keywords = self._extract_keywords(state["user_request"], state["target_category"])
+            
+            # 여러 소스에서 동시에 데이터 수집
+            collected_data = await self._acollect_data_from_sources(keywords, state)
+            
+            # 상태 업데이트
+            state["collected_data"] = collected_data
+            state["naver_shopping_data"] = collected_data.get("naver_shopping", [])
+            state["web_scraping_data"] = collected_data.get("web_scraping", [])
+            state["social_media_data"] = collected_data.get("social_media", [])
+            
+            # OpenSearch에 저장
+            await self._asave_to_opensearch(collected_data, state)
+            
+            state = update_state_step(state, f"데이터 수집 완료: {len(collected_data)} 건")
+            
+        except Exception as e:
+            state = add_error_to_state(state, f"데이터 수집 중 오류: {str(e)}")
+        
+        return state
+    
     def _extract_keywords(self, user_request: str, target_category: str) -> List[str]:
         """사용자 요청과 카테고리에서 키워드 추출"""
         
         # 기본 패션 키워드
         base_keywords = [target_category] if target_category != "전체" else []
         
-        # 요청에서 키워드 추출 (간단한 방식)
-        common_fashion_terms = [
-            "트렌드", "패션", "스타일", "의류", "액세서리", "신발", "가방",
-            "여름", "겨울", "봄", "가을", "시즌",
-            "20대", "30대", "40대", "여성", "남성",
-            "캐주얼", "포멀", "스포츠", "빈티지", "미니멀"
-        ]
-        
-        extracted_keywords = []
-        for term in common_fashion_terms:
-            if term in user_request:
-                extracted_keywords.append(term)
+        # 요청에서 키워드 추출
+        extracted_keywords = self.FASHION_TERM_MATCHER.find(user_request)
         
         # 키워드가 없으면 기본값 사용
         if not extracted_keywords:
@@ -100,13 +140,7 @@ class DataCollectionNode:
             
             # 웹 스크래핑 (예: 패션 블로그, 뉴스)
             try:
-                fashion_urls = [
-                    "https://www.vogue.co.kr",
-                    "https://www.elle.co.kr",
-                    "https://www.harpersbazaar.co.kr"
-                ]
-                
-                for url in fashion_urls:
+                for url in self.FASHION_URLS:
                     try:
                         scraped_data = self.web_scraper.scrape_fashion_content(url, keywords[0])
                         if scraped_data:
@@ -129,6 +163,52 @@ class DataCollectionNode:
         
         return collected_data
     
+    async def _acollect_data_from_sources(self, keywords: List[str], state: FashionState) -> Dict[str, Any]:
+        """여러 소스에서 데이터를 동시에 수집"""
+        
+        collected_data = {
+            "naver_shopping": [],
+            "web_scraping": [],
+            "social_media": [],
+            "collection_timestamp": datetime.now().isoformat(),
+            "keywords_used": keywords
+        }
+        
+        try:
+            naver_keywords = keywords[:3]  # 최대 3개 키워드만 사용
+            
+            # 네이버 쇼핑 API와 웹 스크래핑 요청을 한 번에 실행
+            results = await asyncio.gather(
+                *(self.naver_client.asearch_shopping(keyword, display=20) for keyword in naver_keywords),
+                *(self.web_scraper.ascrape_fashion_content(url, keywords[0]) for url in self.FASHION_URLS),
+                return_exceptions=True
+            )
+            naver_results = results[:len(naver_keywords)]
+            scraping_results = results[len(naver_keywords):]
+            
+            for keyword, naver_data in zip(naver_keywords, naver_results):
+                if isinstance(naver_data, Exception):
+                    state = add_error_to_state(state, f"네이버 API 오류 ({keyword}): {str(naver_data)}")
+                elif naver_data:
+                    collected_data["naver_shopping"].extend(naver_data.get("items", []))
+            
+            for url, scraped_data in zip(self.FASHION_URLS, scraping_results):
+                if isinstance(scraped_data, Exception):
+                    state = add_error_to_state(state, f"웹 스크래핑 오류 ({url}): {str(scraped_data)}")
+                elif scraped_data:
+                    collected_data["web_scraping"].append(scraped_data)
+            
+            # SNS 데이터 (모의 데이터)
+            try:
+                collected_data["social_media"] = self._collect_social_media_data(keywords)
+            except Exception as e:
+                state = add_error_to_state(state, f"SNS 데이터 수집 오류: {str(e)}")
+        
+        except Exception as e:
+            state = add_error_to_state(state, f"데이터 수집 전체 오류: {str(e)}")
+        
+        return collected_data
+    
     def _collect_social_media_data(self, keywords: List[str]) -> List[Dict[str, Any]]:
         """SNS 데이터 수집 (모의 데이터)"""
         
@@ -163,25 +243,7 @@ class DataCollectionNode:
         """수집된 데이터를 OpenSearch에 저장"""
         
         try:
-            session_id = state["session_id"]
-            timestamp = datetime.now()
-            
-            # 인덱스 이름 생성
-            index_name = f"fashion_data_{timestamp.strftime('%Y_%m')}"
-            
-            # 문서 구성
-            document = {
-                "session_id": session_id,
-                "timestamp": timestamp.isoformat(),
-                "user_request": state["user_request"],
-                "target_category": state["target_category"],
-                "collected_data": collected_data,
-                "data_summary": {
-                    "naver_shopping_count": len(collected_data.get("naver_shopping", [])),
-                    "web_scraping_count": len(collected_data.get("web_scraping", [])),
-                    "social_media_count": len(collected_data.get("social_media", [])),
-                }
-            }
+            index_name, document = self._build_opensearch_document(collected_data, state)
             
             # OpenSearch에 저장
             self.opensearch_client.index_document(index_name, document)
@@ -191,6 +253,43 @@ class DataCollectionNode:
         except Exception as e:
             state = add_error_to_state(state, f"OpenSearch 저장 오류: {str(e)}")
     
+    async def _asave_to_opensearch(self, collected_data: Dict[str, Any], state: FashionState):
+        """수집된 데이터를 OpenSearch에 비동기 저장"""
+        
+        try:
+            index_name, document = self._build_opensearch_document(collected_data, state)
+            
+            await self.opensearch_client.aindex_document(index_name, document)
+            
+            state = update_state_step(state, f"데이터 OpenSearch 저장 완료: {index_name}")
+            
+        except Exception as e:
+            state = add_error_to_state(state, f"OpenSearch 저장 오류: {str(e)}")
+    
+    def _build_opensearch_document(self, collected_data: Dict[str, Any], state: FashionState) -> Tuple[str, Dict[str, Any]]:
+        """OpenSearch 인덱스 이름과 저장할 문서 구성"""
+        
+        timestamp = datetime.now()
+        
+        # 인덱스 이름 생성
+        index_name = f"fashion_data_{timestamp.strftime('%Y_%m')}"
+        
+        # 문서 구성
+        document = {
+            "session_id": state["session_id"],
+            "timestamp": timestamp.isoformat(),
+            "user_request": state["user_request"],
+            "target_category": state["target_category"],
+            "collected_data": collected_data,
+            "data_summary": {
+                "naver_shopping_count": len(collected_data.get("naver_shopping", [])),
+                "web_scraping_count": len(collected_data.get("web_scraping", [])),
+                "social_media_count": len(collected_data.get("social_media", [])),
+            }
+        }
+        
+        return index_name, document
+    
     def get_sample_data(self) -> Dict[str, Any]:
         """샘플 데이터 반환 (개발/테스트용)"""
         
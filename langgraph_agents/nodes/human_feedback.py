@@ -2,37 +2,63 @@
 Fashion AI Automation System - Human Feedback Node
 """
 
-import yaml
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..state import FashionState, update_state_step, add_error_to_state, update_token_usage
-from config.settings import settings
+from config.settings import load_prompts
+from tools.llm_gateway import GatewayChatModel, served_model
+from tools.llm_router import get_routed_llm, model_pricing
+from tools.llm_cache import is_cached_response
+from utils.metrics import track, record_llm_call
+from utils.token_counter import count_tokens, count_message_tokens
+from utils.deadline import DeadlineExceeded, with_deadline, mark_degraded
+from utils.keyword_matcher import KeywordMatcher
+
+
+# 제품 기획서 필수 요소와 구조화 표시 (번호, bullet point)
+PROPOSAL_ELEMENT_MATCHER = KeywordMatcher(["제품명", "컨셉", "타겟", "고객", "특징", "차별점", "가격", "마케팅"])
+STRUCTURE_MARKER_MATCHER = KeywordMatcher(["1.", "2.", "3.", "-", "•"])
+
+# 마케팅 문구 필수 요소, 감정적 어조, 행동 유도 문구
+COPY_ELEMENT_MATCHER = KeywordMatcher(["캐치프레이즈", "카피", "설명", "해시태그", "#"])
+EMOTIONAL_WORD_MATCHER = KeywordMatcher([
+    "새로운", "특별한", "독특한", "매력적인", "스타일리시한",
+    "편안한", "세련된", "트렌디한", "완벽한", "최고의"
+])
+CTA_WORD_MATCHER = KeywordMatcher(["지금", "바로", "즉시", "놓치지", "기회", "한정", "특가", "할인"])
+
+# 콘텐츠 제안 유형 (다양성 체크)과 구체성 표현
+SUGGESTION_TYPES = {
+    "캘린더": "calendar", "일정": "calendar",
+    "플랫폼": "platform", "SNS": "platform",
+    "인플루언서": "collaboration", "협업": "collaboration",
+    "KPI": "metrics", "측정": "metrics"
+}
+SUGGESTION_TYPE_MATCHER = KeywordMatcher(SUGGESTION_TYPES)
+SPECIFIC_UNIT_MATCHER = KeywordMatcher(["일", "주", "월", "시간", "개", "회"])
+
+# 피드백에서 개선 대상 콘텐츠를 가리키는 표현
+FEEDBACK_TARGETS = {
+    "제품": "product_proposal", "기획서": "product_proposal", "기획": "product_proposal",
+    "마케팅": "marketing_copy", "문구": "marketing_copy", "카피": "marketing_copy", "광고": "marketing_copy",
+    "콘텐츠": "content_suggestions", "제안": "content_suggestions", "전략": "content_suggestions"
+}
+FEEDBACK_TARGET_MATCHER = KeywordMatcher(FEEDBACK_TARGETS)
 
 
 class HumanFeedbackNode:
     """Human-in-the-loop 피드백을 처리하는 LangGraph 노드"""
     
-    def __init__(self):
+    def __init__(self, llm: Optional[GatewayChatModel] = None):
         try:
-            # OpenAI 설정
-            api_key = settings.openai_api_key
-            if not api_key:
-                try:
-                    import streamlit as st
-                    api_key = st.secrets.get("OPENAI_API_KEY", "")
-                except:
-                    pass
-            
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=settings.openai_temperature,
-                max_tokens=settings.max_tokens,
-                api_key=api_key
-            )
+            # 레지스트리에서 공유 LLM이 주입되지 않은 경우 라우팅 테이블의 등급으로 생성
+            if llm is None:
+                llm = get_routed_llm("human_feedback")
+            
+            self.llm = llm
             
             # 프롬프트 템플릿 로드
             self.prompts = self._load_prompts()
@@ -75,11 +101,38 @@ class HumanFeedbackNode:
         
         return state
     
+    async def aexecute(self, state: FashionState) -> FashionState:
+        """Human-in-the-loop 피드백 노드 비동기 실행"""
+        
+        try:
+            state = update_state_step(state, "휴먼 피드백 처리 시작")
+            
+            current_iteration = state.get("feedback_iteration", 0) + 1
+            state["feedback_iteration"] = current_iteration
+            
+            if current_iteration > 3:
+                state = update_state_step(state, "최대 피드백 반복 횟수 도달")
+                state["requires_human_input"] = False
+                return state
+            
+            user_feedback = state.get("human_feedback")
+            
+            if not user_feedback:
+                state = self._perform_automatic_validation(state)
+            else:
+                state = await self._aprocess_user_feedback(state, user_feedback)
+            
+            state = update_state_step(state, f"휴먼 피드백 처리 완료 (반복: {current_iteration})")
+            
+        except Exception as e:
+            state = add_error_to_state(state, f"휴먼 피드백 처리 오류: {str(e)}")
+        
+        return state
+    
     def _load_prompts(self) -> Dict[str, Any]:
         """프롬프트 템플릿을 로드합니다"""
         try:
-            with open("config/prompts.yaml", "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+            return load_prompts()
         except Exception as e:
             print(f"프롬프트 로드 오류: {str(e)}")
             return self._get_default_prompts()
@@ -114,6 +167,10 @@ class HumanFeedbackNode:
             if validation_results["needs_improvement"]:
                 state["requires_human_input"] = True
                 
+                # 기준 미달 콘텐츠만 다음 콘텐츠 생성 단계에서 다시 생성되도록 표시
+                scores = validation_results["scores"]
+                state["stale_content"] = [t for t, score in scores.items() if score < 0.7] or list(scores)
+                
                 # 개선 제안 생성
                 improvement_suggestions = self._generate_improvement_suggestions(validation_results)
                 state["human_feedback"] = f"자동 검증 결과 개선이 필요합니다: {improvement_suggestions}"
@@ -121,6 +178,7 @@ class HumanFeedbackNode:
                 state = update_state_step(state, "자동 검증 결과: 개선 필요")
             else:
                 state["requires_human_input"] = False
+                state["stale_content"] = []
                 state = update_state_step(state, "자동 검증 결과: 품질 기준 만족")
             
         except Exception as e:
@@ -186,13 +244,7 @@ class HumanFeedbackNode:
         max_score = 5.0
         
         # 필수 요소 체크
-        essential_elements = [
-            "제품명", "컨셉", "타겟", "고객", "특징", "차별점", "가격", "마케팅"
-        ]
-        
-        for element in essential_elements:
-            if element in proposal:
-                score += 1.0
+        score += len(PROPOSAL_ELEMENT_MATCHER.find(proposal))
         
         # 길이 체크 (너무 짧거나 긴 경우 감점)
         word_count = len(proposal.split())
@@ -202,7 +254,7 @@ class HumanFeedbackNode:
             score += 0.5
         
         # 구조화 체크 (번호나 bullet point 사용)
-        if any(marker in proposal for marker in ["1.", "2.", "3.", "-", "•"]):
+        if STRUCTURE_MARKER_MATCHER.contains_any(proposal):
             score += 1.0
         
         return min(score / max_score, 1.0)
@@ -214,29 +266,17 @@ class HumanFeedbackNode:
         max_score = 5.0
         
         # 필수 요소 체크
-        essential_elements = [
-            "캐치프레이즈", "카피", "설명", "해시태그", "#"
-        ]
-        
-        for element in essential_elements:
-            if element in copy:
-                score += 1.0
+        score += len(COPY_ELEMENT_MATCHER.find(copy))
         
         # 감정적 어조 체크
-        emotional_words = [
-            "새로운", "특별한", "독특한", "매력적인", "스타일리시한", 
-            "편안한", "세련된", "트렌디한", "완벽한", "최고의"
-        ]
-        
-        emotional_count = sum(1 for word in emotional_words if word in copy)
+        emotional_count = len(EMOTIONAL_WORD_MATCHER.find(copy))
         if emotional_count >= 2:
             score += 1.0
         elif emotional_count >= 1:
             score += 0.5
         
         # 행동 유도 문구 체크
-        cta_words = ["지금", "바로", "즉시", "놓치지", "기회", "한정", "특가", "할인"]
-        if any(word in copy for word in cta_words):
+        if CTA_WORD_MATCHER.contains_any(copy):
             score += 1.0
         
         return min(score / max_score, 1.0)
@@ -261,22 +301,12 @@ class HumanFeedbackNode:
         # 다양성 체크
         unique_types = set()
         for suggestion in suggestions:
-            if "캘린더" in suggestion or "일정" in suggestion:
-                unique_types.add("calendar")
-            if "플랫폼" in suggestion or "SNS" in suggestion:
-                unique_types.add("platform")
-            if "인플루언서" in suggestion or "협업" in suggestion:
-                unique_types.add("collaboration")
-            if "KPI" in suggestion or "측정" in suggestion:
-                unique_types.add("metrics")
+            unique_types.update(SUGGESTION_TYPES[keyword] for keyword in SUGGESTION_TYPE_MATCHER.find(suggestion))
         
         score += min(len(unique_types), 2.0)
         
         # 구체성 체크
-        specific_count = 0
-        for suggestion in suggestions:
-            if any(keyword in suggestion for keyword in ["일", "주", "월", "시간", "개", "회"]):
-                specific_count += 1
+        specific_count = sum(1 for suggestion in suggestions if SPECIFIC_UNIT_MATCHER.contains_any(suggestion))
         
         if specific_count >= len(suggestions) * 0.5:
             score += 1.0
@@ -319,30 +349,53 @@ class HumanFeedbackNode:
                     state[content_type] = improved_content
                     state = update_state_step(state, f"{content_type} 개선 완료")
             
-            # 피드백 반영 완료 플래그 설정
+            # 피드백 반영 완료 플래그 설정 (개선된 콘텐츠는 콘텐츠 생성 단계에서 재사용)
             state["requires_human_input"] = False
+            state["stale_content"] = []
             
         except Exception as e:
             state = add_error_to_state(state, f"사용자 피드백 처리 오류: {str(e)}")
         
         return state
     
-    def _identify_content_to_improve(self, feedback: str, state: FashionState) -> List[str]:
-        """피드백에서 개선이 필요한 콘텐츠 식별"""
+    async def _aprocess_user_feedback(self, state: FashionState, user_feedback: str) -> FashionState:
+        """사용자 피드백 비동기 처리 및 콘텐츠 개선"""
         
-        content_to_improve = []
-        
-        if any(word in feedback for word in ["제품", "기획서", "기획"]):
-            if state.get("product_proposal"):
-                content_to_improve.append("product_proposal")
+        try:
+            if not self.llm:
+                state = add_error_to_state(state, "OpenAI 클라이언트가 초기화되지 않았습니다.")
+                return state
+            
+            content_to_improve = self._identify_content_to_improve(user_feedback, state)
+            
+            for content_type in content_to_improve:
+                try:
+                    improved_content = await self._aimprove_content(content_type, user_feedback, state)
+                except DeadlineExceeded:
+                    # 마감 시간 초과 시 남은 콘텐츠는 기존 내용 유지
+                    mark_degraded(f"{content_type}부터 콘텐츠 개선 생략 (마감 시간 초과)")
+                    break
+                
+                if improved_content:
+                    state[content_type] = improved_content
+                    state = update_state_step(state, f"{content_type} 개선 완료")
+            
+            state["requires_human_input"] = False
+            state["stale_content"] = []
+            
+        except Exception as e:
+            state = add_error_to_state(state, f"사용자 피드백 처리 오류: {str(e)}")
         
-        if any(word in feedback for word in ["마케팅", "문구", "카피", "광고"]):
-            if state.get("marketing_copy"):
-                content_to_improve.append("marketing_copy")
+        return state
+    
+    def _identify_content_to_improve(self, feedback: str, state: FashionState) -> List[str]:
+        """피드백에서 개선이 필요한 콘텐츠 식별"""
         
-        if any(word in feedback for word in ["콘텐츠", "제안", "전략"]):
-            if state.get("content_suggestions"):
-                content_to_improve.append("content_suggestions")
+        mentioned = {FEEDBACK_TARGETS[keyword] for keyword in FEEDBACK_TARGET_MATCHER.find(feedback)}
+        content_to_improve = [
+            content_type for content_type in ("product_proposal", "marketing_copy", "content_suggestions")
+            if content_type in mentioned and state.get(content_type)
+        ]
         
         # 특정 콘텐츠가 명시되지 않은 경우 모든 콘텐츠 개선
         if not content_to_improve:
@@ -364,14 +417,7 @@ class HumanFeedbackNode:
             if not previous_content:
                 return None
             
-            # 프롬프트 구성
-            prompts = self.prompts.get("human_feedback", self._get_default_prompts()["human_feedback"])
-            
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                previous_result=previous_content,
-                user_feedback=user_feedback
-            )
+            system_prompt, user_prompt = self._build_improve_prompts(previous_content, user_feedback)
             
             # LLM 호출
             messages = [
@@ -379,26 +425,85 @@ class HumanFeedbackNode:
                 HumanMessage(content=user_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            with track("llm", "human_feedback", model=getattr(self.llm, "model_name", None)) as record:
+                response = self.llm.invoke(messages)
+                record_llm_call(record, messages, response)
+            self._track_tokens(system_prompt, user_prompt, response.content, state, cached=is_cached_response(response), model=served_model(response, self.llm))
+            
+            return response.content
             
-            # 토큰 사용량 추적
-            input_tokens = len(system_prompt + user_prompt) // 4
-            output_tokens = len(response.content) // 4
+        except Exception as e:
+            state = add_error_to_state(state, f"{content_type} 개선 오류: {str(e)}")
+            return None
+    
+    async def _aimprove_content(self, content_type: str, user_feedback: str, state: FashionState) -> Optional[str]:
+        """특정 콘텐츠 비동기 개선"""
+        
+        try:
+            previous_content = state.get(content_type, "")
+            if not previous_content:
+                return None
             
-            state = update_token_usage(
-                state, 
-                input_tokens, 
-                output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
-            )
+            system_prompt, user_prompt = self._build_improve_prompts(previous_content, user_feedback)
+            
+            # LLM 비동기 호출 (이벤트 루프를 블로킹하지 않음)
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_prompt)
+            ]
+            
+            with track("llm", "human_feedback", model=getattr(self.llm, "model_name", None)) as record:
+                response = await with_deadline(self.llm.ainvoke(messages))
+                record_llm_call(record, messages, response)
+            self._track_tokens(system_prompt, user_prompt, response.content, state, cached=is_cached_response(response), model=served_model(response, self.llm))
             
             return response.content
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             state = add_error_to_state(state, f"{content_type} 개선 오류: {str(e)}")
             return None
     
+    def _build_improve_prompts(self, previous_content: Any, user_feedback: str) -> Tuple[str, str]:
+        """콘텐츠 개선 프롬프트 구성"""
+        
+        prompts = self.prompts.get("human_feedback", self._get_default_prompts()["human_feedback"])
+        
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"].format(
+            previous_result=previous_content,
+            user_feedback=user_feedback
+        )
+        
+        return system_prompt, user_prompt
+    
+    def _track_tokens(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        content: str,
+        state: FashionState,
+        cached: bool = False,
+        model: Optional[str] = None
+    ):
+        """토큰 사용량 추적 (캐시된 응답은 토큰 사용 없음, model은 응답을 실제로 생성한 모델)"""
+        
+        if cached:
+            return
+        
+        # 토큰 사용량 추적 (로컬 토크나이저 기준)
+        model = model or getattr(self.llm, "model_name", None)
+        input_tokens = count_message_tokens([system_prompt, user_prompt], model)
+        output_tokens = count_tokens(content, model)
+        
+        update_token_usage(
+            state, 
+            input_tokens, 
+            output_tokens,
+            *model_pricing(model)
+        )
+    
     def get_feedback_summary(self, state: FashionState) -> Dict[str, Any]:
         """피드백 처리 요약 생성"""
         
@@ -2,42 +2,76 @@
 Fashion AI Automation System - Sentiment Analysis Node
 """
 
-import yaml
+import asyncio
+import contextvars
+import json
 import re
-from typing import Dict, List, Any, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..state import FashionState, update_state_step, add_error_to_state, update_token_usage
-from config.settings import settings
+from ..sentiment_cache import SentimentCache, make_text_key, scorer_version
+from ..sentiment_aggregator import SentimentAggregator, observation_dimensions
+from config.settings import settings, load_prompts
+from tools.llm_gateway import GatewayChatModel, served_model
+from tools.llm_router import get_routed_llm, model_pricing
+from tools.llm_cache import is_cached_response
+from utils.metrics import track, record_llm_call
+from utils.token_counter import count_tokens, count_message_tokens, truncate_end
+from utils.deadline import DeadlineExceeded, with_deadline, mark_degraded
+from utils.prompt_packer import compact_text
+from utils.sentiment_lexicon import score_texts, label_for
+from utils.keyword_matcher import KeywordMatcher
+
+
+# 채점 요청은 {"scores": [[텍스트 번호, 점수], ...]} JSON 응답을 받음
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# 응답이 잘려 JSON으로 읽을 수 없을 때 완성된 [번호, 점수] 항목을 찾는 패턴
+SCORE_PAIR_PATTERN = re.compile(r"\[\s*(\d+)\s*,\s*([+-]?\d*\.?\d+)\s*\]")
+
+# 주요 감정 키워드
+EMOTION_KEYWORD_MATCHER = KeywordMatcher([
+    "만족", "불만", "기대", "실망", "흥미", "지루함",
+    "신뢰", "불신", "호감", "비호감", "선호", "거부감",
+    "즐거움", "불쾌", "편안함", "불편함", "안전", "불안"
+])
 
 
 class SentimentAnalysisNode:
     """감성 분석을 담당하는 LangGraph 노드"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        llm: Optional[GatewayChatModel] = None,
+        cache: Optional[SentimentCache] = None,
+        aggregator: Optional[SentimentAggregator] = None
+    ):
+        # 텍스트별 채점 결과 캐시 (세션/배치 실행 간 공유)
+        if cache is None and settings.sentiment_cache_enabled:
+            cache = SentimentCache()
+        self.cache = cache
+        
+        # 카테고리/브랜드/키워드별 시간 구간 집계 (대시보드/일일 DAG 조회용)
+        if aggregator is None and settings.sentiment_aggregate_enabled:
+            aggregator = SentimentAggregator()
+        self.aggregator = aggregator
+        
         try:
-            # OpenAI 설정
-            api_key = settings.openai_api_key
-            if not api_key:
-                try:
-                    import streamlit as st
-                    api_key = st.secrets.get("OPENAI_API_KEY", "")
-                except:
-                    pass
+            # 레지스트리에서 공유 LLM이 주입되지 않은 경우 라우팅 테이블의 등급으로 생성
+            if llm is None:
+                # 감성 분석은 빠른 등급 모델 (일관성을 위해 낮은 temperature)
+                llm = get_routed_llm("sentiment_analysis")
             
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=0.3,  # 감성 분석은 일관성을 위해 낮은 temperature
-                max_tokens=settings.max_tokens,
-                api_key=api_key
-            )
+            self.llm = llm
             
             # 프롬프트 템플릿 로드
             self.prompts = self._load_prompts()
-            
+        
         except Exception as e:
             print(f"SentimentAnalysisNode 초기화 오류: {str(e)}")
             self.llm = None
@@ -49,9 +83,6 @@ class SentimentAnalysisNode:
         try:
             state = update_state_step(state, "감성 분석 시작")
             
-            if not self.llm:
-                raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
-            
             # 분석할 텍스트 데이터 준비
             text_data = self._prepare_text_data(state)
             
@@ -59,14 +90,44 @@ class SentimentAnalysisNode:
                 state = add_error_to_state(state, "감성 분석할 텍스트 데이터가 없습니다.")
                 return state
             
-            # 감성 분석 수행
-            sentiment_result = self._analyze_sentiment(text_data, state)
+            # 캐시에 없는 텍스트만 감성 사전으로 채점 후 LLM 채점 대상(hybrid 모드는 신뢰도가 낮은 텍스트)을 묶음 단위로 동시 채점
+            item_scores, keys = self._score_locally(text_data)
+            self._score_with_llm(text_data, item_scores, keys, state)
+            self._cache_scores(text_data, item_scores, keys)
+            self._aggregate_scores(text_data, item_scores, state)
             
             # 결과를 상태에 저장
-            state["sentiment_analysis"] = sentiment_result
+            state["sentiment_analysis"] = self._build_analysis_result(text_data, item_scores)
             
             state = update_state_step(state, "감성 분석 완료")
+        
+        except Exception as e:
+            state = add_error_to_state(state, f"감성 분석 오류: {str(e)}")
+        
+        return state
+    
+    async def aexecute(self, state: FashionState) -> FashionState:
+        """감성 분석 노드 비동기 실행"""
+        
+        try:
+            state = update_state_step(state, "감성 분석 시작")
+            
+            text_data = self._prepare_text_data(state)
             
+            if not text_data:
+                state = add_error_to_state(state, "감성 분석할 텍스트 데이터가 없습니다.")
+                return state
+            
+            # 캐시/집계 저장소(SQLite 잠금 대기)는 워커 스레드에서 조회, 기록
+            item_scores, keys = await asyncio.to_thread(self._score_locally, text_data)
+            await self._ascore_with_llm(text_data, item_scores, keys, state)
+            await asyncio.to_thread(self._cache_scores, text_data, item_scores, keys)
+            await asyncio.to_thread(self._aggregate_scores, text_data, item_scores, state)
+            
+            state["sentiment_analysis"] = self._build_analysis_result(text_data, item_scores)
+            
+            state = update_state_step(state, "감성 분석 완료")
+        
         except Exception as e:
             state = add_error_to_state(state, f"감성 분석 오류: {str(e)}")
         
@@ -75,8 +136,7 @@ class SentimentAnalysisNode:
     def _load_prompts(self) -> Dict[str, Any]:
         """프롬프트 템플릿을 로드합니다"""
         try:
-            with open("config/prompts.yaml", "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+            return load_prompts()
         except Exception as e:
             print(f"프롬프트 로드 오류: {str(e)}")
             return self._get_default_prompts()
@@ -86,21 +146,18 @@ class SentimentAnalysisNode:
         return {
             "sentiment_analysis": {
                 "system_prompt": """당신은 소비자 감성 분석 전문가입니다.
-SNS 댓글, 리뷰, 블로그 포스트 등의 텍스트 데이터를 분석하여
-소비자들의 감정과 의견을 정확히 파악해주세요.""",
+패션 상품 리뷰, SNS 글, 블로그 포스트 각각의 감성 점수를 매겨주세요.
+점수는 -1.0(매우 부정) ~ 1.0(매우 긍정)이며, 감성이 드러나지 않으면 0.0입니다.""",
                 
-                "user_prompt": """다음 텍스트 데이터들의 감성을 분석해주세요:
-
-**분석 대상 텍스트:**
-{text_data}
+                "user_prompt": """다음 텍스트들의 감성 점수를 매겨주세요:
 
 **제품/브랜드:** {product_brand}
 
-분석 결과를 다음 형식으로 제공해주세요:
-1. 전체 감성 점수 (-1.0 ~ 1.0)
-2. 긍정/부정/중립 비율
-3. 주요 키워드 감성 분석
-4. 개선 포인트 제안"""
+**채점 대상 텍스트:**
+{text_data}
+
+설명 없이 다음 JSON 형식으로만 답해주세요 (각 항목은 [텍스트 번호, 점수]):
+{{"scores": [[1, 0.8], [2, -0.3]]}}"""
             }
         }
     
@@ -119,13 +176,14 @@ SNS 댓글, 리뷰, 블로그 포스트 등의 텍스트 데이터를 분석하
                     "metadata": {
                         "likes": item.get("likes", 0),
                         "comments": item.get("comments", 0),
-                        "hashtags": item.get("hashtags", [])
+                        "hashtags": item.get("hashtags", []),
+                        "timestamp": item.get("timestamp")
                     }
                 })
         
         # 네이버 쇼핑 리뷰 데이터 (제목에서 감성 추출)
         naver_data = state.get("naver_shopping_data", [])
-        for item in naver_data[:20]:  # 최대 20개
+        for item in naver_data:
             title = item.get("title", "")
             if title:
                 # HTML 태그 제거
@@ -146,7 +204,7 @@ SNS 댓글, 리뷰, 블로그 포스트 등의 텍스트 데이터를 분석하
             content = item.get("content", "")
             if content:
                 text_data.append({
-                    "text": content[:500],  # 최대 500자
+                    "text": content,
                     "source": "web_content",
                     "metadata": {
                         "title": item.get("title", ""),
@@ -156,165 +214,350 @@ SNS 댓글, 리뷰, 블로그 포스트 등의 텍스트 데이터를 분석하
         
         return text_data
     
-    def _analyze_sentiment(self, text_data: List[Dict[str, Any]], state: FashionState) -> Dict[str, Any]:
-        """LLM을 통한 감성 분석 수행"""
+    def _score_locally(self, text_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """캐시에 있는 텍스트는 캐시 결과를, 나머지는 감성 사전으로 채점 (LLM 호출 없음)
         
-        try:
-            # 텍스트 데이터를 문자열로 변환
-            formatted_text = self._format_text_for_analysis(text_data)
-            
-            # 프롬프트 구성
-            prompts = self.prompts.get("sentiment_analysis", self._get_default_prompts()["sentiment_analysis"])
+        같은 텍스트는 한 번만 채점하고 점수 dict를 공유하므로 LLM 채점 결과도 함께 반영됩니다.
+        
+        Returns:
+            (텍스트별 점수, 텍스트별 캐시 키)
+        """
+        
+        version = scorer_version(getattr(self.llm, "model_name", None))
+        keys = [make_text_key(item["text"], version) for item in text_data]
+        
+        scores = self.cache.get_many(keys) if self.cache else {}
+        for score in scores.values():
+            score["cached"] = True
+        
+        unseen = {}
+        for key, item in zip(keys, text_data):
+            if key not in scores:
+                unseen.setdefault(key, item["text"])
+        
+        for key, score in zip(unseen, score_texts(list(unseen.values()))):
+            score["scorer"] = "lexicon"
+            scores[key] = score
+        
+        return [scores[key] for key in keys], keys
+    
+    def _scoring_candidates(self, item_scores: List[Dict[str, Any]], keys: List[str]) -> List[int]:
+        """LLM으로 채점할 텍스트 인덱스 (캐시 결과를 사용하는 텍스트와 중복 텍스트 제외)
+        
+        llm 모드는 모든 텍스트, hybrid 모드는 감성 사전 신뢰도가 낮은 텍스트부터 세션당 상한까지
+        """
+        
+        if not self.llm:
+            return []
+        
+        pending, seen = [], set()
+        for i, (key, score) in enumerate(zip(keys, item_scores)):
+            if key not in seen and not score.get("cached"):
+                seen.add(key)
+                pending.append(i)
+        
+        if settings.sentiment_scoring_mode == "llm":
+            return pending
+        
+        if settings.sentiment_escalation_max_items <= 0:
+            return []
+        
+        return sorted(
+            (i for i in pending if item_scores[i]["confidence"] < settings.sentiment_escalation_confidence),
+            key=lambda i: item_scores[i]["confidence"]
+        )[:settings.sentiment_escalation_max_items]
+    
+    def _scoring_batches(
+        self,
+        text_data: List[Dict[str, Any]],
+        item_scores: List[Dict[str, Any]],
+        keys: List[str]
+    ) -> List[List[Tuple[int, str]]]:
+        """채점 대상 텍스트를 요청당 토큰 합/텍스트 수 상한에 맞춰 묶음으로 분할 ((인덱스, 축약 텍스트) 목록)"""
+        
+        model = getattr(self.llm, "model_name", None)
+        batches, batch, batch_tokens = [], [], 0
+        
+        for i in self._scoring_candidates(item_scores, keys):
+            text = truncate_end(compact_text(text_data[i]["text"]), settings.sentiment_text_tokens, model)
+            tokens = count_tokens(text, model)
             
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                text_data=formatted_text,
-                product_brand=state.get("target_category", "패션 제품")
-            )
+            if batch and (batch_tokens + tokens > settings.sentiment_batch_tokens or len(batch) >= settings.sentiment_batch_max_items):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
             
-            # LLM 호출
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
+            batch.append((i, text))
+            batch_tokens += tokens
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _score_with_llm(self, text_data: List[Dict[str, Any]], item_scores: List[Dict[str, Any]], keys: List[str], state: FashionState):
+        """채점 묶음을 스레드로 동시에 LLM 채점 (실패한 묶음은 감성 사전 점수 유지)"""
+        
+        requests = [(batch, self._build_scoring_messages(batch, state)) for batch in self._scoring_batches(text_data, item_scores, keys)]
+        if not requests:
+            return
+        
+        workers = max(1, min(len(requests), settings.sentiment_batch_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sentiment_scoring") as executor:
+            # 마감 시간과 메트릭 수집 contextvar를 작업 스레드에도 전달
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._request_scores, messages)
+                for _, messages in requests
             ]
             
-            response = self.llm.invoke(messages)
-            
-            # 토큰 사용량 추적
-            input_tokens = len(system_prompt + user_prompt) // 4
-            output_tokens = len(response.content) // 4
-            
-            state = update_token_usage(
-                state, 
-                input_tokens, 
-                output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
-            )
-            
-            # 감성 점수 추출
-            sentiment_score = self._extract_sentiment_score(response.content)
-            sentiment_distribution = self._calculate_sentiment_distribution(text_data, sentiment_score)
-            key_emotions = self._extract_key_emotions(response.content)
-            improvement_points = self._extract_improvement_points(response.content)
-            
-            # 결과 구조화
-            analysis_result = {
-                "overall_sentiment_score": sentiment_score,
-                "sentiment_distribution": sentiment_distribution,
-                "key_emotions": key_emotions,
-                "improvement_points": improvement_points,
-                "raw_analysis": response.content,
-                "data_summary": {
-                    "total_texts_analyzed": len(text_data),
-                    "sources": list(set([item["source"] for item in text_data])),
-                    "analysis_timestamp": datetime.now().isoformat()
-                },
-                "detailed_insights": self._generate_detailed_insights(text_data, sentiment_score)
-            }
-            
-            return analysis_result
-            
-        except Exception as e:
-            raise Exception(f"LLM 감성 분석 오류: {str(e)}")
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+        
+        self._store_scores(requests, results, item_scores, state)
     
-    def _format_text_for_analysis(self, text_data: List[Dict[str, Any]]) -> str:
-        """텍스트 데이터를 분석용 형식으로 변환"""
+    async def _ascore_with_llm(self, text_data: List[Dict[str, Any]], item_scores: List[Dict[str, Any]], keys: List[str], state: FashionState):
+        """채점 묶음을 동시에 LLM 비동기 채점 (실패/마감 초과한 묶음은 감성 사전 점수 유지)"""
         
-        formatted_texts = []
+        requests = [(batch, self._build_scoring_messages(batch, state)) for batch in self._scoring_batches(text_data, item_scores, keys)]
+        if not requests:
+            return
         
-        for i, item in enumerate(text_data[:30], 1):  # 최대 30개
-            text = item["text"]
-            source = item["source"]
-            metadata = item.get("metadata", {})
-            
-            if source.startswith("SNS"):
-                likes = metadata.get("likes", 0)
-                formatted_texts.append(f"{i}. [SNS] {text} (좋아요: {likes})")
-            elif source == "naver_shopping":
-                price = metadata.get("price", "")
-                formatted_texts.append(f"{i}. [쇼핑] {text} (가격: {price}원)")
-            else:
-                formatted_texts.append(f"{i}. [웹] {text}")
+        semaphore = asyncio.Semaphore(settings.sentiment_batch_concurrency)
+        results = await asyncio.gather(
+            *(self._arequest_scores(messages, semaphore) for _, messages in requests),
+            return_exceptions=True
+        )
         
-        return "\n".join(formatted_texts)
+        self._store_scores(requests, results, item_scores, state)
     
-    def _extract_sentiment_score(self, analysis_text: str) -> float:
-        """분석 텍스트에서 감성 점수 추출"""
-        
-        # 숫자 패턴 찾기 (-1.0 ~ 1.0 범위)
-        import re
-        score_patterns = [
-            r'감성\s*점수[:\s]*([+-]?\d*\.?\d+)',
-            r'점수[:\s]*([+-]?\d*\.?\d+)',
-            r'(-?\d*\.?\d+)\s*점',
-            r'(-1\.0|[-+]?0\.\d+|1\.0)'
-        ]
+    def _request_scores(self, messages: List[Any]) -> Any:
+        """채점 묶음 하나를 LLM으로 채점 (JSON 응답 요청)"""
         
-        for pattern in score_patterns:
-            matches = re.findall(pattern, analysis_text)
-            if matches:
-                try:
-                    score = float(matches[0])
-                    # -1.0 ~ 1.0 범위로 제한
-                    return max(-1.0, min(1.0, score))
-                except ValueError:
-                    continue
-        
-        # 패턴을 찾지 못한 경우 텍스트 분석으로 추정
-        if any(word in analysis_text for word in ["매우 긍정", "매우 좋", "훌륭"]):
-            return 0.8
-        elif any(word in analysis_text for word in ["긍정", "좋", "만족"]):
-            return 0.4
-        elif any(word in analysis_text for word in ["부정", "나쁨", "불만"]):
-            return -0.4
-        elif any(word in analysis_text for word in ["매우 부정", "매우 나쁨", "최악"]):
-            return -0.8
-        else:
-            return 0.0  # 중립
+        with track("llm", "sentiment_analysis", model=getattr(self.llm, "model_name", None)) as record:
+            response = self.llm.invoke(messages, response_format=JSON_RESPONSE_FORMAT)
+            record_llm_call(record, messages, response)
+        return response
     
-    def _calculate_sentiment_distribution(self, text_data: List[Dict[str, Any]], overall_score: float) -> Dict[str, float]:
-        """감성 분포 계산"""
-        
-        # 간단한 분포 계산 (실제로는 각 텍스트별로 개별 분석해야 함)
-        if overall_score > 0.3:
-            return {"positive": 0.7, "neutral": 0.2, "negative": 0.1}
-        elif overall_score < -0.3:
-            return {"positive": 0.1, "neutral": 0.2, "negative": 0.7}
-        else:
-            return {"positive": 0.3, "neutral": 0.5, "negative": 0.2}
+    async def _arequest_scores(self, messages: List[Any], semaphore: asyncio.Semaphore) -> Any:
+        """동시 실행 수 제한 하에서 채점 묶음 하나를 LLM으로 비동기 채점 (이벤트 루프를 블로킹하지 않음)"""
+        
+        async with semaphore:
+            with track("llm", "sentiment_analysis", model=getattr(self.llm, "model_name", None)) as record:
+                response = await with_deadline(self.llm.ainvoke(messages, response_format=JSON_RESPONSE_FORMAT))
+                record_llm_call(record, messages, response)
+            return response
     
-    def _extract_key_emotions(self, analysis_text: str) -> List[str]:
-        """주요 감정 키워드 추출"""
+    def _build_scoring_messages(self, batch: List[Tuple[int, str]], state: FashionState) -> List[Any]:
+        """채점 묶음의 시스템/사용자 메시지 구성 (텍스트 번호는 묶음 안에서 1부터)"""
+        
+        prompts = self.prompts.get("sentiment_analysis", self._get_default_prompts()["sentiment_analysis"])
         
-        emotion_keywords = [
-            "만족", "불만", "기대", "실망", "흥미", "지루함",
-            "신뢰", "불신", "호감", "비호감", "선호", "거부감",
-            "즐거움", "불쾌", "편안함", "불편함", "안전", "불안"
+        user_prompt = prompts["user_prompt"].format(
+            text_data="\n".join(f"{number}. {text}" for number, (_, text) in enumerate(batch, 1)),
+            product_brand=state.get("target_category", "패션 제품")
+        )
+        
+        return [
+            SystemMessage(content=prompts["system_prompt"]),
+            HumanMessage(content=user_prompt)
         ]
+    
+    def _store_scores(
+        self,
+        requests: List[Tuple[List[Tuple[int, str]], List[Any]]],
+        results: List[Any],
+        item_scores: List[Dict[str, Any]],
+        state: FashionState
+    ):
+        """묶음별 채점 결과를 요청 순서대로 반영 (실패한 묶음은 건수만 degraded로 기록)"""
         
-        found_emotions = []
-        for emotion in emotion_keywords:
-            if emotion in analysis_text:
-                found_emotions.append(emotion)
+        timed_out, failed, last_error = 0, 0, None
+        
+        for (batch, messages), result in zip(requests, results):
+            if isinstance(result, DeadlineExceeded):
+                timed_out += len(batch)
+            elif isinstance(result, BaseException):
+                failed += len(batch)
+                last_error = result
+            else:
+                self._apply_llm_scores(batch, messages, result, item_scores, state)
         
-        return found_emotions[:5]  # 최대 5개
+        if timed_out:
+            mark_degraded(f"감성 분석 LLM 채점 시간 초과 {timed_out}건 (감성 사전 점수 사용)")
+        if failed:
+            mark_degraded(f"감성 분석 LLM 채점 실패 {failed}건 (감성 사전 점수 사용): {str(last_error)}")
     
-    def _extract_improvement_points(self, analysis_text: str) -> List[str]:
-        """개선 포인트 추출"""
+    def _apply_llm_scores(
+        self,
+        batch: List[Tuple[int, str]],
+        messages: List[Any],
+        response: Any,
+        item_scores: List[Dict[str, Any]],
+        state: FashionState
+    ):
+        """LLM 응답의 텍스트별 점수 반영 (응답에 없는 번호는 감성 사전 점수 유지, 캐시된 응답은 토큰 사용 없음)"""
         
-        improvement_lines = []
-        lines = analysis_text.split('\n')
+        model = served_model(response, self.llm)
+        if not is_cached_response(response):
+            update_token_usage(
+                state,
+                count_message_tokens(messages, model),
+                count_tokens(response.content, model),
+                *model_pricing(model)
+            )
         
-        in_improvement_section = False
-        for line in lines:
-            if any(keyword in line for keyword in ["개선", "향상", "보완", "권장", "제안"]):
-                in_improvement_section = True
-            
-            if in_improvement_section and line.strip():
-                improvement_lines.append(line.strip())
+        for number, score in self._parse_scores(response.content).items():
+            if 0 < number <= len(batch):
+                item_scores[batch[number - 1][0]].update(score=round(score, 3), label=label_for(score), scorer="llm", model=model)
+    
+    def _parse_scores(self, content: str) -> Dict[int, float]:
+        """채점 응답의 {텍스트 번호: 점수} (JSON이 잘렸으면 완성된 [번호, 점수] 항목만 사용)"""
+        
+        try:
+            pairs = json.loads(content[content.index("{"):content.rindex("}") + 1])["scores"]
+        except (ValueError, KeyError, TypeError):
+            pairs = SCORE_PAIR_PATTERN.findall(content)
+        
+        scores = {}
+        for pair in pairs:
+            try:
+                scores[int(pair[0])] = max(-1.0, min(1.0, float(pair[1])))
+            except (TypeError, ValueError, IndexError):
+                continue
+        return scores
+    
+    def _cache_scores(self, text_data: List[Dict[str, Any]], item_scores: List[Dict[str, Any]], keys: List[str]):
+        """새로 채점한 결과 중 확정된 결과만 캐시
+        
+        LLM 채점을 받아야 했지만 받지 못한 텍스트(실패, 상한 초과)는 다음 세션에 다시 채점합니다.
+        대체 등급 모델이 채점한 결과는 그 모델의 채점기 버전 키로 저장하여 기본 모델 결과로 재사용하지 않습니다.
+        """
+        
+        if not self.cache:
+            return
+        
+        primary = getattr(self.llm, "model_name", None)
+        scores = {}
+        for item, score, key in zip(text_data, item_scores, keys):
+            if score.get("cached") or not self._is_final(score):
+                continue
+            if score.get("model") and score["model"] != primary:
+                key = make_text_key(item["text"], scorer_version(score["model"]))
+            scores[key] = score
+        
+        self.cache.set_many(scores)
+    
+    def _is_final(self, score: Dict[str, Any]) -> bool:
+        """더 이상 재채점하지 않는 결과인지 (캐시 결과, LLM 채점 결과, hybrid 모드의 고신뢰 감성 사전 결과)"""
+        return bool(score.get("cached")) or score["scorer"] == "llm" or (
+            settings.sentiment_scoring_mode != "llm" and score["confidence"] >= settings.sentiment_escalation_confidence
+        )
+    
+    def _aggregate_scores(self, text_data: List[Dict[str, Any]], item_scores: List[Dict[str, Any]], state: FashionState):
+        """확정된 채점 결과를 카테고리/브랜드/키워드별 시간 구간 집계에 반영 (같은 텍스트는 한 번만 집계)
+        
+        재채점이 필요한 텍스트는 다음 세션에서 확정된 뒤 집계됩니다.
+        """
+        
+        if not self.aggregator:
+            return
+        
+        category = state.get("target_category")
+        keywords = (state.get("collected_data") or {}).get("keywords_used") or []
+        
+        self.aggregator.record(
+            {
+                "key": make_text_key(item["text"], "aggregate"),
+                "score": score["score"],
+                "label": score["label"],
+                "dimensions": observation_dimensions(item["text"], item["metadata"], category, keywords),
+                "timestamp": item["metadata"].get("timestamp")
+            }
+            for item, score in zip(text_data, item_scores)
+            if self._is_final(score)
+        )
+    
+    def _build_analysis_result(self, text_data: List[Dict[str, Any]], item_scores: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """텍스트별 점수를 집계하여 감성 분석 결과 구성"""
+        
+        sentiment_score = round(sum(score["score"] for score in item_scores) / len(item_scores), 3)
+        sentiment_distribution = self._calculate_sentiment_distribution(item_scores)
+        key_emotions = self._extract_key_emotions("\n".join(item["text"] for item in text_data))
+        
+        positive_terms = Counter(term for score in item_scores for term in score["positive_terms"])
+        negative_terms = Counter(term for score in item_scores for term in score["negative_terms"])
+        improvement_points = [
+            f"'{term}' 관련 부정 언급 {count}건 - 원인 확인 및 개선 필요"
+            for term, count in negative_terms.most_common(5)
+        ]
+        
+        # 결과 구조화
+        return {
+            "overall_sentiment_score": sentiment_score,
+            "sentiment_distribution": sentiment_distribution,
+            "key_emotions": key_emotions,
+            "improvement_points": improvement_points,
+            "raw_analysis": self._format_summary(sentiment_score, sentiment_distribution, positive_terms, negative_terms, improvement_points),
+            "item_scores": [
+                {
+                    "source": item["source"],
+                    "text": item["text"][:100],
+                    "score": score["score"],
+                    "label": score["label"],
+                    "confidence": score["confidence"],
+                    "scorer": score["scorer"],
+                    "cached": bool(score.get("cached"))
+                }
+                for item, score in zip(text_data, item_scores)
+            ],
+            "data_summary": {
+                "total_texts_analyzed": len(text_data),
+                "llm_scored": sum(1 for score in item_scores if score["scorer"] == "llm"),
+                "cache_hits": sum(1 for score in item_scores if score.get("cached")),
+                "sources": list(set([item["source"] for item in text_data])),
+                "analysis_timestamp": datetime.now().isoformat()
+            },
+            "detailed_insights": self._generate_detailed_insights(text_data, sentiment_score)
+        }
+    
+    def _format_summary(
+        self,
+        sentiment_score: float,
+        distribution: Dict[str, float],
+        positive_terms: Counter,
+        negative_terms: Counter,
+        improvement_points: List[str]
+    ) -> str:
+        """콘텐츠 생성 프롬프트에 넣을 감성 분석 요약 (기존 LLM 보고서 형식)"""
+        
+        def format_terms(terms: Counter) -> str:
+            return ", ".join(f"{term}({count})" for term, count in terms.most_common(5)) or "없음"
+        
+        lines = [
+            f"1. 전체 감성 점수: {sentiment_score:.2f} ({self._get_sentiment_label(sentiment_score)})",
+            f"2. 긍정/부정/중립 비율: 긍정 {distribution['positive']:.0%}, 부정 {distribution['negative']:.0%}, 중립 {distribution['neutral']:.0%}",
+            "3. 주요 키워드 감성 분석",
+            f"- 긍정 키워드: {format_terms(positive_terms)}",
+            f"- 부정 키워드: {format_terms(negative_terms)}",
+            "4. 개선 포인트 제안"
+        ]
+        lines.extend(f"- {point}" for point in improvement_points or ["뚜렷한 부정 키워드가 없습니다."])
+        
+        return "\n".join(lines)
+    
+    def _calculate_sentiment_distribution(self, item_scores: List[Dict[str, Any]]) -> Dict[str, float]:
+        """텍스트별 라벨로 감성 분포 계산"""
+        
+        labels = Counter(score["label"] for score in item_scores)
+        total = len(item_scores) or 1
+        return {label: round(labels[label] / total, 3) for label in ("positive", "neutral", "negative")}
+    
+    def _extract_key_emotions(self, analysis_text: str) -> List[str]:
+        """주요 감정 키워드 추출"""
         
-        return improvement_lines[:5]  # 최대 5개
+        return EMOTION_KEYWORD_MATCHER.find(analysis_text)[:5]  # 최대 5개
     
     def _generate_detailed_insights(self, text_data: List[Dict[str, Any]], sentiment_score: float) -> Dict[str, Any]:
         """상세 인사이트 생성"""
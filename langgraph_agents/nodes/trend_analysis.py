@@ -2,42 +2,46 @@
 Fashion AI Automation System - Trend Analysis Node
 """
 
-import yaml
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from ..state import FashionState, update_state_step, add_error_to_state, update_token_usage
-from config.settings import settings
+from config.settings import settings, load_prompts
+from tools.llm_gateway import GatewayChatModel, served_model
+from tools.llm_router import get_routed_llm, get_tier, tier_config, model_pricing
+from tools.llm_cache import is_cached_response
+from utils.metrics import track, record_llm_call
+from utils.token_counter import count_tokens, count_message_tokens
+from utils.deadline import DeadlineExceeded, with_deadline, mark_degraded
+from utils.helpers import clean_text, extract_keywords, safe_int
+from utils.prompt_packer import pack_sections, data_token_budget, signal_score
+from utils.streaming import stream_kwargs
+from utils.keyword_matcher import KeywordMatcher
+
+
+# 분석 텍스트 섹션 표시 키워드
+SUMMARY_MARKER_MATCHER = KeywordMatcher(["요약", "주요", "핵심"])
+PREDICTION_MARKER_MATCHER = KeywordMatcher(["예측", "향후", "미래", "전망"])
+PREDICTION_END_MATCHER = KeywordMatcher(["제안", "권장", "결론"])
+RECOMMENDATION_MARKER_MATCHER = KeywordMatcher(["제안", "권장", "추천", "비즈니스"])
 
 
 class TrendAnalysisNode:
     """트렌드 분석을 담당하는 LangGraph 노드"""
     
-    def __init__(self):
+    def __init__(self, llm: Optional[GatewayChatModel] = None):
         try:
-            # OpenAI 설정에서 API 키 가져오기
-            api_key = settings.openai_api_key
-            if not api_key:
-                # Streamlit secrets에서 가져오기 시도
-                try:
-                    import streamlit as st
-                    api_key = st.secrets.get("OPENAI_API_KEY", "")
-                except:
-                    pass
+            # 레지스트리에서 공유 LLM이 주입되지 않은 경우 라우팅 테이블의 등급으로 생성
+            if llm is None:
+                llm = get_routed_llm("trend_analysis")
             
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=settings.openai_temperature,
-                max_tokens=settings.max_tokens,
-                api_key=api_key
-            )
+            self.llm = llm
             
             # 프롬프트 템플릿 로드
             self.prompts = self._load_prompts()
-            
+        
         except Exception as e:
             print(f"TrendAnalysisNode 초기화 오류: {str(e)}")
             self.llm = None
@@ -60,7 +64,7 @@ class TrendAnalysisNode:
                 return state
             
             # 데이터 전처리
-            processed_data = self._preprocess_data(collected_data)
+            processed_data = self._preprocess_data(collected_data, state)
             
             # LLM을 통한 트렌드 분석
             analysis_result = self._analyze_trends(processed_data, state)
@@ -69,7 +73,38 @@ class TrendAnalysisNode:
             state["trend_analysis"] = analysis_result
             
             state = update_state_step(state, "트렌드 분석 완료")
+        
+        except Exception as e:
+            state = add_error_to_state(state, f"트렌드 분석 오류: {str(e)}")
+        
+        return state
+    
+    async def aexecute(self, state: FashionState) -> FashionState:
+        """트렌드 분석 노드 비동기 실행"""
+        
+        try:
+            state = update_state_step(state, "트렌드 분석 시작")
+            
+            if not self.llm:
+                raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
+            
+            collected_data = state.get("collected_data", {})
+            
+            if not collected_data:
+                state = add_error_to_state(state, "분석할 데이터가 없습니다.")
+                return state
+            
+            processed_data = self._preprocess_data(collected_data, state)
+            
+            try:
+                state["trend_analysis"] = await self._aanalyze_trends(processed_data, state)
+            except DeadlineExceeded:
+                # 마감 시간 내 LLM 응답을 받지 못한 경우 수집 데이터 키워드로 대체
+                mark_degraded("트렌드 분석 LLM 호출 시간 초과 (수집 데이터 키워드 요약으로 대체)")
+                state["trend_analysis"] = self._build_degraded_result(processed_data, state)
             
+            state = update_state_step(state, "트렌드 분석 완료")
+        
         except Exception as e:
             state = add_error_to_state(state, f"트렌드 분석 오류: {str(e)}")
         
@@ -78,8 +113,7 @@ class TrendAnalysisNode:
     def _load_prompts(self) -> Dict[str, Any]:
         """프롬프트 템플릿을 로드합니다"""
         try:
-            with open("config/prompts.yaml", "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+            return load_prompts()
         except Exception as e:
             print(f"프롬프트 로드 오류: {str(e)}")
             return self._get_default_prompts()
@@ -113,58 +147,97 @@ class TrendAnalysisNode:
             }
         }
     
-    def _preprocess_data(self, collected_data: Dict[str, Any]) -> str:
-        """수집된 데이터를 LLM 분석용으로 전처리"""
-        
-        processed_parts = []
-        
-        # 네이버 쇼핑 데이터 요약
-        naver_data = collected_data.get("naver_shopping", [])
-        if naver_data:
-            naver_summary = f"네이버 쇼핑 데이터 ({len(naver_data)}건):\n"
-            for item in naver_data[:10]:  # 최대 10개만 포함
-                title = item.get("title", "").replace("<b>", "").replace("</b>", "")
-                price = item.get("lprice", "")
-                brand = item.get("brand", "")
-                naver_summary += f"- {title} | {brand} | {price}원\n"
-            processed_parts.append(naver_summary)
-        
-        # 웹 스크래핑 데이터 요약
-        web_data = collected_data.get("web_scraping", [])
-        if web_data:
-            web_summary = f"웹 스크래핑 데이터 ({len(web_data)}건):\n"
-            for item in web_data:
-                title = item.get("title", "")
-                content = item.get("content", "")[:200]  # 200자까지만
-                web_summary += f"- {title}: {content}...\n"
-            processed_parts.append(web_summary)
-        
-        # SNS 데이터 요약
-        social_data = collected_data.get("social_media", [])
-        if social_data:
-            social_summary = f"SNS 데이터 ({len(social_data)}건):\n"
-            for item in social_data:
-                content = item.get("content", "")
-                platform = item.get("platform", "")
-                likes = item.get("likes", 0)
-                social_summary += f"- {platform}: {content} (좋아요 {likes}개)\n"
-            processed_parts.append(social_summary)
-        
-        return "\n\n".join(processed_parts)
+    def _preprocess_data(self, collected_data: Dict[str, Any], state: FashionState) -> str:
+        """수집된 데이터를 토큰 예산 안에서 LLM 분석용으로 전처리
+        
+        중복을 제거하고 신호(검색 순위, 좋아요 수)가 높은 항목을 우선 선택하되,
+        같은 출처/브랜드/가격대가 몰리지 않도록 다양성을 반영합니다.
+        """
+        
+        sections = [
+            ("네이버 쇼핑 데이터", self._naver_items(collected_data.get("naver_shopping", []))),
+            ("웹 스크래핑 데이터", self._web_items(collected_data.get("web_scraping", []))),
+            ("SNS 데이터", self._social_items(collected_data.get("social_media", [])))
+        ]
+        
+        return pack_sections(sections, self._data_token_budget(state), getattr(self.llm, "model_name", None))
+    
+    def _data_token_budget(self, state: FashionState) -> int:
+        """프롬프트 템플릿과 응답 몫을 제외한 수집 데이터용 토큰 수
+        
+        응답 몫은 라우팅된 모델 등급의 최대 출력 토큰 수를 사용합니다.
+        """
+        
+        system_prompt, empty_prompt = self._build_prompts("", state)
+        max_tokens = getattr(self.llm, "max_tokens", None) or tier_config(get_tier("trend_analysis"))["max_tokens"]
+        
+        return data_token_budget(
+            system_prompt,
+            empty_prompt,
+            getattr(self.llm, "model_name", None),
+            max_tokens,
+            settings.max_prompt_tokens,
+            settings.prompt_data_tokens
+        )
+    
+    def _naver_items(self, naver_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """네이버 쇼핑 항목 (검색 순위가 높을수록 높은 점수, 브랜드/가격대별 다양성 그룹)"""
+        
+        prices = sorted(safe_int(item.get("lprice")) for item in naver_data if safe_int(item.get("lprice")) > 0)
+        bands = [prices[len(prices) // 3], prices[2 * len(prices) // 3]] if prices else []
+        
+        items = []
+        for rank, item in enumerate(naver_data):
+            brand = item.get("brand", "")
+            lprice = safe_int(item.get("lprice"))
+            hprice = safe_int(item.get("hprice"))
+            price = f"{lprice:,}~{hprice:,}원" if hprice > lprice else f"{lprice:,}원"
+            band = sum(1 for bound in bands if lprice >= bound)
+            
+            items.append({
+                "text": item.get("title", ""),
+                "prefix": "- ",
+                "suffix": f" | {brand} | {price}" if brand else f" | {price}",
+                "score": 0.5 + 0.5 / (1 + rank / 10),
+                "groups": [f"brand:{brand or item.get('mallName', '')}", f"price:{band}"]
+            })
+        
+        return items
+    
+    def _web_items(self, web_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """웹 스크래핑 항목 (사이트별 다양성 그룹)"""
+        
+        return [
+            {
+                "text": f"{item.get('title', '')}: {item.get('content', '')}",
+                "prefix": "- ",
+                "score": 0.75,
+                "groups": [f"site:{item.get('source') or item.get('url', '')}"]
+            }
+            for item in web_data
+        ]
+    
+    def _social_items(self, social_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """SNS 항목 (좋아요 수 기반 점수, 플랫폼별 다양성 그룹)"""
+        
+        max_likes = max((safe_int(item.get("likes")) for item in social_data), default=0)
+        
+        return [
+            {
+                "text": item.get("content", ""),
+                "prefix": f"- {item.get('platform', '')}: ",
+                "suffix": f" (좋아요 {safe_int(item.get('likes'))}개)",
+                "score": signal_score(safe_int(item.get("likes")), max_likes),
+                "groups": [f"platform:{item.get('platform', '')}"]
+            }
+            for item in social_data
+        ]
     
     def _analyze_trends(self, processed_data: str, state: FashionState) -> Dict[str, Any]:
         """LLM을 통한 트렌드 분석 수행"""
         
         try:
-            # 프롬프트 구성
-            prompts = self.prompts.get("trend_analysis", self._get_default_prompts()["trend_analysis"])
-            
-            system_prompt = prompts["system_prompt"]
-            user_prompt = prompts["user_prompt"].format(
-                collected_data=processed_data,
-                analysis_period=state.get("analysis_period", "최근 1개월"),
-                target_category=state.get("target_category", "전체")
-            )
+            system_prompt, user_prompt = self._build_prompts(processed_data, state)
             
             # LLM 호출
             messages = [
@@ -172,39 +245,116 @@ class TrendAnalysisNode:
                 HumanMessage(content=user_prompt)
             ]
             
-            response = self.llm.invoke(messages)
+            with track("llm", "trend_analysis", model=getattr(self.llm, "model_name", None)) as record:
+                response = self.llm.invoke(messages, **stream_kwargs(state, "trend_analysis"))
+                record_llm_call(record, messages, response)
+            
+            return self._build_analysis_result(
+                response.content, system_prompt, user_prompt, state,
+                cached=is_cached_response(response), model=served_model(response, self.llm)
+            )
+        
+        except Exception as e:
+            raise Exception(f"LLM 트렌드 분석 오류: {str(e)}")
+    
+    async def _aanalyze_trends(self, processed_data: str, state: FashionState) -> Dict[str, Any]:
+        """LLM을 통한 트렌드 분석 비동기 수행"""
+        
+        try:
+            system_prompt, user_prompt = self._build_prompts(processed_data, state)
+            
+            # LLM 비동기 호출 (이벤트 루프를 블로킹하지 않음)
+            messages = [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_prompt)
+            ]
             
-            # 토큰 사용량 추적 (근사치)
-            input_tokens = len(system_prompt + user_prompt) // 4  # 대략적인 토큰 계산
-            output_tokens = len(response.content) // 4
+            with track("llm", "trend_analysis", model=getattr(self.llm, "model_name", None)) as record:
+                response = await with_deadline(self.llm.ainvoke(messages, **stream_kwargs(state, "trend_analysis")))
+                record_llm_call(record, messages, response)
             
+            return self._build_analysis_result(
+                response.content, system_prompt, user_prompt, state,
+                cached=is_cached_response(response), model=served_model(response, self.llm)
+            )
+        
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"LLM 트렌드 분석 오류: {str(e)}")
+    
+    def _build_degraded_result(self, processed_data: str, state: FashionState) -> Dict[str, Any]:
+        """마감 시간 초과 시 LLM 없이 수집 데이터 키워드로 구성한 부분 결과"""
+        
+        key_trends = extract_keywords(clean_text(processed_data), max_keywords=5)
+        
+        return {
+            "raw_analysis": "",
+            "summary": f"시간 제한으로 상세 분석을 생략했습니다. 수집 데이터 주요 키워드: {', '.join(key_trends)}",
+            "key_trends": key_trends,
+            "predictions": [],
+            "business_recommendations": [],
+            "analysis_timestamp": datetime.now().isoformat(),
+            "data_sources_count": {
+                "naver_shopping": len(state.get("naver_shopping_data", [])),
+                "web_scraping": len(state.get("web_scraping_data", [])),
+                "social_media": len(state.get("social_media_data", []))
+            },
+            "degraded": True
+        }
+    
+    def _build_prompts(self, processed_data: str, state: FashionState) -> Tuple[str, str]:
+        """트렌드 분석용 시스템/사용자 프롬프트 구성"""
+        
+        prompts = self.prompts.get("trend_analysis", self._get_default_prompts()["trend_analysis"])
+        
+        system_prompt = prompts["system_prompt"]
+        user_prompt = prompts["user_prompt"].format(
+            collected_data=processed_data,
+            analysis_period=state.get("analysis_period", "최근 1개월"),
+            target_category=state.get("target_category", "전체")
+        )
+        
+        return system_prompt, user_prompt
+    
+    def _build_analysis_result(
+        self,
+        content: str,
+        system_prompt: str,
+        user_prompt: str,
+        state: FashionState,
+        cached: bool = False,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """LLM 응답으로 토큰 사용량을 기록하고 분석 결과를 구조화 (캐시된 응답은 토큰 사용 없음, model은 응답을 실제로 생성한 모델)"""
+        
+        # 토큰 사용량 추적 (로컬 토크나이저 기준)
+        model = model or getattr(self.llm, "model_name", None)
+        input_tokens = count_message_tokens([system_prompt, user_prompt], model)
+        output_tokens = count_tokens(content, model)
+        
+        if not cached:
             state = update_token_usage(
                 state, 
                 input_tokens, 
                 output_tokens,
-                settings.token_cost_per_1k_input,
-                settings.token_cost_per_1k_output
+                *model_pricing(model)
             )
-            
-            # 결과 구조화
-            analysis_result = {
-                "raw_analysis": response.content,
-                "summary": self._extract_summary(response.content),
-                "key_trends": self._extract_key_trends(response.content),
-                "predictions": self._extract_predictions(response.content),
-                "business_recommendations": self._extract_recommendations(response.content),
-                "analysis_timestamp": datetime.now().isoformat(),
-                "data_sources_count": {
-                    "naver_shopping": len(state.get("naver_shopping_data", [])),
-                    "web_scraping": len(state.get("web_scraping_data", [])),
-                    "social_media": len(state.get("social_media_data", []))
-                }
+        
+        # 결과 구조화
+        return {
+            "raw_analysis": content,
+            "summary": self._extract_summary(content),
+            "key_trends": self._extract_key_trends(content),
+            "predictions": self._extract_predictions(content),
+            "business_recommendations": self._extract_recommendations(content),
+            "analysis_timestamp": datetime.now().isoformat(),
+            "data_sources_count": {
+                "naver_shopping": len(state.get("naver_shopping_data", [])),
+                "web_scraping": len(state.get("web_scraping_data", [])),
+                "social_media": len(state.get("social_media_data", []))
             }
-            
-            return analysis_result
-            
-        except Exception as e:
-            raise Exception(f"LLM 트렌드 분석 오류: {str(e)}")
+        }
     
     def _extract_summary(self, analysis_text: str) -> str:
         """분석 텍스트에서 요약 추출"""
@@ -212,7 +362,7 @@ class TrendAnalysisNode:
         summary_lines = []
         
         for line in lines:
-            if any(keyword in line for keyword in ["요약", "주요", "핵심"]):
+            if SUMMARY_MARKER_MATCHER.contains_any(line):
                 summary_lines.append(line.strip())
         
         return ' '.join(summary_lines) if summary_lines else analysis_text[:200] + "..."
@@ -239,14 +389,14 @@ class TrendAnalysisNode:
         
         in_prediction_section = False
         for line in lines:
-            if any(keyword in line for keyword in ["예측", "향후", "미래", "전망"]):
+            if PREDICTION_MARKER_MATCHER.contains_any(line):
                 in_prediction_section = True
             
             if in_prediction_section and line.strip():
                 predictions.append(line.strip())
-                
+            
             # 다른 섹션이 시작되면 종료
-            if in_prediction_section and any(keyword in line for keyword in ["제안", "권장", "결론"]):
+            if in_prediction_section and PREDICTION_END_MATCHER.contains_any(line):
                 break
         
         return predictions[:3]  # 최대 3개
@@ -258,7 +408,7 @@ class TrendAnalysisNode:
         
         in_recommendation_section = False
         for line in lines:
-            if any(keyword in line for keyword in ["제안", "권장", "추천", "비즈니스"]):
+            if RECOMMENDATION_MARKER_MATCHER.contains_any(line):
                 in_recommendation_section = True
             
             if in_recommendation_section and line.strip():
@@ -0,0 +1,149 @@
+"""
+Fashion AI Automation System - Node & Client Registry
+
+노드 인스턴스와 외부 클라이언트(LLM, 네이버, 스크래퍼, OpenSearch)를
+프로세스 단위로 한 번만 생성하여 여러 단계와 세션에서 재사용합니다.
+LLM 호출은 모두 tools.llm_gateway의 공용 게이트웨이를 거치며,
+노드별 모델 등급은 tools.llm_router의 라우팅 테이블을 따릅니다.
+"""
+
+import threading
+from typing import Dict, Any, Callable, Optional, List
+
+from config.settings import load_prompts, get_prompts_version
+from tools.naver_api import NaverAPIClient
+from tools.web_scraper import WebScraper
+from tools.opensearch_client import OpenSearchClient
+from tools.llm_gateway import GatewayChatModel, reset_llm_gateway
+from tools.llm_router import get_routed_llm
+from .nodes.data_collection import DataCollectionNode
+from .nodes.trend_analysis import TrendAnalysisNode
+from .nodes.sentiment_analysis import SentimentAnalysisNode
+from .nodes.content_generation import ContentGenerationNode
+from .nodes.human_feedback import HumanFeedbackNode
+
+
+class NodeRegistry:
+    """장기 생존 노드와 공유 클라이언트를 관리하는 레지스트리"""
+    
+    NODE_NAMES = [
+        "data_collection",
+        "trend_analysis",
+        "sentiment_analysis",
+        "content_generation",
+        "human_feedback"
+    ]
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+    
+    def _get_or_create(self, key: str, factory: Callable[[], Any]) -> Any:
+        """인스턴스를 최초 1회만 생성 (스레드 안전)"""
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+        
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = factory()
+            return self._instances[key]
+    
+    # ---- 공유 클라이언트 ----
+    
+    def get_naver_client(self) -> NaverAPIClient:
+        """공유 네이버 API 클라이언트"""
+        return self._get_or_create("client:naver", NaverAPIClient)
+    
+    def get_web_scraper(self) -> WebScraper:
+        """공유 웹 스크래퍼 (HTTP 세션 재사용)"""
+        return self._get_or_create("client:web_scraper", WebScraper)
+    
+    def get_opensearch_client(self) -> OpenSearchClient:
+        """공유 OpenSearch 클라이언트 (연결 및 ping은 최초 1회)"""
+        return self._get_or_create("client:opensearch", OpenSearchClient)
+    
+    def get_llm(self, task: str) -> Optional[GatewayChatModel]:
+        """작업별 공유 LLM (라우팅 테이블의 모델 등급 사용, 모든 호출은 공용 게이트웨이를 거침)"""
+        return self._get_or_create(f"llm:{task}", lambda: self._create_llm(task))
+    
+    def _create_llm(self, task: str) -> Optional[GatewayChatModel]:
+        """작업에 맞는 등급의 게이트웨이 채팅 모델 생성"""
+        try:
+            return get_routed_llm(task)
+        except Exception as e:
+            print(f"공유 LLM 클라이언트 생성 오류: {str(e)}")
+            return None
+    
+    # ---- 노드 ----
+    
+    def get_node(self, name: str) -> Any:
+        """이름으로 공유 노드 인스턴스 조회"""
+        factories = {
+            "data_collection": lambda: DataCollectionNode(
+                naver_client=self.get_naver_client(),
+                web_scraper=self.get_web_scraper(),
+                opensearch_client=self.get_opensearch_client()
+            ),
+            "trend_analysis": lambda: TrendAnalysisNode(llm=self.get_llm("trend_analysis")),
+            "sentiment_analysis": lambda: SentimentAnalysisNode(llm=self.get_llm("sentiment_analysis")),
+            "content_generation": lambda: ContentGenerationNode(llm=self.get_llm("content_generation")),
+            "human_feedback": lambda: HumanFeedbackNode(llm=self.get_llm("human_feedback")),
+        }
+        
+        if name not in factories:
+            raise KeyError(f"등록되지 않은 노드입니다: {name}")
+        
+        return self._get_or_create(f"node:{name}", factories[name])
+    
+    def warm_up(self, node_names: Optional[List[str]] = None) -> Dict[str, bool]:
+        """프롬프트, 클라이언트, 노드를 미리 생성하여 첫 세션의 초기화 지연을 제거"""
+        status = {}
+        
+        try:
+            load_prompts()
+            status["prompts"] = True
+        except Exception as e:
+            print(f"프롬프트 워밍업 오류: {str(e)}")
+            status["prompts"] = False
+        
+        for name in node_names or self.NODE_NAMES:
+            try:
+                node = self.get_node(name)
+                # LLM 노드는 클라이언트 생성 성공 여부를 함께 확인
+                status[name] = getattr(node, "llm", True) is not None
+            except Exception as e:
+                print(f"{name} 노드 워밍업 오류: {str(e)}")
+                status[name] = False
+        
+        return status
+    
+    def reset(self):
+        """모든 공유 인스턴스 제거 (설정 변경 후 재생성 또는 테스트용)"""
+        with self._lock:
+            self._instances.clear()
+        reset_llm_gateway()
+        load_prompts.cache_clear()
+        get_prompts_version.cache_clear()
+
+
+# 프로세스 전역 레지스트리
+_registry: Optional[NodeRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> NodeRegistry:
+    """프로세스 전역 레지스트리 반환"""
+    global _registry
+    
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = NodeRegistry()
+    
+    return _registry
+
+
+def warm_up(node_names: Optional[List[str]] = None) -> Dict[str, bool]:
+    """프로세스 전역 레지스트리 워밍업"""
+    return get_registry().warm_up(node_names)
@@ -0,0 +1,87 @@
+"""
+Fashion AI Automation System - Workflow Result Cache
+
+요청 파라미터(user_request, target_category, target_demographics, analysis_period)를
+정규화한 해시와 프롬프트 템플릿 버전, 작업별 모델 라우팅 테이블을 키로 워크플로우 최종 결과를 캐시합니다.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from config.settings import settings, get_prompts_version
+from utils.disk_cache import DiskCache
+from tools.llm_router import routing_table
+from .state import FashionState
+
+
+# 캐시 키를 구성하는 요청 파라미터
+REQUEST_KEY_FIELDS = ("user_request", "target_category", "target_demographics", "analysis_period")
+
+# 세션마다 달라지므로 캐시된 결과 대신 현재 요청 값을 사용하는 키
+SESSION_FIELDS = ("session_id", "timestamp", "user_id", "budget_pool")
+
+
+def _normalize(value: Any) -> Any:
+    """공백/대소문자 차이를 제거하여 거의 같은 요청이 같은 키를 갖도록 정규화"""
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_request_key(state: FashionState) -> str:
+    """요청 파라미터 기반 캐시 키 생성"""
+    payload = {
+        "request": {field: _normalize(state.get(field)) for field in REQUEST_KEY_FIELDS},
+        "prompts_version": get_prompts_version(),
+        "routing": routing_table()
+    }
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class WorkflowResultCache:
+    """워크플로우 결과 디스크 캐시"""
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.cache = DiskCache(
+            db_path or settings.result_cache_path,
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else settings.result_cache_ttl,
+            max_entries=max_entries if max_entries is not None else settings.result_cache_max_entries
+        )
+    
+    def get(self, initial_state: FashionState) -> Optional[FashionState]:
+        """캐시된 결과를 현재 세션 정보로 반환 (없으면 None)"""
+        cached = self.cache.get(make_request_key(initial_state))
+        if cached is None:
+            return None
+        
+        for field in SESSION_FIELDS:
+            cached[field] = initial_state.get(field)
+        
+        # 캐시 적중 시에는 새로 사용한 토큰/비용이 없음
+        cached["token_usage"] = {key: 0 for key in cached.get("token_usage", {})}
+        cached["costs"] = {key: 0.0 for key in cached.get("costs", {})}
+        
+        return cached
+    
+    def set(self, initial_state: FashionState, final_state: FashionState) -> bool:
+        """오류 없이 전체 결과로 완료된 결과만 저장 (계측 레코드는 원래 실행에만 해당하므로 제외)"""
+        if final_state.get("errors") or final_state.get("degraded"):
+            return False
+        
+        result = {key: value for key, value in final_state.items() if key != "metrics"}
+        return self.cache.set(make_request_key(initial_state), result)
+    
+    def invalidate(self, initial_state: FashionState) -> bool:
+        """요청에 해당하는 캐시 항목 삭제"""
+        return self.cache.delete(make_request_key(initial_state))
@@ -0,0 +1,295 @@
+"""
+Fashion AI Automation System - Windowed Sentiment Aggregator
+
+채점된 텍스트의 감성 점수를 카테고리/브랜드/키워드별, 시간 단위(hour/day/week)별
+구간에 누적하는 증분 집계 저장소입니다 (로컬 SQLite).
+
+- 텍스트 하나를 기록할 때 (차원 값 수 x 시간 단위 수)개 구간의 합/개수만 갱신 (O(1))
+- 같은 텍스트(정규화한 텍스트 해시)는 중복 집계 기간 동안 차원 값마다 한 번만 집계되므로 세션/DAG
+  실행마다 같은 상품명, 게시글이 다시 수집되어도 누적값이 부풀지 않음 (다른 카테고리/키워드로
+  다시 수집되면 새 차원 값에는 집계됨)
+- 고정(tumbling) 창은 구간별 값, 이동(sliding) 창은 최근 N개 구간의 합으로 조회
+  (이동 창은 구간 단위로 움직이며 현재 진행 중인 구간을 포함)
+- 구간 경계는 서버 로컬 시간 기준이며 주 단위는 월요일 0시부터 시작
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from config.settings import settings
+from utils.keyword_matcher import get_keyword_matcher
+
+
+# 집계 차원
+DIMENSIONS = ("category", "brand", "keyword")
+
+# 시간 단위별 구간 길이 (초)
+GRANULARITIES = {"hour": 3600, "day": 86400, "week": 604800}
+
+# 구간 경계 보정 (로컬 시간 자정, 주 단위는 월요일 - 1970-01-01은 목요일)
+_UTC_OFFSET = datetime.now().astimezone().utcoffset().total_seconds()
+_WEEK_OFFSET = 3 * 86400
+
+
+def bucket_start(timestamp: float, granularity: str) -> int:
+    """타임스탬프가 속한 구간의 시작 시각 (epoch 초)"""
+    size = GRANULARITIES[granularity]
+    shift = _UTC_OFFSET + (_WEEK_OFFSET if granularity == "week" else 0)
+    return int((timestamp + shift) // size * size - shift)
+
+
+def _summarize(count: int, score_sum: float, positive: int, neutral: int, negative: int) -> Dict[str, Any]:
+    """누적 합/개수를 평균 점수와 라벨 비율로 변환"""
+    return {
+        "count": count,
+        "mean_score": round(score_sum / count, 3) if count else 0.0,
+        "distribution": {
+            "positive": round(positive / count, 3) if count else 0.0,
+            "neutral": round(neutral / count, 3) if count else 0.0,
+            "negative": round(negative / count, 3) if count else 0.0
+        }
+    }
+
+
+class SentimentAggregator:
+    """차원 값/시간 구간별 감성 점수 합과 개수 저장소 (SQLite)"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.sentiment_aggregate_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._initialize()
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """요청마다 새 연결 사용"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _initialize(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    dimension TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    granularity TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    score_sum REAL NOT NULL DEFAULT 0,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    positive INTEGER NOT NULL DEFAULT 0,
+                    neutral INTEGER NOT NULL DEFAULT 0,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dimension, value, granularity, bucket_start)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_start ON buckets (granularity, bucket_start)")
+            # 텍스트 단위 중복 기록(이전 스키마)은 차원 값 단위 기록으로 대체
+            conn.execute("DROP TABLE IF EXISTS observed")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS observed_values (
+                    key TEXT NOT NULL,
+                    dimension TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    PRIMARY KEY (key, dimension, value)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_observed_at ON observed_values (observed_at)")
+    
+    def record(self, observations: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """채점된 텍스트를 구간별 누적값에 반영 (텍스트가 이미 집계된 차원 값은 제외)
+        
+        Args:
+            observations: {"key": 텍스트 키, "score": 점수, "label": 라벨,
+                           "dimensions": [(차원, 값), ...], "timestamp": 작성 시각 (ISO 문자열/epoch 초, 없으면 now)}
+        
+        Returns:
+            새 차원 값에 하나 이상 집계한 텍스트 수
+        """
+        now = time.time() if now is None else now
+        oldest = {
+            granularity: now - settings.sentiment_aggregate_retention.get(granularity, 0) * size
+            for granularity, size in GRANULARITIES.items()
+        }
+        
+        try:
+            with self._lock, self._connect() as conn:
+                self._prune(conn, now, oldest)
+                
+                recorded, rows = 0, []
+                for observation in observations:
+                    dimensions = [
+                        (dimension, value) for dimension, value in dict.fromkeys(observation["dimensions"])
+                        if conn.execute(
+                            "INSERT OR IGNORE INTO observed_values VALUES (?, ?, ?, ?)",
+                            (observation["key"], dimension, value, now)
+                        ).rowcount
+                    ]
+                    if not dimensions:
+                        continue
+                    
+                    recorded += 1
+                    timestamp = to_timestamp(observation.get("timestamp"), now)
+                    label = observation["label"]
+                    counts = (int(label == "positive"), int(label == "neutral"), int(label == "negative"))
+                    
+                    for granularity in GRANULARITIES:
+                        if timestamp < oldest[granularity]:
+                            continue
+                        start = bucket_start(timestamp, granularity)
+                        for dimension, value in dimensions:
+                            rows.append((dimension, value, granularity, start, observation["score"], *counts))
+                
+                conn.executemany(
+                    """
+                    INSERT INTO buckets VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (dimension, value, granularity, bucket_start) DO UPDATE SET
+                        score_sum = score_sum + excluded.score_sum,
+                        count = count + 1,
+                        positive = positive + excluded.positive,
+                        neutral = neutral + excluded.neutral,
+                        negative = negative + excluded.negative
+                    """,
+                    rows
+                )
+            
+            return recorded
+        
+        except sqlite3.Error as e:
+            print(f"감성 집계 기록 오류: {e}")
+            return 0
+    
+    def _prune(self, conn: sqlite3.Connection, now: float, oldest: Dict[str, float]):
+        """보관 기간이 지난 구간과 중복 집계 기록 삭제"""
+        for granularity, cutoff in oldest.items():
+            conn.execute(
+                "DELETE FROM buckets WHERE granularity = ? AND bucket_start < ?",
+                (granularity, bucket_start(cutoff, granularity))
+            )
+        conn.execute("DELETE FROM observed_values WHERE observed_at < ?", (now - settings.sentiment_aggregate_dedupe_seconds,))
+    
+    def _recent_starts(self, granularity: str, periods: int, now: Optional[float]) -> List[int]:
+        """현재 구간을 포함한 최근 N개 구간의 시작 시각 (오래된 순)"""
+        size = GRANULARITIES[granularity]
+        current = bucket_start(time.time() if now is None else now, granularity)
+        return [current - size * offset for offset in range(periods - 1, -1, -1)]
+    
+    def series(
+        self,
+        dimension: str,
+        value: str,
+        granularity: str = "day",
+        periods: int = 7,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """고정(tumbling) 창 - 최근 N개 구간별 집계 (데이터가 없는 구간은 0)"""
+        starts = self._recent_starts(granularity, periods, now)
+        
+        try:
+            with self._lock, self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT bucket_start, count, score_sum, positive, neutral, negative FROM buckets
+                    WHERE dimension = ? AND value = ? AND granularity = ? AND bucket_start >= ?
+                    """,
+                    (dimension, value, granularity, starts[0])
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"감성 집계 조회 오류: {e}")
+            rows = []
+        
+        by_start = {row[0]: row[1:] for row in rows}
+        return [
+            {"bucket_start": datetime.fromtimestamp(start).isoformat(), **_summarize(*by_start.get(start, (0, 0.0, 0, 0, 0)))}
+            for start in starts
+        ]
+    
+    def window(
+        self,
+        dimension: str,
+        value: str,
+        granularity: str = "day",
+        periods: int = 7,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """이동(sliding) 창 - 최근 N개 구간 합계 (예: hour x 24 = 최근 24시간)"""
+        return self.ranking(dimension, granularity, periods, values=[value], now=now).get(value) or _summarize(0, 0.0, 0, 0, 0)
+    
+    def ranking(
+        self,
+        dimension: str,
+        granularity: str = "day",
+        periods: int = 7,
+        limit: Optional[int] = None,
+        values: Optional[List[str]] = None,
+        now: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """이동 창 기준 차원 값별 집계 (텍스트 수가 많은 순)"""
+        starts = self._recent_starts(granularity, periods, now)
+        query = """
+            SELECT value, SUM(count), SUM(score_sum), SUM(positive), SUM(neutral), SUM(negative) FROM buckets
+            WHERE dimension = ? AND granularity = ? AND bucket_start >= ?
+        """
+        params: List[Any] = [dimension, granularity, starts[0]]
+        
+        if values is not None:
+            query += f" AND value IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+        
+        query += " GROUP BY value ORDER BY SUM(count) DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        try:
+            with self._lock, self._connect() as conn:
+                rows = conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"감성 집계 조회 오류: {e}")
+            rows = []
+        
+        return {row[0]: _summarize(*row[1:]) for row in rows}
+
+
+def observation_dimensions(
+    text: str,
+    metadata: Dict[str, Any],
+    category: Optional[str],
+    keywords: Iterable[str]
+) -> List[Tuple[str, str]]:
+    """텍스트의 집계 차원 값 (요청 카테고리와 상품 카테고리, 브랜드, 텍스트에 등장한 수집 키워드)"""
+    dimensions = []
+    
+    for value in dict.fromkeys([category, metadata.get("category")]):
+        if value and value != "전체":
+            dimensions.append(("category", value))
+    
+    if metadata.get("brand"):
+        dimensions.append(("brand", metadata["brand"]))
+    
+    for keyword in get_keyword_matcher(tuple(keywords), ignore_case=True).find(text):
+        dimensions.append(("keyword", keyword))
+    
+    return dimensions
+
+
+def to_timestamp(value: Any, now: float) -> float:
+    """작성 시각(ISO 문자열/epoch 초)을 epoch 초로 변환 (없거나 읽을 수 없거나 미래 시각이면 now)"""
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value).timestamp()
+        return min(float(value), now) if value else now
+    except (TypeError, ValueError):
+        return now
+
@@ -0,0 +1,70 @@
+"""
+Fashion AI Automation System - Sentiment Cache
+
+텍스트별 감성 채점 결과를 세션/배치 실행 간에 공유하는 캐시입니다.
+
+정규화한 텍스트(HTML 태그/연속 공백 제거, 소문자, NFC) 해시와 채점기 버전(감성 사전 버전,
+채점 모드와 재채점 기준, LLM 모델, 프롬프트 템플릿 버전)을 키로 사용하므로,
+사전이나 프롬프트가 바뀌면 이전 결과는 사용되지 않습니다.
+"""
+
+import hashlib
+import unicodedata
+from typing import Dict, List, Any, Optional
+
+from config.settings import settings, get_prompts_version
+from utils.disk_cache import DiskCache
+from utils.prompt_packer import compact_text
+from utils.sentiment_lexicon import LEXICON_VERSION
+
+
+# 캐시에 저장하는 채점 결과 필드
+CACHED_FIELDS = ("score", "label", "confidence", "scorer", "positive_terms", "negative_terms")
+
+
+def normalize_text(text: Any) -> str:
+    """서식/공백/대소문자/유니코드 조합 차이를 제거하여 같은 글이 같은 키를 갖도록 정규화"""
+    return " ".join(unicodedata.normalize("NFC", compact_text(text)).lower().split())
+
+
+def scorer_version(model: Any = None) -> str:
+    """채점 결과에 영향을 주는 감성 사전/설정/모델/프롬프트 조합"""
+    return ":".join([
+        LEXICON_VERSION,
+        settings.sentiment_scoring_mode,
+        str(settings.sentiment_escalation_confidence),
+        str(model or ""),
+        get_prompts_version()
+    ])
+
+
+def make_text_key(text: Any, version: str) -> str:
+    """정규화한 텍스트와 채점기 버전 기반 캐시 키 생성"""
+    return hashlib.sha256(f"{version}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """텍스트별 감성 채점 결과 디스크 캐시"""
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.cache = DiskCache(
+            db_path or settings.sentiment_cache_path,
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else settings.sentiment_cache_ttl,
+            max_entries=max_entries if max_entries is not None else settings.sentiment_cache_max_entries
+        )
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """캐시 키별 채점 결과 (없는 키는 제외)"""
+        return self.cache.get_many(keys)
+    
+    def set_many(self, scores: Dict[str, Dict[str, Any]]) -> bool:
+        """캐시 키별 채점 결과 저장"""
+        return self.cache.set_many({
+            key: {field: score[field] for field in CACHED_FIELDS}
+            for key, score in scores.items()
+        })
@@ -2,9 +2,19 @@
 Fashion AI Automation System - LangGraph State Definition
 """
 
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Optional, TypedDict, Annotated
 from datetime import datetime
+import operator
 import json
+import uuid
+
+
+def merge_counters(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """토큰/비용 카운터 리듀서 - 병렬 노드의 증분을 합산합니다"""
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
 
 
 class FashionState(TypedDict):
@@ -35,12 +45,27 @@ class FashionState(TypedDict):
     human_feedback: Optional[str]
     requires_human_input: bool
     feedback_iteration: int
+    stale_content: List[str]  # 피드백 결과 다시 생성해야 하는 콘텐츠 타입
+    content_versions: Dict[str, Dict[str, Any]]  # 콘텐츠 타입별 입력/출력 해시
+    
+    # 메타데이터 (병렬 노드가 동시에 갱신하므로 리듀서로 병합)
+    processing_steps: Annotated[List[str], operator.add]
+    token_usage: Annotated[Dict[str, int], merge_counters]
+    costs: Annotated[Dict[str, float], merge_counters]
+    errors: Annotated[List[str], operator.add]
+    metrics: Annotated[List[Dict[str, Any]], operator.add]  # 노드/도구 호출 계측 레코드
+    degraded: Annotated[List[str], operator.add]  # 마감 시간 초과로 부분/샘플 결과를 사용한 사유
+    
+    # 마감 시간 (deadline_seconds는 세션 예산, deadline은 실행 시작 시 계산된 epoch 시각)
+    deadline_seconds: Optional[float]
+    deadline: Optional[float]
     
-    # 메타데이터
-    processing_steps: List[str]
-    token_usage: Dict[str, int]
-    costs: Dict[str, float]
-    errors: List[str]
+    # LLM 응답 토큰 스트리밍 여부 (FashionWorkflow.astream(stream_tokens=True)에서 설정)
+    stream_tokens: bool
+    
+    # LLM 비용 예산 주체 (사용자별 일 예산, 대화형/배치 풀 예산 적용)
+    user_id: Optional[str]
+    budget_pool: str
     
     # 설정
     target_category: str
@@ -52,11 +77,17 @@ def create_initial_state(
     user_request: str,
     target_category: str = "전체",
     target_demographics: Optional[Dict[str, Any]] = None,
-    analysis_period: str = "최근 1개월"
+    analysis_period: str = "최근 1개월",
+    session_id: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
+    user_id: Optional[str] = None,
+    budget_pool: str = "interactive"
 ) -> FashionState:
     """초기 상태를 생성하는 헬퍼 함수"""
     
-    session_id = f"fashion_ai_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # 같은 초에 여러 세션이 생성되어도 충돌하지 않도록 임의 접미사 추가
+    if not session_id:
+        session_id = f"fashion_ai_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
     return FashionState(
         # 기본 정보
@@ -84,12 +115,25 @@ def create_initial_state(
         human_feedback=None,
         requires_human_input=False,
         feedback_iteration=0,
+        stale_content=[],
+        content_versions={},
         
         # 메타데이터
         processing_steps=[],
         token_usage={"input_tokens": 0, "output_tokens": 0},
         costs={"total_cost": 0.0},
         errors=[],
+        metrics=[],
+        degraded=[],
+        
+        # 마감 시간 (워크플로우 실행 시작 시 deadline 계산)
+        deadline_seconds=deadline_seconds,
+        deadline=None,
+        stream_tokens=False,
+        
+        # 비용 예산 주체
+        user_id=user_id,
+        budget_pool=budget_pool,
         
         # 설정
         target_category=target_category,
@@ -133,6 +177,41 @@ def update_token_usage(
     return state
 
 
+# 리듀서로 병합되는 키 (노드는 증분만 반환해야 함)
+APPEND_ONLY_KEYS = ("processing_steps", "errors", "metrics", "degraded")
+COUNTER_KEYS = ("token_usage", "costs")
+
+
+def fork_state(state: FashionState) -> FashionState:
+    """노드 실행용 작업 사본 생성 (리듀서 키는 원본과 분리)"""
+    working = dict(state)
+    for key in APPEND_ONLY_KEYS:
+        working[key] = list(state.get(key) or [])
+    for key in COUNTER_KEYS:
+        working[key] = dict(state.get(key) or {})
+    return working
+
+
+def diff_state(before: FashionState, after: FashionState) -> Dict[str, Any]:
+    """노드 실행 전후 상태를 비교하여 LangGraph에 반환할 증분을 계산"""
+    delta = {}
+    
+    for key, value in after.items():
+        if key in APPEND_ONLY_KEYS:
+            new_items = value[len(before.get(key) or []):]
+            if new_items:
+                delta[key] = new_items
+        elif key in COUNTER_KEYS:
+            previous = before.get(key) or {}
+            increments = {k: v - previous.get(k, 0) for k, v in value.items()}
+            if any(increments.values()):
+                delta[key] = increments
+        elif key not in before or (before[key] is not value and before[key] != value):
+            delta[key] = value
+    
+    return delta
+
+
 def serialize_state(state: FashionState) -> str:
     """상태를 JSON 문자열로 직렬화"""
     return json.dumps(state, ensure_ascii=False, indent=2)
@@ -2,25 +2,56 @@
 Fashion AI Automation System - LangGraph Workflow Definition
 """
 
-from typing import Dict, Any
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import RunnableConfig
 
-from .state import FashionState, update_state_step
-from .nodes.data_collection import DataCollectionNode
-from .nodes.trend_analysis import TrendAnalysisNode
-from .nodes.sentiment_analysis import SentimentAnalysisNode
-from .nodes.content_generation import ContentGenerationNode
-from .nodes.human_feedback import HumanFeedbackNode
+from config.settings import settings
+from utils.metrics import collect_metrics, track, enable_collector
+from utils.deadline import deadline_scope
+from utils.streaming import TOKEN_EVENT
+from tools.llm_budget import budget_scope
+from .state import FashionState, update_state_step, fork_state, diff_state
+from .registry import NodeRegistry, get_registry
+from .checkpoint import CheckpointStore, ANALYSIS_STEPS
+from .result_cache import WorkflowResultCache
 
 
 class FashionWorkflow:
     """패션 AI 자동화 시스템의 메인 워크플로우"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        registry: Optional[NodeRegistry] = None,
+        checkpointer: Optional[CheckpointStore] = None,
+        result_cache: Optional[WorkflowResultCache] = None
+    ):
+        # 노드와 클라이언트는 프로세스 전역 레지스트리에서 재사용
+        self.registry = registry or get_registry()
+        
+        # 단계별 체크포인트 (같은 session_id로 재실행 시 완료된 단계는 복원)
+        if checkpointer is None and settings.checkpoint_enabled:
+            checkpointer = CheckpointStore()
+        self.checkpointer = checkpointer
+        
+        # 동일 요청 결과 캐시 (정규화된 요청 파라미터 + 프롬프트 버전 기준)
+        if result_cache is None and settings.result_cache_enabled:
+            result_cache = WorkflowResultCache()
+        self.result_cache = result_cache
+        
+        # 프로세스 전역 계측 수집기 (선택)
+        if settings.metrics_collector_enabled:
+            enable_collector(trace_memory=settings.metrics_trace_memory)
         self.graph = None
         self._build_workflow()
     
+    def warm_up(self, node_names: Optional[List[str]] = None) -> Dict[str, bool]:
+        """노드와 공유 클라이언트를 미리 초기화합니다"""
+        return self.registry.warm_up(node_names)
+    
     def _build_workflow(self):
         """LangGraph 워크플로우를 구성합니다"""
         
@@ -38,9 +69,10 @@ class FashionWorkflow:
         workflow.set_entry_point("step_1_collect")
         
         # 엣지 연결 (플로우 정의)
+        # 트렌드 분석과 감성 분석은 수집 결과만 사용하므로 병렬 실행 후 합류
         workflow.add_edge("step_1_collect", "step_2_trends")
-        workflow.add_edge("step_2_trends", "step_3_sentiment")
-        workflow.add_edge("step_3_sentiment", "step_4_content")
+        workflow.add_edge("step_1_collect", "step_3_sentiment")
+        workflow.add_edge(["step_2_trends", "step_3_sentiment"], "step_4_content")
         
         # 조건부 엣지: 휴먼 피드백 필요 여부에 따라 분기
         workflow.add_conditional_edges(
@@ -65,73 +97,213 @@ class FashionWorkflow:
         # 워크플로우 컴파일
         self.graph = workflow.compile()
     
-    async def run(self, initial_state: FashionState, config: RunnableConfig = None) -> FashionState:
-        """워크플로우를 실행합니다"""
-        try:
-            final_state = await self.graph.ainvoke(initial_state, config)
-            return final_state
-        except Exception as e:
-            initial_state["errors"].append(f"워크플로우 실행 중 오류: {str(e)}")
-            return initial_state
+    async def run(
+        self,
+        initial_state: FashionState,
+        config: RunnableConfig = None,
+        use_cache: bool = True
+    ) -> FashionState:
+        """워크플로우를 실행합니다
+        
+        같은 요청의 결과가 캐시에 있으면 워크플로우를 실행하지 않고 바로 반환합니다
+        (use_cache=False로 우회). 체크포인트가 활성화된 경우 같은 session_id로 다시 실행하면
+        마지막으로 완료된 단계 이후부터 이어서 실행됩니다.
+        """
+        final_state = initial_state
+        
+        async for node_name, payload in self.astream(initial_state, config, use_cache=use_cache):
+            if node_name == END:
+                final_state = payload
+        
+        return final_state
     
-    def _data_collection_step(self, state: FashionState) -> FashionState:
-        """데이터 수집 단계"""
-        state = update_state_step(state, "데이터 수집 시작")
+    async def astream(
+        self,
+        initial_state: FashionState,
+        config: RunnableConfig = None,
+        use_cache: bool = True,
+        stream_tokens: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """워크플로우를 실행하면서 노드가 완료될 때마다 결과를 전달합니다
+        
+        각 노드 완료 시 (노드 이름, 상태 증분)을 yield하고,
+        마지막으로 (END, 최종 상태)를 yield합니다. 캐시 적중 시에는 (END, 캐시된 결과)만 전달합니다.
+        stream_tokens=True면 LLM 응답 토큰을 생성 즉시 (TOKEN_EVENT, {"node", "section", "text"})로 전달합니다.
+        """
+        use_cache = use_cache and bool(self.result_cache)
+        
+        if use_cache:
+            cached_state = await asyncio.to_thread(self._get_cached_result, initial_state)
+            if cached_state is not None:
+                yield END, cached_state
+                return
+        
+        # 세션 예산으로 이번 실행의 마감 시각 계산 (재개 시에도 새 예산 적용)
+        if initial_state.get("deadline_seconds"):
+            initial_state = {**initial_state, "deadline": time.time() + initial_state["deadline_seconds"]}
+        
+        # 노드가 LLM 토큰을 custom 스트림으로 전달하도록 요청
+        stream_mode = ["updates", "values"]
+        if stream_tokens:
+            initial_state = {**initial_state, "stream_tokens": True}
+            stream_mode.append("custom")
+        
+        latest_state = initial_state
         
         try:
-            collector = DataCollectionNode()
-            return collector.execute(state)
+            if self.checkpointer:
+                await asyncio.to_thread(self.checkpointer.save_session, initial_state)
+            
+            async for mode, chunk in self.graph.astream(initial_state, config, stream_mode=stream_mode):
+                if mode == "values":
+                    latest_state = chunk
+                    continue
+                
+                if mode == "custom":
+                    yield TOKEN_EVENT, chunk
+                    continue
+                
+                for node_name, delta in chunk.items():
+                    yield node_name, delta or {}
+        
         except Exception as e:
-            state["errors"].append(f"데이터 수집 오류: {str(e)}")
-            return state
+            latest_state["errors"].append(f"워크플로우 실행 중 오류: {str(e)}")
+        
+        if use_cache:
+            await asyncio.to_thread(self.result_cache.set, initial_state, latest_state)
+        
+        yield END, latest_state
     
-    def _trend_analysis_step(self, state: FashionState) -> FashionState:
-        """트렌드 분석 단계"""
-        state = update_state_step(state, "트렌드 분석 시작")
+    def _get_cached_result(self, initial_state: FashionState) -> Optional[FashionState]:
+        """결과 캐시 조회 (적중 시 캐시 조회 계측 레코드와 처리 단계를 추가)"""
+        with collect_metrics() as records:
+            with track("cache", "workflow_result", session_id=initial_state.get("session_id")) as record:
+                cached_state = self.result_cache.get(initial_state)
+                record["hit"] = cached_state is not None
         
-        try:
-            analyzer = TrendAnalysisNode()
-            return analyzer.execute(state)
-        except Exception as e:
-            state["errors"].append(f"트렌드 분석 오류: {str(e)}")
-            return state
+        if cached_state is None:
+            return None
+        
+        cached_state["processing_steps"] = list(cached_state.get("processing_steps") or []) + [
+            f"{datetime.now().isoformat()}: 캐시된 결과 반환"
+        ]
+        cached_state["metrics"] = records
+        return cached_state
     
-    def _sentiment_analysis_step(self, state: FashionState) -> FashionState:
-        """감성 분석 단계"""
-        state = update_state_step(state, "감성 분석 시작")
+    async def resume(self, session_id: str, config: RunnableConfig = None) -> Optional[FashionState]:
+        """저장된 세션을 마지막 완료 단계부터 재개합니다
         
-        try:
-            analyzer = SentimentAnalysisNode()
-            return analyzer.execute(state)
-        except Exception as e:
-            state["errors"].append(f"감성 분석 오류: {str(e)}")
-            return state
+        복원된 체크포인트로 이어서 실행하므로 결과 캐시는 조회/저장하지 않습니다.
+        """
+        if not self.checkpointer:
+            return None
+        
+        initial_state = self.checkpointer.load_session(session_id)
+        if initial_state is None:
+            return None
+        
+        return await self.run(initial_state, config, use_cache=False)
     
-    def _content_generation_step(self, state: FashionState) -> FashionState:
-        """콘텐츠 생성 단계"""
-        state = update_state_step(state, "콘텐츠 생성 시작")
+    async def branch(
+        self,
+        source_session_id: str,
+        overrides: Optional[Dict[str, Any]] = None,
+        config: RunnableConfig = None
+    ) -> Optional[FashionState]:
+        """저장된 분석 결과에서 새 콘텐츠 생성 세션을 분기하여 실행합니다
         
-        try:
-            generator = ContentGenerationNode()
-            return generator.execute(state)
-        except Exception as e:
-            state["errors"].append(f"콘텐츠 생성 오류: {str(e)}")
-            return state
+        수집/트렌드/감성 분석 단계는 원본 세션의 체크포인트를 그대로 사용하고,
+        콘텐츠는 다시 생성하도록 결과 캐시는 조회/저장하지 않습니다.
+        """
+        if not self.checkpointer:
+            return None
+        
+        initial_state = self.checkpointer.branch_session(
+            source_session_id, steps=ANALYSIS_STEPS, overrides=overrides
+        )
+        if initial_state is None:
+            return None
+        
+        return await self.run(initial_state, config, use_cache=False)
     
-    def _human_feedback_step(self, state: FashionState) -> FashionState:
-        """Human-in-the-loop 피드백 단계"""
-        state = update_state_step(state, "휴먼 피드백 처리 시작")
+    async def _run_node(self, state: FashionState, node_name: str, step_name: str, error_label: str) -> Dict[str, Any]:
+        """노드를 작업 사본에서 실행하고 변경된 부분(증분)만 반환합니다
         
-        try:
-            feedback_handler = HumanFeedbackNode()
-            return feedback_handler.execute(state)
-        except Exception as e:
-            state["errors"].append(f"휴먼 피드백 처리 오류: {str(e)}")
-            return state
+        병렬 분기에서 동시에 실행되는 노드들이 같은 키를 덮어쓰지 않도록
+        리듀서 키(processing_steps, errors, token_usage, costs)는 증분으로 병합됩니다.
+        노드는 aexecute로 실행되므로 LLM/HTTP 대기 중에도 이벤트 루프를 블로킹하지 않습니다.
+        체크포인트는 (session_id, 노드, 피드백 반복 차수) 단위로 저장/복원되며, SQLite 입출력은 스레드에서 실행됩니다.
+        """
+        session_id = state.get("session_id")
+        iteration = state.get("feedback_iteration", 0)
+        
+        if self.checkpointer:
+            saved_delta = await asyncio.to_thread(self.checkpointer.load_step, session_id, node_name, iteration)
+            if saved_delta is not None:
+                saved_delta["processing_steps"] = saved_delta.get("processing_steps", []) + [
+                    f"{datetime.now().isoformat()}: 체크포인트에서 복원 - {step_name}"
+                ]
+                return saved_delta
+        
+        working = fork_state(state)
+        working = update_state_step(working, step_name)
+        
+        # 노드 실행 구간과 내부 도구 호출(API, 스크래핑, OpenSearch, LLM)을 계측하여 상태에 기록
+        # 세션 마감 시각은 노드와 도구에 전달되어 남은 시간 안에 부분/샘플 결과로 대체됨
+        # LLM 호출은 세션/사용자/풀 비용 예산을 검사한 뒤 실행됨
+        budget = budget_scope(session_id, state.get("user_id"), state.get("budget_pool"))
+        with deadline_scope(state.get("deadline")) as degraded, budget, collect_metrics() as records:
+            with track("node", node_name, session_id=session_id, iteration=iteration) as node_record:
+                try:
+                    node = self.registry.get_node(node_name)
+                    working = await node.aexecute(working)
+                except Exception as e:
+                    working["errors"].append(f"{error_label}: {str(e)}")
+                
+                usage_before = state.get("token_usage") or {}
+                usage_after = working.get("token_usage") or {}
+                node_record["input_tokens"] = usage_after.get("input_tokens", 0) - usage_before.get("input_tokens", 0)
+                node_record["output_tokens"] = usage_after.get("output_tokens", 0) - usage_before.get("output_tokens", 0)
+                node_record["degraded"] = bool(degraded)
+        
+        working["metrics"] = list(working.get("metrics") or []) + records
+        working["degraded"] = list(working.get("degraded") or []) + [f"{node_name}: {reason}" for reason in degraded]
+        
+        delta = diff_state(state, working)
+        
+        # 오류 없이 전체 결과로 완료된 단계만 저장 (실패/부분 결과 단계는 재실행 시 다시 수행)
+        if self.checkpointer and not delta.get("errors") and not delta.get("degraded"):
+            await asyncio.to_thread(self.checkpointer.save_step, session_id, node_name, iteration, delta)
+        
+        return delta
+    
+    async def _data_collection_step(self, state: FashionState) -> Dict[str, Any]:
+        """데이터 수집 단계"""
+        return await self._run_node(state, "data_collection", "데이터 수집 시작", "데이터 수집 오류")
+    
+    async def _trend_analysis_step(self, state: FashionState) -> Dict[str, Any]:
+        """트렌드 분석 단계"""
+        return await self._run_node(state, "trend_analysis", "트렌드 분석 시작", "트렌드 분석 오류")
+    
+    async def _sentiment_analysis_step(self, state: FashionState) -> Dict[str, Any]:
+        """감성 분석 단계"""
+        return await self._run_node(state, "sentiment_analysis", "감성 분석 시작", "감성 분석 오류")
+    
+    async def _content_generation_step(self, state: FashionState) -> Dict[str, Any]:
+        """콘텐츠 생성 단계"""
+        return await self._run_node(state, "content_generation", "콘텐츠 생성 시작", "콘텐츠 생성 오류")
+    
+    async def _human_feedback_step(self, state: FashionState) -> Dict[str, Any]:
+        """Human-in-the-loop 피드백 단계"""
+        return await self._run_node(state, "human_feedback", "휴먼 피드백 처리 시작", "휴먼 피드백 처리 오류")
     
     def _should_get_human_feedback(self, state: FashionState) -> str:
         """휴먼 피드백이 필요한지 판단"""
         
+        # 마감 시간이 지난 경우 현재까지의 결과로 종료
+        if self._deadline_passed(state):
+            return "end"
+        
         # 다음 조건들 중 하나라도 만족하면 휴먼 피드백 요청
         conditions = [
             state.get("requires_human_input", False),  # 명시적 요청
@@ -151,18 +323,27 @@ class FashionWorkflow:
         max_iterations = 3
         current_iteration = state.get("feedback_iteration", 0)
         
+        if self._deadline_passed(state):
+            return "end"
+        
         if current_iteration < max_iterations and state.get("human_feedback"):
             return "continue"
         else:
             return "end"
     
+    def _deadline_passed(self, state: FashionState) -> bool:
+        """세션 마감 시간 경과 여부"""
+        deadline = state.get("deadline")
+        return deadline is not None and time.time() >= deadline
+    
     def get_workflow_diagram(self) -> str:
         """워크플로우 다이어그램을 Mermaid 형식으로 반환"""
         return """
         graph TD
             A[데이터 수집] --> B[트렌드 분석]
-            B --> C[감성 분석]
-            C --> D[콘텐츠 생성]
+            A --> C[감성 분석]
+            B --> D[콘텐츠 생성]
+            C --> D
             D --> E{휴먼 피드백<br/>필요?}
             E -->|예| F[휴먼 피드백]
             E -->|아니오| G[종료]
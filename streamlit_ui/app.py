@@ -1,6 +1,8 @@
 import streamlit as st
 import asyncio
 import json
+import time
+import uuid
 from typing import Dict, Any
 import pandas as pd
 import plotly.express as px
@@ -13,10 +15,16 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from langgraph_agents.workflow import FashionWorkflow
-from langgraph_agents.state import FashionState
-from tools.opensearch_client import OpenSearchClient
+from langgraph.graph import END
+from langgraph_agents.state import FashionState, create_initial_state
+from langgraph_agents.registry import get_registry
+from langgraph_agents.nodes.content_generation import CONTENT_LABELS
+from langgraph_agents.sentiment_aggregator import SentimentAggregator
+from tools.async_http import aclose_async_client
 from utils.token_tracker import TokenTracker
+from config.settings import settings
 from utils.logger import setup_logger
+from utils.streaming import TOKEN_EVENT
 
 # 페이지 설정
 st.set_page_config(
@@ -29,12 +37,48 @@ st.set_page_config(
 # 로거 설정
 logger = setup_logger(__name__)
 
+# 워크플로우 노드별 표시 이름
+STEP_LABELS = {
+    "step_1_collect": "데이터 수집",
+    "step_2_trends": "트렌드 분석",
+    "step_3_sentiment": "감성 분석",
+    "step_4_content": "콘텐츠 생성",
+    "step_5_feedback": "휴먼 피드백"
+}
+
+# 스트리밍 중인 LLM 응답 표시 이름 (노드 또는 콘텐츠 타입)
+STREAM_LABELS = {
+    "trend_analysis": "트렌드 리포트",
+    **CONTENT_LABELS
+}
+
+# 스트리밍 토큰 화면 갱신 간격 (초)
+STREAM_RENDER_INTERVAL = 0.05
+
+@st.cache_resource
+def get_workflow() -> FashionWorkflow:
+    """워크플로우를 프로세스당 한 번만 생성하고 노드/클라이언트를 워밍업"""
+    workflow = FashionWorkflow()
+    workflow.warm_up()
+    return workflow
+
+@st.cache_resource
+def get_sentiment_aggregator() -> SentimentAggregator:
+    """감성 집계 저장소를 프로세스당 한 번만 생성"""
+    return SentimentAggregator()
+
 class FashionAIApp:
     def __init__(self):
-        self.workflow = FashionWorkflow()
-        self.opensearch_client = OpenSearchClient()
+        self.workflow = get_workflow()
+        self.opensearch_client = get_registry().get_opensearch_client()
         self.token_tracker = TokenTracker()
-        
+    
+    def _user_id(self) -> str:
+        """사용자별 LLM 비용 예산 키 (로그인 연동 전까지는 브라우저 세션 단위)"""
+        if "user_id" not in st.session_state:
+            st.session_state["user_id"] = f"web_{uuid.uuid4().hex[:12]}"
+        return st.session_state["user_id"]
+    
     def main(self):
         """메인 애플리케이션"""
         st.title("👗 Fashion AI Automation System")
@@ -93,6 +137,8 @@ class FashionAIApp:
                      title='일별 활동 현황')
         st.plotly_chart(fig, use_container_width=True)
         
+        self.display_sentiment_windows()
+        
         # 최근 생성된 콘텐츠
         st.subheader("🆕 최근 생성된 콘텐츠")
         recent_content = [
@@ -113,6 +159,37 @@ class FashionAIApp:
                     st.write(content['시간'])
                 st.divider()
     
+    def display_sentiment_windows(self):
+        """카테고리/브랜드/키워드별 감성 추이 (누적 집계 조회, 재계산 없음)"""
+        st.subheader("💬 감성 추이")
+        
+        dimension_labels = {"category": "카테고리", "brand": "브랜드", "keyword": "키워드"}
+        window_options = {"최근 24시간": ("hour", 24), "최근 7일": ("day", 7), "최근 12주": ("week", 12)}
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            dimension = st.selectbox("구분", list(dimension_labels), format_func=dimension_labels.get)
+        with col2:
+            granularity, periods = window_options[st.selectbox("기간", list(window_options), index=1)]
+        
+        aggregator = get_sentiment_aggregator()
+        ranking = aggregator.ranking(dimension, granularity, periods, limit=10)
+        
+        if not ranking:
+            st.info("아직 집계된 감성 데이터가 없습니다. 트렌드 분석을 실행하면 채점 결과가 누적됩니다.")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {dimension_labels[dimension]: value, "텍스트 수": stats["count"], "평균 점수": stats["mean_score"], "부정 비율": stats["distribution"]["negative"]}
+            for value, stats in ranking.items()
+        ]), use_container_width=True)
+        
+        value = st.selectbox("추이 보기", list(ranking))
+        series = pd.DataFrame(aggregator.series(dimension, value, granularity, periods))
+        fig = px.bar(series, x="bucket_start", y="count", color="mean_score", color_continuous_scale="RdYlGn",
+                     range_color=[-1, 1], title=f"{value} 구간별 텍스트 수와 평균 감성 점수")
+        st.plotly_chart(fig, use_container_width=True)
+    
     def trend_analysis_page(self):
         """트렌드 분석 페이지"""
         st.header("📈 트렌드 분석")
@@ -258,60 +335,66 @@ class FashionAIApp:
         st.plotly_chart(fig, use_container_width=True)
     
     def run_trend_analysis(self, keywords: str):
-        """트렌드 분석 실행"""
+        """트렌드 분석 실행 (노드가 완료될 때마다 결과를 바로 표시)"""
         try:
             # 초기 상태 생성
-            initial_state = FashionState(
-                session_id=f"trend_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            keyword_list = [k.strip() for k in keywords.split(',') if k.strip()]
+            initial_state = create_initial_state(
                 user_request=f"다음 키워드에 대한 트렌드 분석을 수행해주세요: {keywords}",
-                keywords=[k.strip() for k in keywords.split(',')],
-                collected_data={},
-                analysis_results={},
-                generated_content={},
-                feedback_history=[],
-                token_usage={"total_tokens": 0, "cost": 0.0},
-                human_feedback_required=False,
-                feedback_count=0
+                target_category=keyword_list[0] if keyword_list else "전체",
+                deadline_seconds=settings.interactive_deadline_seconds,
+                user_id=self._user_id()
             )
             
-            # 워크플로우 실행 (비동기 실행을 동기로 래핑)
+            # 워크플로우 스트리밍 실행
             try:
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+                status = st.status("워크플로우 실행 중...", expanded=True)
+                result = None
                 
-                result = loop.run_until_complete(self.workflow.run_async(initial_state))
+                live = {}
                 
-                # 결과 표시
-                if result.get('analysis_results'):
-                    st.success("트렌드 분석이 완료되었습니다!")
-                    
-                    analysis = result['analysis_results']
+                for node_name, payload in self._stream_workflow(initial_state):
+                    if node_name == TOKEN_EVENT:
+                        self._render_token(live, payload)
+                        continue
                     
-                    st.subheader("📊 분석 결과")
+                    if node_name == END:
+                        result = payload
+                        continue
                     
-                    # 주요 트렌드
-                    if 'main_trends' in analysis:
-                        st.write("**주요 트렌드:**")
-                        for trend in analysis['main_trends']:
-                            st.write(f"• {trend}")
+                    self._finish_live(live)
+                    node_metrics = [m for m in payload.get("metrics", []) if m.get("kind") == "node"]
+                    duration = f" ({node_metrics[-1]['duration_ms'] / 1000:.1f}초)" if node_metrics else ""
+                    status.write(f"✅ {STEP_LABELS.get(node_name, node_name)} 완료{duration}")
                     
-                    # 예측
-                    if 'predictions' in analysis:
-                        st.write("**향후 전망:**")
-                        for pred in analysis['predictions']:
-                            st.write(f"• {pred}")
+                    if payload.get("collected_data"):
+                        counts = {source: len(items) for source, items in payload["collected_data"].items()}
+                        status.write(f"수집 데이터: {counts}")
                     
-                    # 비즈니스 제안
-                    if 'business_suggestions' in analysis:
-                        st.write("**비즈니스 제안:**")
-                        for suggestion in analysis['business_suggestions']:
-                            st.write(f"• {suggestion}")
+                    if payload.get("trend_analysis"):
+                        self._clear_live(live, "trend_analysis")
+                        st.success("트렌드 분석이 완료되었습니다!")
+                        self.display_trend_analysis(payload["trend_analysis"])
                     
-                    # 토큰 사용량
-                    if 'token_usage' in result:
-                        st.info(f"사용된 토큰: {result['token_usage']['total_tokens']}")
+                    if payload.get("sentiment_analysis"):
+                        score = payload["sentiment_analysis"].get("overall_sentiment_score", 0)
+                        st.metric("감성 점수", f"{score:.2f}")
+                
+                status.update(label="워크플로우 완료", state="complete", expanded=False)
+                self._clear_live(live)
+                
+                if result and result.get("degraded"):
+                    st.warning(
+                        "응답 시간 제한으로 일부 결과가 간략화되었습니다:\n"
+                        + "\n".join(f"- {reason}" for reason in result["degraded"])
+                    )
                 
+                if result and result.get("trend_analysis"):
+                    # 토큰 사용량 (노드별 증분이 리듀서로 합산된 카운터)
+                    token_usage = result.get("token_usage") or {}
+                    if token_usage:
+                        breakdown = ", ".join(f"{key}: {count:,}" for key, count in token_usage.items())
+                        st.info(f"사용된 토큰: {sum(token_usage.values()):,} ({breakdown})")
                 else:
                     st.warning("분석 결과를 가져올 수 없습니다. 샘플 데이터를 표시합니다.")
                     self.display_sample_trends()
@@ -325,45 +408,124 @@ class FashionAIApp:
             logger.error(f"트렌드 분석 오류: {e}")
             st.error("트렌드 분석 중 오류가 발생했습니다.")
     
+    def display_trend_analysis(self, analysis: Dict[str, Any]):
+        """트렌드 분석 결과 표시"""
+        st.subheader("📊 분석 결과")
+        
+        if analysis.get("summary"):
+            st.write(analysis["summary"])
+        
+        # 주요 트렌드
+        if analysis.get("key_trends"):
+            st.write("**주요 트렌드:**")
+            for trend in analysis["key_trends"]:
+                st.write(f"• {trend}")
+        
+        # 예측
+        if analysis.get("predictions"):
+            st.write("**향후 전망:**")
+            for pred in analysis["predictions"]:
+                st.write(f"• {pred}")
+        
+        # 비즈니스 제안
+        if analysis.get("business_recommendations"):
+            st.write("**비즈니스 제안:**")
+            for suggestion in analysis["business_recommendations"]:
+                st.write(f"• {suggestion}")
+    
+    def _stream_workflow(self, initial_state: FashionState):
+        """비동기 워크플로우 스트림을 Streamlit 렌더링 루프에서 순회 (LLM 토큰 이벤트 포함)"""
+        loop = asyncio.new_event_loop()
+        stream = self.workflow.astream(initial_state, stream_tokens=True)
+        
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.run_until_complete(aclose_async_client())
+            loop.close()
+    
+    def _render_token(self, live: Dict[Any, Dict[str, Any]], event: Dict[str, Any]):
+        """LLM 토큰을 작성 중인 섹션에 이어 붙여 표시 (화면 갱신은 일정 간격으로 제한)"""
+        key = (event["node"], event.get("section"))
+        entry = live.get(key)
+        
+        if entry is None:
+            label = STREAM_LABELS.get(event.get("section") or event["node"], event["node"])
+            entry = live[key] = {"label": label, "placeholder": st.empty(), "text": "", "rendered_at": 0.0}
+        elif entry.get("done"):
+            # 피드백 반복으로 다시 생성되는 경우 같은 자리에 새로 작성
+            entry.update(text="", done=False)
+        
+        entry["text"] += event["text"]
+        
+        now = time.monotonic()
+        if now - entry["rendered_at"] >= STREAM_RENDER_INTERVAL:
+            entry["placeholder"].markdown(f"**✍️ {entry['label']} 작성 중...**\n\n{entry['text']}▌")
+            entry["rendered_at"] = now
+    
+    def _finish_live(self, live: Dict[Any, Dict[str, Any]]):
+        """노드 완료 시 작성 중 표시를 완성본으로 갱신"""
+        for entry in live.values():
+            if not entry.get("done"):
+                entry["placeholder"].markdown(f"**{entry['label']}**\n\n{entry['text']}")
+                entry["done"] = True
+    
+    def _clear_live(self, live: Dict[Any, Dict[str, Any]], node: str = None):
+        """작성 중 표시 제거 (완료된 결과는 별도로 표시)"""
+        for key in [key for key in live if node is None or key[0] == node]:
+            live.pop(key)["placeholder"].empty()
+    
     def generate_content(self, content_type: str, topic: str, audience: str, tone: str, length: str):
-        """콘텐츠 생성"""
+        """콘텐츠 생성 (LLM이 작성하는 내용을 토큰 단위로 바로 표시)"""
         try:
             # 초기 상태 생성
-            initial_state = FashionState(
-                session_id=f"content_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                user_request=f"{content_type} 생성: {topic}",
-                keywords=[topic],
-                collected_data={},
-                analysis_results={
-                    "target_audience": audience,
-                    "tone": tone,
-                    "length": length
-                },
-                generated_content={},
-                feedback_history=[],
-                token_usage={"total_tokens": 0, "cost": 0.0},
-                human_feedback_required=False,
-                feedback_count=0
+            initial_state = create_initial_state(
+                user_request=f"{content_type} 생성: {topic} (타겟: {audience}, 톤: {tone}, 길이: {length})",
+                target_category=topic,
+                deadline_seconds=settings.interactive_deadline_seconds,
+                user_id=self._user_id()
             )
             
-            # 워크플로우 실행
+            # 워크플로우 스트리밍 실행
             try:
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+                status = st.status("콘텐츠 생성 중...", expanded=False)
+                live = {}
+                result = None
                 
-                result = loop.run_until_complete(self.workflow.run_async(initial_state))
+                for node_name, payload in self._stream_workflow(initial_state):
+                    if node_name == TOKEN_EVENT:
+                        self._render_token(live, payload)
+                        continue
+                    
+                    if node_name == END:
+                        result = payload
+                        continue
+                    
+                    self._finish_live(live)
+                    status.write(f"✅ {STEP_LABELS.get(node_name, node_name)} 완료")
                 
-                if result.get('generated_content'):
+                status.update(label="콘텐츠 생성 완료", state="complete")
+                self._clear_live(live)
+                
+                content = {
+                    content_key: result.get(content_key)
+                    for content_key in ("product_proposal", "marketing_copy", "content_suggestions")
+                    if result and result.get(content_key)
+                }
+                
+                if content:
                     st.success(f"{content_type}이(가) 생성되었습니다!")
                     
-                    content = result['generated_content']
-                    
                     # 생성된 콘텐츠 표시
                     st.subheader("✨ 생성된 콘텐츠")
                     
-                    if 'product_plan' in content:
-                        st.text_area("제품 기획서", content['product_plan'], height=300)
+                    if 'product_proposal' in content:
+                        st.text_area("제품 기획서", content['product_proposal'], height=300)
                     
                     if 'marketing_copy' in content:
                         st.text_area("마케팅 문구", content['marketing_copy'], height=200)
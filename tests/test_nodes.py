@@ -6,6 +6,9 @@ LangGraph 노드 테스트
 
 import unittest
 import asyncio
+import importlib.util
+import tempfile
+import time
 from unittest.mock import Mock, patch
 import sys
 import os
@@ -13,11 +16,23 @@ import os
 # 프로젝트 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from langgraph_agents.state import FashionState
+from langgraph_agents.state import (
+    FashionState, create_initial_state, fork_state, diff_state,
+    merge_counters, update_state_step, update_token_usage
+)
 from langgraph_agents.nodes.data_collection import DataCollectionNode
 from langgraph_agents.nodes.trend_analysis import TrendAnalysisNode
 from langgraph_agents.nodes.sentiment_analysis import SentimentAnalysisNode
 from langgraph_agents.nodes.content_generation import ContentGenerationNode
+from langgraph_agents.registry import NodeRegistry
+from langgraph.graph import END
+from langgraph_agents.batch import BatchRunner
+from langgraph_agents.checkpoint import CheckpointStore
+from langgraph_agents.result_cache import WorkflowResultCache, make_request_key
+from langgraph_agents.sentiment_cache import SentimentCache
+from langgraph_agents.sentiment_aggregator import SentimentAggregator, bucket_start
+from utils.disk_cache import DiskCache
+from config.settings import settings
 
 class TestDataCollectionNode(unittest.TestCase):
     """데이터 수집 노드 테스트"""
@@ -95,11 +110,27 @@ class TestTrendAnalysisNode(unittest.TestCase):
         # 검증
         self.assertIsInstance(result, dict)
         self.assertIn("analysis_results", result)
+    
+    def test_data_budget_uses_routed_max_tokens(self):
+        """수집 데이터 토큰 예산이 라우팅된 모델의 최대 출력 토큰 수를 반영 테스트"""
+        state = create_initial_state("트렌드 분석 테스트")
+        self.node.llm = Mock(model_name="gpt-4", max_tokens=6000)
+        
+        self.assertLessEqual(self.node._data_token_budget(state), 8192 - 6000)
+        
+        self.node.llm = Mock(model_name="gpt-4", max_tokens=1000)
+        self.assertEqual(self.node._data_token_budget(state), settings.prompt_data_tokens)
 
 class TestSentimentAnalysisNode(unittest.TestCase):
     """감성 분석 노드 테스트"""
     
     def setUp(self):
+        # 세션 간 채점 캐시는 캐시 테스트에서만 임시 경로로 사용
+        for name in ("sentiment_cache_enabled", "sentiment_aggregate_enabled"):
+            store_patch = patch.object(settings, name, False)
+            store_patch.start()
+            self.addCleanup(store_patch.stop)
+        
         self.node = SentimentAnalysisNode()
         self.sample_state = FashionState(
             session_id="test_session",
@@ -131,6 +162,117 @@ class TestSentimentAnalysisNode(unittest.TestCase):
         # 검증
         self.assertIsInstance(result, dict)
         self.assertIn("analysis_results", result)
+    
+    def test_scores_each_text_locally(self):
+        """감성 사전으로 텍스트별 점수와 실제 분포 계산 (확실한 텍스트는 LLM 미호출) 테스트"""
+        llm = Mock()
+        node = SentimentAnalysisNode(llm=llm)
+        state = create_initial_state("린넨 원피스 반응")
+        state["social_media_data"] = [
+            {"content": "정말 예쁘고 편해요", "platform": "instagram"},
+            {"content": "보풀이 너무 많이 생겨서 실망", "platform": "instagram"},
+            {"content": "핏이 별로라서 환불했어요", "platform": "instagram"}
+        ]
+        state["naver_shopping_data"] = [{"title": "<b>린넨</b> 원피스"}]
+        
+        result = node.execute(state)["sentiment_analysis"]
+        
+        llm.invoke.assert_not_called()
+        self.assertEqual([item["label"] for item in result["item_scores"]], ["positive", "negative", "negative", "neutral"])
+        self.assertEqual(result["sentiment_distribution"], {"positive": 0.25, "neutral": 0.25, "negative": 0.5})
+        self.assertIn("보풀", result["improvement_points"][0])
+    
+    @patch.object(settings, "sentiment_batch_max_items", 1)
+    def test_escalates_low_confidence_texts_in_batches(self):
+        """신뢰도가 낮은 텍스트만 묶음 단위로 LLM 재채점 테스트"""
+        llm = Mock()
+        llm.invoke.return_value = Mock(content='{"scores": [[1, -0.6]]}', usage_metadata=None, response_metadata={})
+        node = SentimentAnalysisNode(llm=llm)
+        state = create_initial_state("린넨 원피스 반응")
+        state["social_media_data"] = [
+            {"content": "정말 예쁘고 편해요", "platform": "instagram"},
+            {"content": "예쁜데 비침이 있어서 아쉬워요", "platform": "instagram"},
+            {"content": "색감이 화면과 달라요. 사이즈는 한 치수 크게 나온 것 같으니 참고하세요.", "platform": "instagram"}
+        ]
+        
+        result = node.execute(state)["sentiment_analysis"]
+        
+        self.assertEqual(llm.invoke.call_count, 2)
+        self.assertEqual([item["scorer"] for item in result["item_scores"]], ["lexicon", "llm", "llm"])
+        self.assertEqual(result["item_scores"][2]["score"], -0.6)
+        self.assertEqual(result["data_summary"]["llm_scored"], 2)
+    
+    @patch.object(settings, "sentiment_scoring_mode", "llm")
+    @patch.object(settings, "sentiment_batch_max_items", 2)
+    @patch.object(settings, "sentiment_batch_concurrency", 3)
+    def test_scores_all_texts_in_concurrent_batches(self):
+        """llm 모드는 모든 텍스트를 묶음으로 나눠 동시에 채점하고, 잘린 JSON 응답도 완성된 항목은 사용 테스트"""
+        def slow_invoke(messages, **kwargs):
+            time.sleep(0.3)
+            count = 2 if "\n2. " in messages[1].content else 1
+            scores = ", ".join(f"[{number}, 0.5]" for number in range(1, count + 1))
+            return Mock(content='{"scores": [' + scores, usage_metadata=None, response_metadata={})
+        
+        llm = Mock()
+        llm.invoke.side_effect = slow_invoke
+        node = SentimentAnalysisNode(llm=llm)
+        state = create_initial_state("린넨 원피스 반응")
+        state["social_media_data"] = [{"content": f"리뷰 {number} 정말 예뻐요", "platform": "instagram"} for number in range(5)]
+        
+        started_at = time.monotonic()
+        result = node.execute(state)["sentiment_analysis"]
+        
+        self.assertLess(time.monotonic() - started_at, 0.8)
+        self.assertEqual(llm.invoke.call_count, 3)
+        self.assertEqual(llm.invoke.call_args.kwargs["response_format"], {"type": "json_object"})
+        self.assertEqual({item["scorer"] for item in result["item_scores"]}, {"llm"})
+        self.assertEqual(result["overall_sentiment_score"], 0.5)
+    
+    def test_reuses_cached_scores_across_sessions(self):
+        """같은 텍스트(공백/태그 차이 무시)는 한 번만 LLM 채점하고 다음 세션은 캐시 결과 사용 테스트"""
+        llm = Mock()
+        llm.model_name = "gpt-4o-mini"
+        llm.invoke.return_value = Mock(content='{"scores": [[1, -0.4]]}', usage_metadata=None, response_metadata={})
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = SentimentCache(os.path.join(temp_dir, "sentiment_cache.sqlite"))
+            state = create_initial_state("린넨 원피스 반응")
+            state["social_media_data"] = [
+                {"content": "정말 예쁘고 편해요", "platform": "instagram"},
+                {"content": "예쁜데 비침이 있어서 아쉬워요", "platform": "instagram"},
+                {"content": "<b>예쁜데</b>  비침이 있어서 아쉬워요", "platform": "instagram"}
+            ]
+            
+            first = SentimentAnalysisNode(llm=llm, cache=cache).execute(dict(state))["sentiment_analysis"]
+            second = SentimentAnalysisNode(llm=llm, cache=cache).execute(dict(state))["sentiment_analysis"]
+        
+        self.assertEqual(llm.invoke.call_count, 1)
+        self.assertEqual([item["score"] for item in first["item_scores"]][1:], [-0.4, -0.4])
+        self.assertEqual(first["data_summary"]["cache_hits"], 0)
+        self.assertEqual(second["data_summary"]["cache_hits"], 3)
+        self.assertEqual([item["score"] for item in second["item_scores"]], [item["score"] for item in first["item_scores"]])
+    
+    def test_records_final_scores_in_windowed_aggregates(self):
+        """확정된 채점 결과만 카테고리/브랜드/키워드별로 한 번씩 집계 테스트"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            aggregator = SentimentAggregator(os.path.join(temp_dir, "sentiment_aggregate.sqlite"))
+            node = SentimentAnalysisNode(llm=Mock(), aggregator=aggregator)
+            node.llm = None  # 감성 사전 채점만 사용 (신뢰도가 낮은 텍스트는 확정되지 않아 집계 제외)
+            state = create_initial_state("린넨 원피스 반응", target_category="원피스")
+            state["collected_data"] = {"keywords_used": ["원피스", "린넨"]}
+            state["social_media_data"] = [
+                {"content": "린넨 원피스 정말 예쁘고 편해요", "platform": "instagram"},
+                {"content": "예쁜데 비침이 있어서 아쉬워요", "platform": "instagram"}
+            ]
+            state["naver_shopping_data"] = [{"title": "<b>린넨</b> 원피스 보풀 최악", "brand": "무명", "category1": "패션의류"}]
+            
+            node.execute(dict(state))
+            node.execute(dict(state))
+            
+            self.assertEqual(aggregator.window("category", "원피스")["count"], 2)
+            self.assertEqual(aggregator.window("keyword", "린넨")["count"], 2)
+            self.assertEqual(aggregator.window("brand", "무명")["distribution"]["negative"], 1.0)
+            self.assertEqual(set(aggregator.ranking("category")), {"원피스", "패션의류"})
 
 class TestContentGenerationNode(unittest.TestCase):
     """콘텐츠 생성 노드 테스트"""
@@ -168,5 +310,359 @@ class TestContentGenerationNode(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn("generated_content", result)
 
+class TestIncrementalContentGeneration(unittest.TestCase):
+    """피드백 반복 시 증분 콘텐츠 생성 테스트"""
+    
+    def setUp(self):
+        self.llm = Mock()
+        self.llm.invoke.return_value = Mock(content="1. 생성된 콘텐츠", usage_metadata=None)
+        self.node = ContentGenerationNode(llm=self.llm)
+        self.state = create_initial_state("여름 트렌드")
+        self.state["trend_analysis"] = {"raw_analysis": "린넨 소재 인기"}
+        self.state["sentiment_analysis"] = {"raw_analysis": "긍정적"}
+    
+    def test_regenerates_only_stale_content(self):
+        """무효화된 콘텐츠만 재생성 테스트"""
+        state = self.node.execute(self.state)
+        self.assertEqual(self.llm.invoke.call_count, 3)
+        
+        state["stale_content"] = ["marketing_copy"]
+        state["human_feedback"] = "마케팅 문구에 행동 유도 문구를 추가해주세요."
+        state = self.node.execute(state)
+        
+        self.assertEqual(self.llm.invoke.call_count, 4)
+        self.assertEqual(state["stale_content"], [])
+        self.assertIn("행동 유도", self.llm.invoke.call_args[0][0][1].content)
+    
+    def test_reuses_content_improved_by_feedback(self):
+        """피드백 노드가 개선한 결과 재사용 테스트"""
+        state = self.node.execute(self.state)
+        state["product_proposal"] = "개선된 제품 기획서"
+        
+        state = self.node.execute(state)
+        
+        self.assertEqual(self.llm.invoke.call_count, 3)
+        self.assertEqual(state["product_proposal"], "개선된 제품 기획서")
+    
+    def test_generates_content_concurrently(self):
+        """독립적인 콘텐츠 동시 생성 테스트 (가장 느린 호출 시간만큼 소요)"""
+        def slow_invoke(messages):
+            time.sleep(0.3)
+            return Mock(content="1. 생성된 콘텐츠", usage_metadata=None)
+        
+        self.llm.invoke.side_effect = slow_invoke
+        
+        started_at = time.monotonic()
+        state = self.node.execute(self.state)
+        
+        self.assertLess(time.monotonic() - started_at, 0.8)
+        self.assertEqual(self.llm.invoke.call_count, 3)
+        self.assertEqual(state["errors"], [])
+        self.assertTrue(all(state.get(content_type) for content_type in ("product_proposal", "marketing_copy", "content_suggestions")))
+    
+    def test_keeps_completed_content_when_one_call_fails(self):
+        """일부 콘텐츠 생성 실패 시 나머지 결과 보존 테스트"""
+        def flaky_invoke(messages):
+            if "마케팅" in messages[0].content:
+                raise RuntimeError("일시적 오류")
+            return Mock(content="1. 생성된 콘텐츠", usage_metadata=None)
+        
+        self.llm.invoke.side_effect = flaky_invoke
+        
+        state = self.node.execute(self.state)
+        
+        self.assertIsNone(state.get("marketing_copy"))
+        self.assertTrue(state.get("product_proposal"))
+        self.assertIn("마케팅 문구 생성 오류", state["errors"][0])
+
+class TestStateMerging(unittest.TestCase):
+    """병렬 노드 상태 병합 테스트"""
+    
+    def test_diff_state_returns_only_increments(self):
+        """노드 증분 계산 테스트"""
+        state = create_initial_state("트렌드 분석")
+        state["processing_steps"].append("이전 단계")
+        
+        working = fork_state(state)
+        working = update_state_step(working, "트렌드 분석 시작")
+        working = update_token_usage(working, 100, 50)
+        working["trend_analysis"] = {"raw_analysis": "분석"}
+        
+        delta = diff_state(state, working)
+        
+        self.assertEqual(len(state["processing_steps"]), 1)
+        self.assertEqual(len(delta["processing_steps"]), 1)
+        self.assertEqual(delta["token_usage"], {"input_tokens": 100, "output_tokens": 50})
+        self.assertIn("trend_analysis", delta)
+        self.assertNotIn("user_request", delta)
+        self.assertNotIn("errors", delta)
+    
+    def test_merge_counters_sums_parallel_updates(self):
+        """병렬 카운터 병합 테스트"""
+        merged = merge_counters({"input_tokens": 10}, {"input_tokens": 5, "output_tokens": 3})
+        
+        self.assertEqual(merged, {"input_tokens": 15, "output_tokens": 3})
+
+class TestNodeRegistry(unittest.TestCase):
+    """노드 레지스트리 테스트"""
+    
+    def setUp(self):
+        self.registry = NodeRegistry()
+    
+    def test_get_node_returns_shared_instance(self):
+        """노드와 클라이언트 재사용 테스트"""
+        node = self.registry.get_node("data_collection")
+        
+        self.assertIs(node, self.registry.get_node("data_collection"))
+        self.assertIs(node.naver_client, self.registry.get_naver_client())
+    
+    def test_unknown_node_raises(self):
+        """미등록 노드 조회 테스트"""
+        with self.assertRaises(KeyError):
+            self.registry.get_node("unknown")
+
+class TestBatchRunner(unittest.TestCase):
+    """배치 실행기 테스트"""
+    
+    def test_run_records_status_per_session(self):
+        """세션별 결과 상태 및 시간 초과 처리 테스트"""
+        async def fake_run(initial_state, use_cache=True):
+            if "느린" in initial_state["user_request"]:
+                await asyncio.sleep(1)
+            return {**initial_state, "errors": []}
+        
+        workflow = Mock()
+        workflow.run = fake_run
+        runner = BatchRunner(workflow=workflow, concurrency=2, session_timeout=0.1)
+        
+        summary = asyncio.run(runner.run([
+            {"user_request": "여름 트렌드"},
+            {"user_request": "느린 요청"}
+        ]))
+        
+        self.assertEqual(summary["total"], 2)
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["timed_out"], 1)
+    
+    def test_update_callback_receives_node_results(self):
+        """노드별 중간 결과 전달 테스트"""
+        async def fake_astream(initial_state, use_cache=True):
+            yield "step_1_collect", {"collected_data": {"naver_shopping": []}}
+            yield END, {**initial_state, "errors": []}
+        
+        workflow = Mock()
+        workflow.astream = fake_astream
+        updates = []
+        runner = BatchRunner(
+            workflow=workflow,
+            update_callback=lambda index, node_name, delta: updates.append((index, node_name))
+        )
+        
+        summary = asyncio.run(runner.run([{"user_request": "여름 트렌드"}]))
+        
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(updates, [(0, "step_1_collect")])
+    
+    @unittest.skipUnless(importlib.util.find_spec("airflow"), "airflow 미설치")
+    def test_trend_dag_collects_with_batch_runner(self):
+        """일일 DAG 수집 태스크가 배치 실행기로 키워드별 세션을 실행하고 요약을 XCom에 저장 테스트"""
+        from airflow_dags import fashion_trend_dag
+        
+        async def fake_run(requests, output_path=None):
+            return {"total": len(requests), "succeeded": len(requests), "partial": 0, "requests": requests}
+        
+        task_instance = Mock()
+        with patch.object(fashion_trend_dag, "BatchRunner") as runner_class:
+            runner_class.return_value.run = fake_run
+            result = fashion_trend_dag.collect_trend_data(ds_nodash="20240101", task_instance=task_instance)
+        
+        self.assertEqual(result, "트렌드 데이터 수집 성공")
+        summary = task_instance.xcom_push.call_args.kwargs["value"]
+        self.assertEqual(summary["total"], 12)
+        self.assertEqual(summary["requests"][0]["session_id"], "trend_20240101_00")
+    
+    def test_sessions_get_unique_ids(self):
+        """같은 시각에 생성된 세션 ID 중복 방지 테스트"""
+        session_ids = {create_initial_state("테스트")["session_id"] for _ in range(10)}
+        
+        self.assertEqual(len(session_ids), 10)
+
+class TestCheckpointStore(unittest.TestCase):
+    """체크포인트 저장소 테스트"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(os.path.join(self.temp_dir.name, "checkpoints.sqlite"))
+        self.state = create_initial_state("여름 트렌드", session_id="test_session")
+        self.store.save_session(self.state)
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_save_and_load_step(self):
+        """단계 결과 저장 및 복원 테스트"""
+        delta = {"trend_analysis": {"raw_analysis": "분석"}, "processing_steps": ["트렌드 분석 완료"]}
+        self.store.save_step("test_session", "trend_analysis", 0, delta)
+        
+        self.assertEqual(self.store.load_step("test_session", "trend_analysis", 0), delta)
+        self.assertIsNone(self.store.load_step("test_session", "trend_analysis", 1))
+        self.assertEqual(self.store.load_session("test_session")["user_request"], "여름 트렌드")
+    
+    def test_branch_copies_analysis_steps_only(self):
+        """분석 결과 기준 분기 테스트"""
+        for step in ["data_collection", "trend_analysis", "sentiment_analysis", "content_generation"]:
+            self.store.save_step("test_session", step, 0, {step: "결과"})
+        
+        branched = self.store.branch_session("test_session", overrides={"user_request": "마케팅 문구"})
+        branched_steps = [item["step"] for item in self.store.list_steps(branched["session_id"])]
+        
+        self.assertEqual(branched["user_request"], "마케팅 문구")
+        self.assertIn("trend_analysis", branched_steps)
+        self.assertNotIn("content_generation", branched_steps)
+
+class TestWorkflowResultCache(unittest.TestCase):
+    """워크플로우 결과 캐시 테스트"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "result_cache.sqlite")
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_request_key_ignores_whitespace_and_session(self):
+        """요청 정규화 테스트"""
+        first = create_initial_state("여름  원피스 트렌드", session_id="a")
+        second = create_initial_state(" 여름 원피스 트렌드", session_id="b")
+        other = create_initial_state("여름 원피스 트렌드", target_category="원피스")
+        
+        self.assertEqual(make_request_key(first), make_request_key(second))
+        self.assertNotEqual(make_request_key(first), make_request_key(other))
+    
+    def test_request_key_follows_routing_table(self):
+        """작업별 모델 라우팅이 바뀌면 다른 캐시 키 사용 테스트"""
+        state = create_initial_state("여름 트렌드")
+        key = make_request_key(state)
+        
+        with patch.dict(settings.llm_task_tiers, {"content_generation": "fast"}):
+            self.assertNotEqual(make_request_key(state), key)
+        
+        self.assertEqual(make_request_key(state), key)
+    
+    def test_cached_result_uses_current_session(self):
+        """캐시 적중 시 세션 정보 교체 테스트"""
+        cache = WorkflowResultCache(self.cache_path)
+        initial_state = create_initial_state("여름 트렌드", session_id="first")
+        final_state = {**initial_state, "trend_analysis": {"summary": "린넨"}, "token_usage": {"input_tokens": 100}}
+        cache.set(initial_state, final_state)
+        
+        cached = cache.get(create_initial_state("여름 트렌드", session_id="second"))
+        
+        self.assertEqual(cached["session_id"], "second")
+        self.assertEqual(cached["trend_analysis"], {"summary": "린넨"})
+        self.assertEqual(cached["token_usage"], {"input_tokens": 0})
+    
+    def test_disk_cache_ttl_and_lru(self):
+        """TTL 만료 및 LRU 제거 테스트"""
+        cache = DiskCache(self.cache_path, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        
+        expired = DiskCache(self.cache_path, ttl_seconds=-1)
+        self.assertIsNone(expired.get("a"))
+    
+    def test_disk_cache_get_and_set_many(self):
+        """여러 키 일괄 저장/조회 테스트"""
+        cache = DiskCache(self.cache_path)
+        cache.set_many({"a": {"score": 1}, "b": [2]})
+        
+        self.assertEqual(cache.get_many(["a", "b", "c", "a"]), {"a": {"score": 1}, "b": [2]})
+        self.assertEqual(DiskCache(self.cache_path, ttl_seconds=-1).get_many(["a", "b"]), {})
+    
+    def test_branch_regenerates_cached_session(self):
+        """결과 캐시에 있는 세션을 분기하면 캐시를 우회하고 콘텐츠를 다시 생성 테스트"""
+        from langgraph_agents.workflow import FashionWorkflow
+        
+        generated = []
+        
+        class FakeNode:
+            def __init__(self, name):
+                self.name = name
+            
+            async def aexecute(self, state):
+                if self.name == "content_generation":
+                    generated.append(state["user_request"])
+                    state["marketing_copy"] = f"{state['user_request']} 문구 {len(generated)}"
+                return state
+        
+        registry = Mock()
+        registry.get_node.side_effect = FakeNode
+        store = CheckpointStore(os.path.join(self.temp_dir.name, "checkpoints.sqlite"))
+        cache = WorkflowResultCache(self.cache_path)
+        workflow = FashionWorkflow(registry=registry, checkpointer=store, result_cache=cache)
+        
+        initial_state = create_initial_state("여름 트렌드", session_id="source")
+        first = asyncio.run(workflow.run(initial_state))
+        branched = asyncio.run(workflow.branch("source"))
+        
+        self.assertEqual(first["marketing_copy"], "여름 트렌드 문구 1")
+        self.assertEqual(branched["marketing_copy"], "여름 트렌드 문구 2")
+        self.assertEqual(cache.get(initial_state)["marketing_copy"], "여름 트렌드 문구 1")
+
+class TestSentimentAggregator(unittest.TestCase):
+    """시간 구간별 감성 집계 테스트"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.aggregator = SentimentAggregator(os.path.join(self.temp_dir.name, "sentiment_aggregate.sqlite"))
+        self.now = bucket_start(time.time(), "week") + 3 * 86400 + 12 * 3600
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def _observation(self, key: str, score: float, hours_ago: float) -> dict:
+        label = "positive" if score > 0.2 else "negative" if score < -0.2 else "neutral"
+        return {"key": key, "score": score, "label": label, "dimensions": [("keyword", "린넨")], "timestamp": self.now - hours_ago * 3600}
+    
+    def test_tumbling_and_sliding_windows(self):
+        """구간별(고정 창) 집계와 최근 N개 구간 합(이동 창) 테스트"""
+        recorded = self.aggregator.record([
+            self._observation("a", 0.8, 0),
+            self._observation("b", -0.4, 1),
+            self._observation("c", 0.2, 30),
+            self._observation("a", 0.8, 0)
+        ], now=self.now)
+        
+        self.assertEqual(recorded, 3)
+        self.assertEqual([bucket["count"] for bucket in self.aggregator.series("keyword", "린넨", "day", 3, now=self.now)], [0, 1, 2])
+        self.assertEqual(self.aggregator.window("keyword", "린넨", "hour", 2, now=self.now)["mean_score"], 0.2)
+        self.assertEqual(self.aggregator.window("keyword", "린넨", "week", 1, now=self.now)["count"], 3)
+        self.assertEqual(self.aggregator.window("keyword", "없음", now=self.now)["count"], 0)
+    
+    def test_dedupes_per_dimension_value(self):
+        """이미 집계한 텍스트도 새 카테고리/키워드에는 집계되는지 테스트"""
+        first = self._observation("a", 0.8, 0)
+        again = dict(self._observation("a", 0.8, 0), dimensions=[("keyword", "린넨"), ("category", "셔츠")])
+        
+        self.assertEqual(self.aggregator.record([first], now=self.now), 1)
+        self.assertEqual(self.aggregator.record([again], now=self.now), 1)
+        self.assertEqual(self.aggregator.record([again], now=self.now), 0)
+        self.assertEqual(self.aggregator.window("keyword", "린넨", "day", 1, now=self.now)["count"], 1)
+        self.assertEqual(self.aggregator.window("category", "셔츠", "day", 1, now=self.now)["count"], 1)
+    
+    @patch.object(settings, "sentiment_aggregate_retention", {"hour": 24, "day": 7, "week": 4})
+    def test_prunes_buckets_past_retention(self):
+        """보관 기간이 지난 구간 삭제 테스트"""
+        self.aggregator.record([self._observation("a", 0.8, 0)], now=self.now - 2 * 86400)
+        self.aggregator.record([self._observation("b", 0.8, 0)], now=self.now)
+        
+        self.assertEqual(self.aggregator.window("keyword", "린넨", "hour", 72, now=self.now)["count"], 1)
+        self.assertEqual(self.aggregator.window("keyword", "린넨", "day", 7, now=self.now)["count"], 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -5,6 +5,13 @@
 """
 
 import unittest
+import asyncio
+import threading
+import time
+import tempfile
+import tracemalloc
+import httpx
+import openai
 from unittest.mock import Mock, patch
 import sys
 import os
@@ -13,9 +20,25 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools.naver_api import NaverAPIClient
-from tools.web_scraper import WebScraper
+from tools.web_scraper import WebScraper, HostRateLimiter
 from tools.opensearch_client import OpenSearchClient
 from tools.mcp_client import MCPClient
+from utils.metrics import collect_metrics, track, summarize_metrics, record_llm_call
+from utils.deadline import deadline_scope, timeout_for, with_deadline, DeadlineExceeded
+from tools.llm_gateway import LLMGateway, ConcurrencyLimiter, TokenRateLimiter, served_model
+from tools.llm_cache import LLMResponseCache, is_cached_response
+from tools.llm_stub_server import LLMStubServer
+from tools.llm_router import get_routed_llm, model_pricing
+from tools.llm_budget import budget_scope, AdmissionController, BudgetLedger, BudgetExceeded, BATCH_POOL
+from config.settings import settings
+from utils.token_counter import (
+    count_tokens, count_message_tokens, fit_messages_to_budget, TokenBudgetExceeded, TRUNCATION_MARKER
+)
+from utils.prompt_packer import pack_items, compact_text
+from utils.sentiment_lexicon import score_texts
+from utils import keyword_matcher
+from utils.keyword_matcher import KeywordMatcher
+from langchain_core.messages import AIMessageChunk, HumanMessage, SystemMessage
 
 class TestNaverAPIClient(unittest.TestCase):
     """네이버 API 클라이언트 테스트"""
@@ -105,6 +128,21 @@ class TestWebScraper(unittest.TestCase):
         self.assertNotIn("<", clean_text)
         self.assertNotIn(">", clean_text)
     
+    def test_extract_fashion_keywords(self):
+        """패션 키워드를 대소문자 구분 없이 중복 없이 추출 테스트"""
+        keywords = self.scraper.extract_fashion_keywords("2024 ss 컬렉션: 블랙 린넨 원피스와 니트, 니트 카디건")
+        
+        self.assertEqual(keywords, ["원피스", "니트", "카디건", "컬렉션", "SS", "블랙", "린넨"])
+    
+    def test_spaces_requests_per_host(self):
+        """같은 호스트 요청은 간격을 두고, 다른 호스트 요청은 바로 시작 테스트"""
+        limiter = HostRateLimiter(0.5)
+        
+        self.assertEqual(limiter.reserve("https://www.vogue.co.kr/a"), 0.0)
+        self.assertAlmostEqual(limiter.reserve("https://www.vogue.co.kr/b"), 0.5, places=2)
+        self.assertAlmostEqual(limiter.reserve("https://WWW.VOGUE.CO.KR/c"), 1.0, places=2)
+        self.assertEqual(limiter.reserve("https://www.elle.co.kr/a"), 0.0)
+    
     def test_get_sample_data(self):
         """샘플 데이터 가져오기 테스트"""
         result = self.scraper.get_sample_articles()
@@ -190,5 +228,663 @@ class TestMCPClient(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn("main_trends", result)
 
+class TestMetrics(unittest.TestCase):
+    """도구 호출 계측 테스트"""
+    
+    def test_track_records_into_current_collection(self):
+        """계측 레코드 수집 테스트"""
+        with collect_metrics() as records:
+            with track("tool", "naver_shop", query="원피스") as record:
+                record["bytes_out"] = 128
+        
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["bytes_out"], 128)
+        self.assertGreaterEqual(records[0]["duration_ms"], 0)
+    
+    def test_track_records_error_and_reraises(self):
+        """실패한 호출 계측 테스트"""
+        with collect_metrics() as records:
+            with self.assertRaises(ValueError):
+                with track("llm", "trend_analysis"):
+                    raise ValueError("실패")
+        
+        summary = summarize_metrics(records)
+        self.assertEqual(summary["llm:trend_analysis"]["errors"], 1)
+    
+    def test_track_records_peak_memory_of_span(self):
+        """구간 동안의 힙 최대 증가량 기록 (이전 구간의 최대값은 포함하지 않음) 테스트"""
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        
+        with collect_metrics() as records:
+            with track("node", "large"):
+                buffer = bytearray(4 * 1024 * 1024)
+                del buffer
+            with track("node", "small"):
+                buffer = bytearray(64 * 1024)
+                del buffer
+        
+        self.assertGreaterEqual(records[0]["memory_peak_kb"], 4096)
+        self.assertLess(records[1]["memory_peak_kb"], 1024)
+        self.assertNotIn("peak_rss_kb", records[1])
+
+class TestDeadline(unittest.TestCase):
+    """세션 마감 시간 전파 테스트"""
+    
+    def test_timeout_limited_by_remaining_time(self):
+        """남은 시간에 따른 타임아웃 제한 테스트"""
+        self.assertEqual(timeout_for(10), 10)
+        
+        with deadline_scope(time.time() + 2):
+            self.assertLessEqual(timeout_for(10), 2)
+    
+    def test_with_deadline_raises_when_expired(self):
+        """마감 초과 시 예외 발생 테스트"""
+        async def slow_call():
+            await asyncio.sleep(1)
+        
+        async def run():
+            with deadline_scope(time.time() + 0.05):
+                await with_deadline(slow_call())
+        
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(run())
+    
+    @patch('requests.get')
+    def test_naver_search_skipped_after_deadline(self, mock_get):
+        """마감 이후 네이버 API 호출 생략 및 degraded 기록 테스트"""
+        client = NaverAPIClient()
+        client.client_id = "test-id"
+        client.client_secret = "test-secret"
+        
+        with deadline_scope(time.time() - 1) as degraded:
+            result = client.search_shopping("원피스")
+        
+        mock_get.assert_not_called()
+        self.assertIn("items", result)
+        self.assertEqual(len(degraded), 1)
+
+class _FakeChatClient:
+    """게이트웨이 테스트용 LLM 클라이언트 (지정한 오류를 차례로 발생시킨 뒤 성공)"""
+    
+    def __init__(self, errors=None, delay=0.0, delays=None):
+        self.errors = list(errors or [])
+        self.delay = delay
+        self.delays = list(delays or [])
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def _delay(self):
+        return self.delays.pop(0) if self.delays else self.delay
+    
+    def _next(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return Mock(content="응답", usage_metadata={"total_tokens": 10}, response_metadata={})
+    
+    def invoke(self, messages, **kwargs):
+        time.sleep(self._delay())
+        return self._next()
+    
+    async def ainvoke(self, messages, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay())
+            return self._next()
+        finally:
+            self.in_flight -= 1
+    
+    def stream(self, messages, **kwargs):
+        self.calls += 1
+        for index, text in enumerate(["스트리밍 ", "응답"]):
+            if self.errors and index == len(self.errors):
+                raise self.errors.pop(0)
+            yield AIMessageChunk(content=text)
+        yield AIMessageChunk(content="", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7})
+
+
+def _api_error(error_class, status_code):
+    """openai 상태 코드 오류 생성"""
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return error_class("오류", response=response, body=None)
+
+
+class TestLLMGateway(unittest.TestCase):
+    """공용 LLM 게이트웨이 테스트"""
+    
+    def _gateway(self, client, **kwargs):
+        kwargs.setdefault("response_cache", False)
+        gateway = LLMGateway(retry_backoff=0.0, **kwargs)
+        gateway._get_sync_client = lambda spec: client
+        gateway._get_async_client = lambda spec: client
+        return gateway
+    
+    def test_retries_rate_limit_and_server_errors(self):
+        """429/5xx 재시도 후 성공 테스트"""
+        client = _FakeChatClient(errors=[
+            _api_error(openai.RateLimitError, 429),
+            _api_error(openai.InternalServerError, 503)
+        ])
+        gateway = self._gateway(client, max_retries=3)
+        
+        response = gateway.invoke(("gpt-test", 0.7, 100), ["안녕하세요"])
+        
+        self.assertEqual(response.content, "응답")
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(gateway.stats()["retries"], 2)
+    
+    def test_does_not_retry_client_errors(self):
+        """400 오류는 재시도하지 않음 테스트"""
+        client = _FakeChatClient(errors=[_api_error(openai.BadRequestError, 400)])
+        gateway = self._gateway(client, max_retries=3)
+        
+        with self.assertRaises(openai.BadRequestError):
+            gateway.invoke(("gpt-test", 0.7, 100), ["안녕하세요"])
+        self.assertEqual(client.calls, 1)
+    
+    def test_limits_concurrent_requests_per_model(self):
+        """모델별 동시 요청 수 제한 테스트"""
+        client = _FakeChatClient(delay=0.02)
+        gateway = self._gateway(client, model_concurrency=2)
+        
+        async def run():
+            await asyncio.gather(*(
+                gateway.ainvoke(("gpt-test", 0.7, 100), ["안녕하세요"]) for _ in range(6)
+            ))
+        
+        asyncio.run(run())
+        
+        self.assertEqual(client.calls, 6)
+        self.assertEqual(client.max_in_flight, 2)
+    
+    def test_concurrency_limiter_hands_slots_in_order(self):
+        """반환된 슬롯을 기다린 순서대로 넘기고(다른 스레드에서 반환 포함), 취소된 대기자는 건너뜀 테스트"""
+        limiter = ConcurrencyLimiter(1)
+        order = []
+        
+        async def worker(name):
+            await limiter.aacquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+        
+        async def run():
+            limiter.acquire()
+            tasks = [asyncio.ensure_future(worker(name)) for name in "abc"]
+            await asyncio.sleep(0.01)
+            tasks[1].cancel()
+            threading.Timer(0.01, limiter.release).start()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        asyncio.run(run())
+        
+        self.assertEqual(order, ["a", "c"])
+        limiter.acquire()
+        limiter.release()
+        with self.assertRaises(ValueError):
+            limiter.release()
+    
+    def test_token_rate_limiter_waits_when_exhausted(self):
+        """분당 토큰 한도 초과 시 대기 시간 반환 테스트"""
+        limiter = TokenRateLimiter(tokens_per_minute=600)
+        
+        self.assertEqual(limiter.reserve(600), 0.0)
+        self.assertGreater(limiter.reserve(60), 0.0)
+        
+        # 실제 사용량이 예약보다 적으면 차이만큼 반환
+        limiter.settle(600, 100)
+        self.assertEqual(limiter.reserve(60), 0.0)
+    
+    def test_response_cache_hit_and_bypass(self):
+        """같은 프롬프트는 캐시에서 토큰 사용 없이 반환, use_cache=False면 우회 테스트"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            client = _FakeChatClient()
+            cache = LLMResponseCache(os.path.join(temp_dir, "llm_cache.sqlite"))
+            gateway = self._gateway(client, response_cache=cache)
+            messages = [SystemMessage(content="시스템"), HumanMessage(content="여름 트렌드")]
+            
+            gateway.invoke(("gpt-test", 0.7, 100), messages)
+            cached = gateway.invoke(("gpt-test", 0.7, 100), messages)
+            
+            self.assertEqual(client.calls, 1)
+            self.assertEqual(cached.content, "응답")
+            self.assertTrue(is_cached_response(cached))
+            self.assertEqual(cached.usage_metadata["total_tokens"], 0)
+            
+            # temperature가 다르거나 캐시를 우회하면 다시 호출
+            gateway.invoke(("gpt-test", 0.3, 100), messages)
+            gateway.invoke(("gpt-test", 0.7, 100), messages, use_cache=False)
+            
+            self.assertEqual(client.calls, 3)
+            self.assertEqual(cache.stats()["hits"], 1)
+            self.assertEqual(cache.stats()["misses"], 2)
+    
+    def test_rejects_prompt_over_budget_before_calling(self):
+        """토큰 예산을 줄여도 맞출 수 없는 요청은 호출하지 않음 테스트"""
+        client = _FakeChatClient()
+        gateway = self._gateway(client)
+        messages = [SystemMessage(content="지시문 " * 5000), HumanMessage(content="데이터")]
+        
+        with self.assertRaises(TokenBudgetExceeded):
+            gateway.invoke(("gpt-4", 0.7, 4000), messages)
+        self.assertEqual(client.calls, 0)
+    
+    def test_streams_tokens_and_returns_full_response(self):
+        """토큰 스트리밍 후 전체 응답 반환, 토큰 전달 후 실패는 재시도하지 않음 테스트"""
+        tokens = []
+        gateway = self._gateway(_FakeChatClient(), max_retries=3)
+        
+        response = gateway.invoke(("gpt-test", 0.7, 100), ["안녕하세요"], on_token=tokens.append)
+        
+        self.assertEqual(tokens, ["스트리밍 ", "응답"])
+        self.assertEqual(response.content, "스트리밍 응답")
+        self.assertEqual(response.usage_metadata["total_tokens"], 7)
+        
+        client = _FakeChatClient(errors=[_api_error(openai.InternalServerError, 503)])
+        gateway = self._gateway(client, max_retries=3)
+        
+        with self.assertRaises(openai.InternalServerError):
+            gateway.invoke(("gpt-test", 0.7, 100), ["안녕하세요"], on_token=tokens.append)
+        self.assertEqual(client.calls, 1)
+    
+    @patch.object(settings, "llm_hedge_budget_ratio", 0.5)
+    def test_hedges_slow_requests_within_budget(self):
+        """관측 p95 안에 응답이 없으면 헤지 요청의 응답 사용, 예산을 넘으면 헤지하지 않음 테스트"""
+        client = _FakeChatClient(delays=[0.0, 1.0, 0.0, 0.3])
+        gateway = self._gateway(client)
+        for _ in range(settings.llm_hedge_min_samples):
+            gateway._record_latency(("gpt-test", None), 0.01)
+        
+        gateway.invoke(("gpt-test", 0.7, 100), ["첫 요청"], hedge=True)
+        
+        started = time.monotonic()
+        response = gateway.invoke(("gpt-test", 0.7, 100), ["느린 요청"], hedge=True)
+        
+        self.assertEqual(response.content, "응답")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(gateway.stats()["hedged"], 1)
+        self.assertEqual(gateway.stats()["hedge_wins"], 1)
+        
+        # 헤지 대상 호출 3건 중 추가 요청은 1건까지만 허용
+        gateway.invoke(("gpt-test", 0.7, 100), ["느린 요청"], hedge=True)
+        
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(gateway.stats()["hedged"], 1)
+    
+    def test_records_latency_per_task_for_hedged_calls_only(self):
+        """헤지 대상 호출의 응답 시간만 (모델, 작업)별로 기록 테스트"""
+        gateway = self._gateway(_FakeChatClient())
+        
+        gateway.invoke(("gpt-test", 0.7, 100), ["긴 생성"], task="content_generation")
+        gateway.invoke(("gpt-test", 0.7, 100), ["감성 점수"], hedge=True, task="sentiment_analysis")
+        
+        self.assertEqual(list(gateway._latencies), [("gpt-test", "sentiment_analysis")])
+    
+    @patch.object(settings, "llm_hedge_budget_ratio", 1.0)
+    def test_reports_usage_of_every_hedged_request(self):
+        """헤지 요청을 포함해 보낸 요청마다 사용량 전달 (취소된 늦은 요청은 입력 토큰만) 테스트"""
+        client = _FakeChatClient(delays=[1.0, 0.0])
+        gateway = self._gateway(client)
+        for _ in range(settings.llm_hedge_min_samples):
+            gateway._record_latency(("gpt-test", None), 0.01)
+        usages = []
+        
+        async def run():
+            response = await gateway.ainvoke(("gpt-test", 0.7, 100), ["느린 요청"], hedge=True, on_usage=usages.append)
+            await asyncio.sleep(0.05)
+            return response
+        
+        self.assertEqual(asyncio.run(run()).content, "응답")
+        self.assertEqual(len(usages), 2)
+        self.assertGreater(usages[0]["output_tokens"], 0)
+        self.assertEqual(usages[1]["output_tokens"], 0)
+        self.assertEqual(usages[1]["input_tokens"], usages[0]["input_tokens"])
+
+
+class TestLLMStubServer(unittest.TestCase):
+    """로컬 LLM 대체 서버 테스트"""
+    
+    def _gateway(self, server, **kwargs):
+        gateway = LLMGateway(response_cache=False, retry_backoff=0.0, **kwargs)
+        gateway.base_url = server.base_url
+        self.addCleanup(gateway.close)
+        return gateway
+    
+    def _server(self, **kwargs):
+        server = LLMStubServer(port=0, latency_ms=0, tokens_per_second=0, seed=1, **kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+    
+    @patch.object(settings, "openai_api_key", "sk-test")
+    def test_serves_prompt_shaped_responses(self):
+        """프롬프트 형식에 맞는 응답과 스트리밍 응답 테스트"""
+        server = self._server()
+        gateway = self._gateway(server)
+        messages = [
+            SystemMessage(content="당신은 패션 업계의 전문 트렌드 애널리스트입니다."),
+            HumanMessage(content="**타겟 카테고리:** 원피스")
+        ]
+        
+        response = gateway.invoke(("gpt-test", 0.7, 500), messages)
+        tokens = []
+        streamed = gateway.invoke(("gpt-test", 0.7, 500), messages, on_token=tokens.append)
+        
+        self.assertTrue(response.content.startswith("1. 주요 트렌드 요약"))
+        self.assertIn("원피스", response.content)
+        self.assertGreater(response.usage_metadata["output_tokens"], 0)
+        self.assertGreater(len(tokens), 10)
+        self.assertEqual("".join(tokens), streamed.content)
+        self.assertEqual(server.stats()["streamed"], 1)
+    
+    @patch.object(settings, "openai_api_key", "sk-test")
+    def test_injects_rate_limit_errors(self):
+        """429 오류 주입 시 게이트웨이 재시도 테스트"""
+        server = self._server(rate_limit_rate=1.0)
+        gateway = self._gateway(server, max_retries=1)
+        
+        with self.assertRaises(openai.RateLimitError):
+            gateway.invoke(("gpt-test", 0.7, 100), [HumanMessage(content="안녕하세요")])
+        
+        self.assertEqual(server.stats()["rate_limited"], 2)
+        self.assertEqual(gateway.stats()["retries"], 1)
+
+class TestLLMRouter(unittest.TestCase):
+    """작업별 모델 등급 라우팅 테스트"""
+    
+    @patch.object(settings, "openai_api_key", "sk-test")
+    def test_routes_tasks_to_tiers(self):
+        """작업별 등급 모델과 가격 적용 테스트"""
+        sentiment = get_routed_llm("sentiment_analysis")
+        trend = get_routed_llm("trend_analysis")
+        
+        self.assertEqual(sentiment.model_name, settings.llm_model_tiers["fast"]["model"])
+        self.assertEqual(sentiment.temperature, settings.llm_model_tiers["fast"]["temperature"])
+        self.assertEqual(trend.model_name, settings.openai_model)
+        self.assertEqual(get_routed_llm("unknown_task").model_name, settings.openai_model)
+        self.assertLess(model_pricing(sentiment.model_name)[0], model_pricing(trend.model_name)[0])
+    
+    @patch.object(settings, "openai_api_key", "sk-test")
+    def test_falls_back_when_deadline_or_budget_at_risk(self):
+        """마감 임박/예산 소진 시 대체 등급 사용 테스트"""
+        llm = get_routed_llm("trend_analysis")
+        
+        self.assertIs(llm.select(), llm.primary)
+        
+        with deadline_scope(time.time() + 1) as degraded:
+            self.assertIs(llm.select(), llm.fallback)
+        self.assertEqual(len(degraded), 1)
+        
+        self.assertIs(llm.select(budget_ratio=0.1), llm.fallback)
+        self.assertIs(llm.select(budget_ratio=0.9), llm.primary)
+    
+    @patch.object(settings, "openai_api_key", "sk-test")
+    @patch.object(settings, "budget_enabled", False)
+    def test_reports_model_that_served_the_call(self):
+        """대체 등급으로 호출하면 응답과 계측 레코드에 실제로 사용한 모델 기록 테스트"""
+        llm = get_routed_llm("trend_analysis")
+        client = _FakeChatClient()
+        
+        with patch.object(llm.fallback.gateway, "_get_sync_client", return_value=client), \
+             patch.object(llm, "select", return_value=llm.fallback), \
+             collect_metrics() as records:
+            with track("llm", "trend_analysis", model=llm.model_name) as record:
+                response = llm.invoke(["트렌드 분석"], use_cache=False)
+                record_llm_call(record, ["트렌드 분석"], response)
+        
+        self.assertNotEqual(llm.fallback.model_name, llm.model_name)
+        self.assertEqual(served_model(response, llm), llm.fallback.model_name)
+        self.assertEqual(records[0]["model"], llm.fallback.model_name)
+
+class TestLLMBudget(unittest.TestCase):
+    """LLM 비용 예산 승인 제어 테스트"""
+    
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.ledger = BudgetLedger(os.path.join(temp_dir.name, "budget.sqlite"))
+        self.controller = AdmissionController(self.ledger)
+        
+        patcher = patch("tools.llm_router.get_admission_controller", return_value=self.controller)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.attempts = 1
+    
+    def _routed(self, task):
+        """실제 요청 없이 고정 사용량을 응답하는 작업별 모델"""
+        with patch.object(settings, "openai_api_key", "sk-test"):
+            llm = get_routed_llm(task)
+        
+        response = Mock(content="응답", usage_metadata={"input_tokens": 100, "output_tokens": 1000}, response_metadata={})
+        
+        def invoke(messages, on_usage=None, **kwargs):
+            # 게이트웨이처럼 보낸 요청마다 사용량 전달 (attempts개 요청)
+            for _ in range(self.attempts):
+                if on_usage:
+                    on_usage(response.usage_metadata)
+            return response
+        
+        for model in (llm.primary, llm.fallback):
+            if model is not None:
+                model.invoke = Mock(side_effect=invoke)
+        return llm
+    
+    @patch.object(settings, "budget_session_usd", 0.05)
+    def test_downgrades_model_and_records_actual_spend(self):
+        """예상 비용이 남은 세션 예산을 넘으면 대체 등급으로 호출하고 실제 비용을 원장에 기록 테스트"""
+        llm = self._routed("trend_analysis")
+        
+        with deadline_scope(None) as degraded, budget_scope("session-1", "user-1") as scope:
+            llm.invoke(["트렌드 분석"])
+            available, _ = self.controller.available(scope)
+        
+        llm.primary.invoke.assert_not_called()
+        llm.fallback.invoke.assert_called_once()
+        self.assertEqual(len(degraded), 1)
+        
+        input_price, output_price = model_pricing(llm.fallback.model_name)
+        cost = (100 * input_price + 1000 * output_price) / 1000
+        self.assertAlmostEqual(available, 0.05 - cost)
+        user_key = ("user", "user-1", time.strftime("%Y-%m-%d"))
+        self.assertAlmostEqual(self.ledger.spent([user_key])[user_key], cost)
+    
+    def test_settles_usage_of_hedged_requests(self):
+        """헤지 요청을 포함한 모든 요청의 사용량 합계로 정산 테스트"""
+        llm = self._routed("sentiment_analysis")
+        self.attempts = 2
+        
+        with budget_scope("session-4"):
+            llm.invoke(["감성 분석"])
+        
+        input_price, output_price = model_pricing(llm.primary.model_name)
+        session_key = ("session", "session-4", "")
+        self.assertAlmostEqual(self.ledger.spent([session_key])[session_key], 2 * (100 * input_price + 1000 * output_price) / 1000)
+    
+    @patch.object(settings, "budget_session_usd", 1.0)
+    def test_admission_reserves_across_workers(self):
+        """검사와 예약을 함께 처리하여 다른 워커(컨트롤러)의 예약도 남은 예산에서 제외 테스트"""
+        other = AdmissionController(BudgetLedger(self.ledger.db_path))
+        scope = {"session_id": "session-3", "user_id": None, "pool": "interactive"}
+        
+        reservation, available = self.controller.admit(scope, 0.6)
+        self.assertIsNotNone(reservation)
+        self.assertAlmostEqual(available, 1.0)
+        
+        rejected, available = other.admit(scope, 0.6)
+        self.assertIsNone(rejected)
+        self.assertAlmostEqual(available, 0.4)
+        
+        self.controller.settle(reservation, 0.1)
+        self.assertIsNotNone(other.admit(scope, 0.6)[0])
+        self.assertAlmostEqual(other.available(scope)[0], 0.3)
+    
+    @patch.object(settings, "budget_session_usd", 0.0011)
+    @patch.object(settings, "budget_min_prompt_tokens", 100)
+    def test_shrinks_prompt_then_rejects_when_budget_runs_out(self):
+        """남은 예산에 맞춰 프롬프트를 줄이고, 하한보다 줄여야 하면 호출하지 않음 테스트"""
+        llm = self._routed("sentiment_analysis")
+        prompt = "리뷰 " * 3000
+        
+        with budget_scope("session-2"):
+            llm.invoke([prompt])
+            self.assertLess(llm.primary.invoke.call_args.kwargs["max_prompt_tokens"], count_message_tokens([prompt]))
+            
+            with self.assertRaises(BudgetExceeded):
+                llm.invoke([prompt])
+        
+        self.assertEqual(llm.primary.invoke.call_count, 1)
+        self.assertEqual(self.controller.stats()["rejected"], 1)
+    
+    @patch.object(settings, "budget_batch_usd_per_minute", 60.0)
+    def test_batch_pool_is_rate_limited_separately(self):
+        """배치 풀은 분당 지출 한도까지 대기하고 대화형 풀은 대기하지 않음 테스트"""
+        controller = AdmissionController(self.ledger)
+        batch = {"session_id": None, "user_id": None, "pool": BATCH_POOL}
+        interactive = {"session_id": None, "user_id": None, "pool": "interactive"}
+        
+        controller.throttle(batch, 60.0)
+        started = time.monotonic()
+        controller.throttle(interactive, 60.0)
+        self.assertLess(time.monotonic() - started, 0.1)
+        
+        controller.throttle(batch, 0.3)
+        self.assertGreater(time.monotonic() - started, 0.2)
+        self.assertGreater(controller.stats()["queued_seconds"], 0)
+
+class TestTokenCounter(unittest.TestCase):
+    """토큰 계산 및 예산 검사 테스트"""
+    
+    def test_counts_korean_text_closer_than_character_estimate(self):
+        """한글 텍스트는 글자 수 / 4보다 많은 토큰으로 계산 테스트"""
+        text = "여름 린넨 원피스 트렌드 분석"
+        
+        self.assertGreater(count_tokens(text), len(text) // 4)
+        self.assertEqual(count_tokens(text), count_tokens(text))
+        self.assertGreater(count_message_tokens([text, text]), 2 * count_tokens(text))
+    
+    def test_shrinks_user_prompt_keeping_head_and_tail(self):
+        """예산 초과 시 사용자 프롬프트 가운데를 생략 테스트"""
+        messages = [
+            SystemMessage(content="시스템 지시문"),
+            HumanMessage(content="앞부분 지시문\n" + "수집 데이터 " * 3000 + "\n답변 형식")
+        ]
+        
+        fitted, prompt_tokens = fit_messages_to_budget(messages, "gpt-4", 4000, max_prompt_tokens=1000)
+        
+        self.assertLessEqual(prompt_tokens, 1000)
+        self.assertEqual(fitted[0].content, "시스템 지시문")
+        self.assertTrue(fitted[1].content.startswith("앞부분 지시문"))
+        self.assertTrue(fitted[1].content.endswith("답변 형식"))
+        self.assertIn(TRUNCATION_MARKER, fitted[1].content)
+        self.assertIn("수집 데이터 " * 3000, messages[1].content)
+
+class TestPromptPacker(unittest.TestCase):
+    """프롬프트 데이터 패킹 테스트"""
+    
+    def test_packs_within_budget_without_duplicates(self):
+        """중복 제거, 예산 준수, 긴 본문 자르기 테스트"""
+        items = [
+            {"text": "<b>린넨</b> 셔츠 여름 추천!!!!", "score": 0.9, "groups": ["a"]},
+            {"text": "린넨 셔츠 여름 추천", "score": 0.8, "groups": ["b"]},
+            {"text": "긴 리뷰 " * 200, "score": 0.7, "groups": ["c"]}
+        ]
+        
+        selected = pack_items(items, budget=120, max_item_tokens=60)
+        lines = [item["line"] for item in selected]
+        
+        self.assertEqual(compact_text(items[0]["text"]), "린넨 셔츠 여름 추천!")
+        self.assertEqual(len(selected), 2)
+        self.assertTrue(lines[1].endswith("…"))
+        self.assertLessEqual(sum(count_tokens(line) + 1 for line in lines), 120)
+    
+    def test_prefers_diverse_groups(self):
+        """같은 그룹 항목이 몰리지 않도록 다양성 반영 테스트"""
+        items = [
+            {"text": f"인스타그램 게시글 {word}", "score": 1.0, "groups": ["instagram"]}
+            for word in ("하나", "둘", "셋")
+        ] + [{"text": "틱톡 영상 후기", "score": 0.7, "groups": ["tiktok"]}]
+        
+        selected = pack_items(items, budget=1000)
+        
+        self.assertEqual([item["groups"][0] for item in selected[:2]], ["instagram", "tiktok"])
+
+class TestSentimentLexicon(unittest.TestCase):
+    """감성 사전 채점 테스트"""
+    
+    def test_handles_negation_and_intensifiers(self):
+        """부정 표현은 극성을 뒤집고 강조 표현은 점수를 키움 테스트"""
+        plain, intense, negated, no_complaint, compound = score_texts([
+            "예뻐요", "정말 예뻐요", "안 예뻐요", "불만 없어요", "비추천합니다"
+        ])
+        
+        self.assertEqual(plain["label"], "positive")
+        self.assertGreater(intense["score"], plain["score"])
+        self.assertEqual(negated["label"], "negative")
+        self.assertEqual(no_complaint["label"], "positive")
+        self.assertEqual(compound["negative_terms"], ["비추"])
+    
+    def test_confidence_reflects_mixed_and_long_neutral_texts(self):
+        """긍정/부정이 섞이거나 감성 표현 없이 긴 텍스트는 신뢰도가 낮음 테스트"""
+        clear, mixed, title, long_text = score_texts([
+            "정말 예쁘고 편해요",
+            "예쁜데 비침이 있어서 아쉬워요",
+            "여성 린넨 원피스",
+            "색감이 화면과 달라요. 사이즈는 한 치수 크게 나온 것 같으니 참고하세요."
+        ])
+        
+        self.assertGreater(clear["confidence"], mixed["confidence"])
+        self.assertGreater(title["confidence"], long_text["confidence"])
+        self.assertEqual(title["label"], "neutral")
+
+class TestKeywordMatcher(unittest.TestCase):
+    """다중 키워드 매처 테스트"""
+    
+    def test_finds_overlapping_matches_with_offsets(self):
+        """겹치는 키워드를 포함한 모든 일치 위치를 한 번에 반환 테스트"""
+        matcher = KeywordMatcher(["he", "she", "his", "hers", "울", "울트라"])
+        
+        self.assertEqual(matcher.find_all("ushers 울트라"), [
+            (1, 4, "she"), (2, 4, "he"), (2, 6, "hers"), (7, 8, "울"), (7, 10, "울트라")
+        ])
+        self.assertEqual(matcher.find("ushers"), ["he", "she", "hers"])
+        self.assertTrue(matcher.contains_any("this"))
+        self.assertFalse(matcher.contains_any("타이틀"))
+    
+    def test_matches_naive_scan(self):
+        """키워드별 `in` 검사와 같은 결과 (대소문자 무시 포함) 테스트"""
+        keywords = ["SS", "FW", "니트", "니트웨어", "트", "웨어러블", "s"]
+        texts = ["", "FW 니트웨어 트렌드", "ss 시즌 웨어러블 니트", "Sss 니트니트"]
+        
+        sensitive = KeywordMatcher(keywords)
+        insensitive = KeywordMatcher(keywords, ignore_case=True)
+        for text in texts:
+            self.assertEqual(sensitive.find(text), [keyword for keyword in keywords if keyword in text])
+            self.assertEqual(insensitive.find(text), [keyword for keyword in keywords if keyword.lower() in text.lower()])
+    
+    def test_backends_agree(self):
+        """어휘 크기에 따른 검색 방식(키워드별 검색/순수 파이썬 오토마톤/pyahocorasick)의 결과 일치 테스트"""
+        keywords = ["SS", "FW", "니트", "니트웨어", "트", "웨어러블", "s", "울", "울트라"]
+        text = "Sss FW 니트웨어 울트라 웨어러블 니트니트 트렌드"
+        backends = [("scan", 1000, False), ("automaton", 0, False)]
+        if keyword_matcher.AHOCORASICK_AVAILABLE:
+            backends.append(("ahocorasick", 0, True))
+        
+        results = []
+        for backend, limit, native in backends:
+            with patch.object(keyword_matcher, "SCAN_MAX_KEYWORDS", limit), \
+                 patch.object(keyword_matcher, "PYTHON_SCAN_MAX_KEYWORDS", limit), \
+                 patch.object(keyword_matcher, "AHOCORASICK_AVAILABLE", native):
+                matcher = KeywordMatcher(keywords, ignore_case=True)
+            
+            self.assertEqual(matcher.backend, backend)
+            results.append((matcher.find_all(text), matcher.find(text), matcher.contains_any(text), matcher.contains_any("없음")))
+        
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+        self.assertEqual(results[0][1], keywords)
+        self.assertEqual(results[0][2:], (True, False))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -6,10 +6,16 @@ from .naver_api import NaverAPIClient
 from .web_scraper import WebScraper
 from .opensearch_client import OpenSearchClient
 from .mcp_client import MCPClient
+from .llm_gateway import LLMGateway, get_llm_gateway
+from .llm_router import LLMRouter, get_routed_llm
 
 __all__ = [
     "NaverAPIClient",
     "WebScraper", 
     "OpenSearchClient",
-    "MCPClient"
+    "MCPClient",
+    "LLMGateway",
+    "get_llm_gateway",
+    "LLMRouter",
+    "get_routed_llm"
 ] 
\ No newline at end of file
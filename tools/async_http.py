@@ -0,0 +1,44 @@
+"""
+Fashion AI Automation System - Shared Async HTTP Client
+
+이벤트 루프별로 하나의 httpx.AsyncClient를 공유하여
+네이버 API, 웹 스크래핑 등의 비동기 요청에서 커넥션을 재사용합니다.
+"""
+
+import asyncio
+import weakref
+
+import httpx
+
+
+# 커넥션 풀 설정
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# httpx 커넥션은 생성된 이벤트 루프에 묶이므로 루프별로 클라이언트를 보관
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프의 공유 AsyncClient 반환"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=DEFAULT_LIMITS,
+            follow_redirects=True
+        )
+        _clients[loop] = client
+    
+    return client
+
+
+async def aclose_async_client():
+    """현재 이벤트 루프의 공유 AsyncClient 종료"""
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    
+    if client is not None and not client.is_closed:
+        await client.aclose()
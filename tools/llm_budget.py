@@ -0,0 +1,369 @@
+"""
+Fashion AI Automation System - LLM Cost Budget
+
+LLM 호출 전에 세션/사용자/일별 비용 예산을 검사하는 승인(admission) 제어입니다.
+
+- 지출과 진행 중인 예약은 SQLite 원장(data/llm_budget.sqlite)에 기록되어 프로세스 재시작과
+  여러 워커 간에 공유 (예산 검사와 예약은 한 쓰기 트랜잭션에서 처리하므로 동시 호출이 함께 통과하지 않음)
+- 예산 구분: 세션 전체, 사용자별 일 예산, 풀(interactive/batch)별 일 예산
+- 대화형 사용자와 배치(Airflow DAG)는 서로 다른 풀을 사용하며, 배치 풀은 분당 지출 한도로
+  대기(큐잉)하므로 한꺼번에 몰려도 대화형 예산을 소진하지 않음
+- 호출 전 예상 비용(프롬프트 토큰 + 최대 출력 토큰)을 예약하고, 응답 후 실제 사용량으로 정산
+  (헤지 요청을 포함해 실제로 보낸 모든 요청의 사용량 합계)
+
+예산이 부족할 때의 대체(모델 등급 하향, 프롬프트 축소)는 tools.llm_router에서 결정합니다.
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from config.settings import settings
+from utils.deadline import remaining
+from .llm_gateway import TokenRateLimiter
+
+
+# 예산 풀
+INTERACTIVE_POOL = "interactive"
+BATCH_POOL = "batch"
+
+# (구분, 키, 날짜) - 세션 예산은 날짜 없이 누적
+BudgetKey = Tuple[str, str, str]
+
+# 현재 실행 중인 호출의 예산 주체 (워크플로우가 노드 실행 시 설정)
+_budget_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("budget_scope", default=None)
+
+
+class BudgetExceeded(RuntimeError):
+    """LLM 비용 예산 소진 (호출하지 않음)"""
+
+
+@contextmanager
+def budget_scope(session_id: Optional[str] = None, user_id: Optional[str] = None, pool: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """블록 안의 LLM 호출에 예산 주체(세션, 사용자, 풀)를 전달"""
+    scope = {"session_id": session_id, "user_id": user_id, "pool": pool or INTERACTIVE_POOL}
+    token = _budget_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _budget_scope.reset(token)
+
+
+def current_scope() -> Dict[str, Any]:
+    """현재 예산 주체 (워크플로우 밖의 호출은 사용자 없는 대화형 풀)"""
+    return _budget_scope.get() or {"session_id": None, "user_id": None, "pool": INTERACTIVE_POOL}
+
+
+def _headroom(limits: List[Tuple[BudgetKey, float]], committed: Dict[BudgetKey, float]) -> Tuple[float, float]:
+    """가장 빠듯한 예산의 (남은 금액, 남은 비율) (예산이 없으면 (inf, 1.0))"""
+    amount, ratio = math.inf, 1.0
+    for key, limit in limits:
+        left = limit - committed.get(key, 0.0)
+        amount = min(amount, left)
+        ratio = min(ratio, left / limit)
+    return max(0.0, amount), max(0.0, ratio)
+
+
+class BudgetLedger:
+    """예산 키별 지출과 예약 원장 (SQLite)"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or settings.budget_db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._initialize()
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """요청마다 새 연결 사용"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (BEGIN IMMEDIATE - 다른 워커의 검사/예약과 섞이지 않음)"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    def _initialize(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS spend (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    cost REAL NOT NULL DEFAULT 0,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key, day)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reservations (
+                    id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    cost REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (id, kind, key, day)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_reservations_key ON reservations (kind, key, day)")
+    
+    def spent(self, keys: List[BudgetKey]) -> Dict[BudgetKey, float]:
+        """키별 누적 지출 (USD)"""
+        result = {key: 0.0 for key in keys}
+        if not keys:
+            return result
+        
+        try:
+            with self._lock, self._connect() as conn:
+                for key in keys:
+                    row = conn.execute(
+                        "SELECT cost FROM spend WHERE kind = ? AND key = ? AND day = ?",
+                        key
+                    ).fetchone()
+                    if row:
+                        result[key] = row[0]
+        except sqlite3.Error as e:
+            print(f"예산 원장 조회 오류: {e}")
+        
+        return result
+    
+    def add(self, keys: List[BudgetKey], cost: float):
+        """여러 키에 같은 지출 기록"""
+        try:
+            with self._lock, self._connect() as conn:
+                self._add(conn, keys, cost, time.time())
+        except sqlite3.Error as e:
+            print(f"예산 원장 기록 오류: {e}")
+    
+    def _add(self, conn: sqlite3.Connection, keys: List[BudgetKey], cost: float, now: float):
+        """지출 누적 (호출한 트랜잭션 안에서 실행)"""
+        for kind, key, day in keys:
+            conn.execute(
+                """
+                INSERT INTO spend (kind, key, day, cost, calls, updated_at) VALUES (?, ?, ?, ?, 1, ?)
+                ON CONFLICT (kind, key, day) DO UPDATE SET
+                    cost = cost + excluded.cost, calls = calls + 1, updated_at = excluded.updated_at
+                """,
+                (kind, key, day, cost, now)
+            )
+    
+    def _committed(self, conn: sqlite3.Connection, keys: List[BudgetKey], now: float) -> Dict[BudgetKey, float]:
+        """키별 지출 + 만료되지 않은 예약 합계 (모든 워커 기준)"""
+        result = {}
+        for key in keys:
+            spent = conn.execute("SELECT cost FROM spend WHERE kind = ? AND key = ? AND day = ?", key).fetchone()
+            reserved = conn.execute(
+                "SELECT COALESCE(SUM(cost), 0) FROM reservations WHERE kind = ? AND key = ? AND day = ? AND expires_at > ?",
+                (*key, now)
+            ).fetchone()
+            result[key] = (spent[0] if spent else 0.0) + reserved[0]
+        return result
+    
+    def available(self, limits: List[Tuple[BudgetKey, float]]) -> Tuple[float, float]:
+        """가장 빠듯한 예산의 (남은 금액, 남은 비율) (진행 중인 예약 포함)"""
+        committed = {}
+        try:
+            with self._lock, self._connect() as conn:
+                committed = self._committed(conn, [key for key, _ in limits], time.time())
+        except sqlite3.Error as e:
+            print(f"예산 원장 조회 오류: {e}")
+        
+        return _headroom(limits, committed)
+    
+    def admit(self, limits: List[Tuple[BudgetKey, float]], cost: float, ttl: float) -> Tuple[Optional[str], float]:
+        """남은 예산이 예상 비용 이상이면 예약 (검사와 예약을 한 쓰기 트랜잭션에서 처리)
+        
+        Args:
+            ttl: 예약 만료 시간 (정산하지 못하고 종료된 워커의 예약은 만료 후 해제)
+        
+        Returns:
+            (예약 ID - 예산이 부족하면 None, 예약 전 남은 금액)
+        """
+        reservation_id = uuid.uuid4().hex
+        now = time.time()
+        
+        try:
+            with self._lock, self._transaction() as conn:
+                conn.execute("DELETE FROM reservations WHERE expires_at <= ?", (now,))
+                amount, _ = _headroom(limits, self._committed(conn, [key for key, _ in limits], now))
+                if cost > amount:
+                    return None, amount
+                
+                conn.executemany(
+                    "INSERT INTO reservations VALUES (?, ?, ?, ?, ?, ?)",
+                    [(reservation_id, *key, cost, now + ttl) for key, _ in limits]
+                )
+                return reservation_id, amount
+        
+        except sqlite3.Error as e:
+            print(f"예산 원장 예약 오류: {e}")
+            return reservation_id, math.inf
+    
+    def settle(self, reservation_id: str, keys: List[BudgetKey], cost: float):
+        """예약 해제와 실제 지출 기록 (한 트랜잭션)"""
+        try:
+            with self._lock, self._transaction() as conn:
+                conn.execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+                if cost > 0:
+                    self._add(conn, keys, cost, time.time())
+        except sqlite3.Error as e:
+            print(f"예산 원장 정산 오류: {e}")
+
+
+class AdmissionController:
+    """호출 전 예산 검사, 예상 비용 예약과 실제 비용 정산, 배치 풀 분당 지출 제한"""
+    
+    def __init__(self, ledger: Optional[BudgetLedger] = None):
+        self.ledger = ledger or BudgetLedger()
+        self._lock = threading.Lock()
+        
+        # 배치 풀 분당 지출 한도 (토큰 버킷을 USD 단위로 사용)
+        self._batch_rate = TokenRateLimiter(settings.budget_batch_usd_per_minute) if settings.budget_batch_usd_per_minute else None
+        self._stats = {"admitted": 0, "rejected": 0, "queued_seconds": 0.0}
+    
+    def _limits(self, scope: Dict[str, Any]) -> List[Tuple[BudgetKey, float]]:
+        """주체에 적용되는 (예산 키, 한도) 목록 (한도가 0이면 제외)"""
+        today = date.today().isoformat()
+        pool = scope.get("pool") or INTERACTIVE_POOL
+        pool_limit = settings.budget_batch_daily_usd if pool == BATCH_POOL else settings.budget_interactive_daily_usd
+        
+        limits = [(("pool", pool, today), pool_limit)]
+        if scope.get("user_id"):
+            limits.append((("user", str(scope["user_id"]), today), settings.budget_user_daily_usd))
+        if scope.get("session_id"):
+            limits.append((("session", str(scope["session_id"]), ""), settings.budget_session_usd))
+        
+        return [(key, limit) for key, limit in limits if limit > 0]
+    
+    def available(self, scope: Dict[str, Any]) -> Tuple[float, float]:
+        """가장 빠듯한 예산의 (남은 금액, 남은 비율) (예산이 없으면 (inf, 1.0))
+        
+        등급 선택용 참고값이며, 호출 승인은 admit()으로 검사와 예약을 함께 처리합니다.
+        """
+        return self.ledger.available(self._limits(scope))
+    
+    def admit(self, scope: Dict[str, Any], cost: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        """남은 예산 검사와 예상 비용 예약을 원자적으로 처리
+        
+        Returns:
+            (예약 정보 - 예산이 부족하면 None, 예약 전 남은 금액)
+        """
+        limits = self._limits(scope)
+        reservation_id, available = self.ledger.admit(limits, cost, settings.budget_reservation_ttl_seconds)
+        if reservation_id is None:
+            return None, available
+        
+        with self._lock:
+            self._stats["admitted"] += 1
+        return {"id": reservation_id, "keys": [key for key, _ in limits], "cost": cost, "pool": scope.get("pool")}, available
+    
+    def settle(self, reservation: Dict[str, Any], cost: float):
+        """예약을 해제하고 실제 비용을 원장에 기록 (배치 풀 분당 한도도 실제 비용으로 정산)"""
+        if self._batch_rate is not None and reservation["pool"] == BATCH_POOL:
+            self._batch_rate.settle(reservation["cost"], cost)
+        
+        self.ledger.settle(reservation["id"], reservation["keys"], cost)
+    
+    def charge(self, reservation: Dict[str, Any], cost: float):
+        """정산 후 끝난 요청(늦게 도착한 헤지 요청)의 비용을 추가 지출로 기록"""
+        if cost <= 0:
+            return
+        
+        if self._batch_rate is not None and reservation["pool"] == BATCH_POOL:
+            self._batch_rate.settle(0, cost)
+        
+        self.ledger.add(reservation["keys"], cost)
+    
+    def reject(self, message: str):
+        """예산 부족으로 호출 거부"""
+        with self._lock:
+            self._stats["rejected"] += 1
+        raise BudgetExceeded(message)
+    
+    def _rate_wait(self, scope: Dict[str, Any], cost: float) -> float:
+        """배치 풀 분당 지출 한도로 기다려야 할 시간 (대화형 풀은 0)"""
+        if self._batch_rate is None or scope.get("pool") != BATCH_POOL:
+            return 0.0
+        
+        wait = self._batch_rate.reserve(cost)
+        time_left = remaining()
+        if wait and time_left is not None and wait >= time_left:
+            self.reject(f"배치 예산 분당 한도로 마감 전에 호출할 수 없습니다 (대기 {wait:.1f}초)")
+        return wait
+    
+    def throttle(self, scope: Dict[str, Any], cost: float):
+        """배치 풀 분당 지출 한도까지 대기 (동기)"""
+        while True:
+            wait = self._rate_wait(scope, cost)
+            if not wait:
+                return
+            self._count_queued(wait)
+            time.sleep(wait)
+    
+    async def athrottle(self, scope: Dict[str, Any], cost: float):
+        """배치 풀 분당 지출 한도까지 대기 (비동기)"""
+        while True:
+            wait = self._rate_wait(scope, cost)
+            if not wait:
+                return
+            self._count_queued(wait)
+            await asyncio.sleep(wait)
+    
+    def _count_queued(self, seconds: float):
+        """배치 풀 대기 시간 집계"""
+        with self._lock:
+            self._stats["queued_seconds"] += seconds
+    
+    def stats(self) -> Dict[str, Any]:
+        """승인/거부 횟수, 배치 풀 대기 시간"""
+        with self._lock:
+            return dict(self._stats, queued_seconds=round(self._stats["queued_seconds"], 3))
+
+
+def usage_cost(usage: Dict[str, int], pricing: Tuple[float, float]) -> float:
+    """요청 한 번의 토큰 사용량 비용 (USD)"""
+    return (usage.get("input_tokens", 0) * pricing[0] + usage.get("output_tokens", 0) * pricing[1]) / 1000
+
+
+# 프로세스 전역 승인 제어
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """프로세스 전역 승인 제어 반환"""
+    global _controller
+    
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController()
+    
+    return _controller
@@ -0,0 +1,99 @@
+"""
+Fashion AI Automation System - LLM Response Cache
+
+모델, temperature, max_tokens와 메시지(시스템/사용자 프롬프트) 내용의 해시를 키로
+LLM 응답을 로컬 SQLite에 캐시합니다. 같은 프롬프트를 다시 보내면 API를 호출하지 않고
+저장된 응답을 토큰 사용량 0으로 반환합니다.
+"""
+
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from config.settings import settings
+from utils.disk_cache import DiskCache
+from utils.helpers import content_hash
+
+
+# 캐시 적중 응답 표시 (response_metadata)
+CACHE_HIT_KEY = "cache_hit"
+
+
+def make_prompt_key(spec: Tuple[str, float, int], messages: List[Any]) -> str:
+    """(모델, temperature, max_tokens)와 메시지 내용 기반 캐시 키"""
+    model, temperature, max_tokens = spec
+    contents = [
+        (getattr(message, "type", "human"), str(getattr(message, "content", message)))
+        for message in messages
+    ]
+    return content_hash(model, temperature, max_tokens, contents)
+
+
+def is_cached_response(response: Any) -> bool:
+    """캐시에서 반환된 응답인지 여부"""
+    metadata = getattr(response, "response_metadata", None)
+    return isinstance(metadata, dict) and bool(metadata.get(CACHE_HIT_KEY))
+
+
+class LLMResponseCache:
+    """LLM 응답 디스크 캐시 (적중/미스 횟수 집계)"""
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.cache = DiskCache(
+            db_path or settings.llm_cache_path,
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else settings.llm_cache_ttl,
+            max_entries=max_entries if max_entries is not None else settings.llm_cache_max_entries
+        )
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+    
+    def get(self, spec: Tuple[str, float, int], messages: List[Any]) -> Optional[AIMessage]:
+        """캐시된 응답 반환 (없으면 None, 토큰 사용량은 0으로 표시)"""
+        cached = self.cache.get(make_prompt_key(spec, messages))
+        
+        with self._lock:
+            self._counters["hits" if cached is not None else "misses"] += 1
+        
+        if cached is None:
+            return None
+        
+        return AIMessage(
+            content=cached["content"],
+            usage_metadata={"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+            response_metadata={**cached.get("response_metadata", {}), CACHE_HIT_KEY: True}
+        )
+    
+    def set(self, spec: Tuple[str, float, int], messages: List[Any], response: Any) -> bool:
+        """응답 저장"""
+        content = getattr(response, "content", None)
+        if not isinstance(content, str) or not content:
+            return False
+        
+        metadata = getattr(response, "response_metadata", None)
+        if not isinstance(metadata, dict):
+            metadata = {}
+        
+        return self.cache.set(make_prompt_key(spec, messages), {
+            "content": content,
+            "response_metadata": {key: metadata[key] for key in ("model_name", "finish_reason") if key in metadata}
+        })
+    
+    def stats(self) -> Dict[str, Any]:
+        """적중/미스 횟수와 저장 항목 수"""
+        with self._lock:
+            counters = dict(self._counters)
+        
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else 0.0
+        
+        return {**counters, **self.cache.stats()}
+    
+    def clear(self) -> bool:
+        """전체 캐시 삭제"""
+        return self.cache.clear()
@@ -0,0 +1,891 @@
+"""
+Fashion AI Automation System - LLM Gateway
+
+모든 LLM 호출(노드, MCPClient)이 거치는 공용 게이트웨이입니다.
+
+- 공유 HTTP 커넥션 풀: 동기 호출은 프로세스 전역 httpx.Client,
+  비동기 호출은 이벤트 루프별 공유 AsyncClient(tools.async_http)를 사용
+- 전역/모델별 동시 요청 수 제한
+- 호출 전 토큰 예산 검사: 컨텍스트 윈도우나 프롬프트 토큰 상한을 넘으면
+  사용자 프롬프트 가운데를 생략하고, 그래도 넘으면 호출하지 않음
+- 모델별 분당 토큰(TPM) 제한: 요청 전 프롬프트 + max_tokens 만큼 예약하고
+  응답 후 실제 사용량으로 정산
+- 429/5xx/연결 오류 시 지수 백오프 재시도 (Retry-After 헤더 우선)
+- 같은 프롬프트는 응답 캐시(tools.llm_cache)에서 바로 반환 (호출별 use_cache=False로 우회)
+- LLM_STUB_ENABLED=true면 로컬 대체 서버(tools.llm_stub_server)로 호출 (부하 테스트용)
+- on_token 콜백을 넘기면 스트리밍으로 호출하여 토큰을 받는 즉시 전달하고,
+  완료 후 전체 응답을 일반 호출과 같은 형태로 반환 (토큰 전달이 시작된 뒤에는 재시도하지 않음)
+- hedge=True인 채팅 모델(짧고 멱등인 호출)은 (모델, 작업)별 관측 p95 안에 응답이 없으면 같은 요청을
+  한 번 더 보내 먼저 도착한 응답을 사용 (추가 요청 수는 헤지 대상 호출의 일정 비율로 제한,
+  응답 시간 표본은 헤지 대상 호출에서만 수집하므로 긴 생성 호출이 p95를 늘리지 않음)
+- on_usage 콜백을 넘기면 응답을 받은 요청마다(늦게 도착하거나 취소된 헤지 요청 포함) 토큰 사용량을 전달
+  (비용 예산은 모든 요청의 합으로 정산)
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.messages import message_chunk_to_message
+from langchain_openai import ChatOpenAI
+
+from config.settings import settings
+from utils.deadline import remaining, DeadlineExceeded
+from utils.token_counter import count_tokens, fit_messages_to_budget
+from .async_http import get_async_client, DEFAULT_LIMITS
+from .llm_cache import LLMResponseCache
+from .llm_stub_server import ensure_stub_server
+
+
+# 재시도 대기 시간 상한 (초)
+MAX_RETRY_DELAY = 30.0
+
+# (모델, temperature, max_tokens)
+ModelSpec = Tuple[str, float, int]
+
+# 스트리밍 토큰 콜백
+TokenCallback = Callable[[str], None]
+
+# 헤지 응답 시간 표본 구분 (모델, 작업)
+LatencyKey = Tuple[str, Optional[str]]
+
+# 요청별 토큰 사용량 콜백 ({"input_tokens": ..., "output_tokens": ...})
+UsageCallback = Callable[[Dict[str, int]], None]
+
+
+def get_openai_api_key() -> str:
+    """OpenAI API 키 조회 (환경 설정 → Streamlit secrets 순, 대체 서버 사용 시 키 불필요)"""
+    api_key = settings.openai_api_key
+    if not api_key and settings.llm_stub_enabled:
+        return "sk-stub"
+    if not api_key:
+        try:
+            import streamlit as st
+            api_key = st.secrets.get("OPENAI_API_KEY", "")
+        except Exception:
+            pass
+    return api_key
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """재시도 대상 오류 여부 (429, 5xx, 연결/타임아웃 오류)"""
+    if isinstance(error, openai.APIStatusError):
+        # 할당량 소진은 재시도해도 해결되지 않음
+        if getattr(error, "code", None) == "insufficient_quota":
+            return False
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError))
+
+
+def served_model(response: Any, llm: Any = None) -> Optional[str]:
+    """응답을 실제로 생성한 모델 (라우터가 대체 등급으로 호출한 경우 대체 모델, 기록이 없으면 llm의 모델)"""
+    metadata = getattr(response, "response_metadata", None)
+    if isinstance(metadata, dict) and metadata.get("served_model"):
+        return metadata["served_model"]
+    return getattr(llm, "model_name", None)
+
+
+def _mark_served(response: Any, model: str) -> Any:
+    """응답 메타데이터에 호출한 모델 기록 (비용/계측은 이 모델 기준)"""
+    metadata = getattr(response, "response_metadata", None)
+    if isinstance(metadata, dict):
+        metadata["served_model"] = model
+    return response
+
+
+def response_usage(response: Any, prompt_tokens: int) -> Dict[str, int]:
+    """응답의 토큰 사용량 (usage_metadata가 없으면 프롬프트 토큰과 응답 길이로 근사)"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    output_tokens = usage.get("output_tokens")
+    if output_tokens is None:
+        output_tokens = count_tokens(getattr(response, "content", ""))
+    return {"input_tokens": usage.get("input_tokens", prompt_tokens), "output_tokens": output_tokens}
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """응답 헤더의 재시도 대기 시간 (초)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class _SlotWaiter:
+    """슬롯 대기자 (스레드는 Event, 코루틴은 대기 중인 이벤트 루프의 Future로 깨움)"""
+    
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+    
+    def wake(self) -> bool:
+        """슬롯을 넘겨받았음을 알림 (이벤트 루프가 닫혀 깨울 수 없으면 False)"""
+        if self.event is not None:
+            self.event.set()
+            return True
+        
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+            return True
+        except RuntimeError:
+            return False
+    
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """스레드와 이벤트 루프에서 함께 사용하는 동시 실행 수 제한
+    
+    슬롯은 기다린 순서대로(FIFO) 할당하며, 반환 시 다음 대기자에게 바로 넘겨 깨웁니다
+    (코루틴 대기자는 해당 이벤트 루프에서 call_soon_threadsafe로 깨움).
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._available = self.limit
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self, waiter: _SlotWaiter) -> bool:
+        """먼저 기다리는 대기자가 없고 빈 슬롯이 있으면 바로 획득, 아니면 대기열에 추가"""
+        with self._lock:
+            if self._available and not self._waiters:
+                self._available -= 1
+                return True
+            self._waiters.append(waiter)
+            return False
+    
+    def acquire(self):
+        """슬롯 획득 (동기)"""
+        waiter = _SlotWaiter()
+        if not self._try_acquire(waiter):
+            waiter.event.wait()
+    
+    async def aacquire(self):
+        """슬롯 획득 (비동기, 이벤트 루프를 블로킹하지 않고 반환될 때까지 대기)"""
+        waiter = _SlotWaiter(asyncio.get_running_loop())
+        if self._try_acquire(waiter):
+            return
+        
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # 취소 전에 이미 슬롯을 넘겨받았으면 다음 대기자에게 반환
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+    
+    def release(self):
+        """슬롯 반환 (대기자가 있으면 가장 먼저 기다린 대기자에게 넘김)"""
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    if self._available >= self.limit:
+                        raise ValueError("획득하지 않은 슬롯을 반환했습니다")
+                    self._available += 1
+                    return
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+            
+            if waiter.wake():
+                return
+
+
+class TokenRateLimiter:
+    """분당 토큰 한도 (토큰 버킷)"""
+    
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """경과 시간만큼 토큰 충전"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.capacity / 60)
+        self._updated_at = now
+    
+    def reserve(self, tokens: int) -> float:
+        """토큰 예약 (바로 사용할 수 없으면 예약하지 않고 기다려야 할 시간(초) 반환)"""
+        tokens = min(tokens, self.capacity)
+        
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) * 60 / self.capacity
+    
+    def settle(self, reserved: int, used: int):
+        """예약량과 실제 사용량의 차이 정산"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + min(reserved, self.capacity) - used)
+
+
+class _TokenRelay:
+    """스트리밍 청크를 콜백으로 전달하고 전체 응답으로 합침"""
+    
+    def __init__(self, on_token: Optional[TokenCallback]):
+        self.on_token = on_token
+        self.started = False
+    
+    def feed(self, chunk: Any) -> Any:
+        if chunk.content:
+            self.started = True
+            self.on_token(chunk.content)
+        return chunk
+    
+    def result(self, chunks: Any) -> Any:
+        merged = None
+        for chunk in chunks:
+            merged = chunk if merged is None else merged + chunk
+        if merged is None:
+            raise ValueError("LLM 스트리밍 응답이 비어 있습니다")
+        return message_chunk_to_message(merged)
+
+
+class GatewayChatModel:
+    """게이트웨이를 거쳐 호출하는 채팅 모델 (ChatOpenAI의 invoke/ainvoke 인터페이스)"""
+    
+    def __init__(
+        self,
+        gateway: "LLMGateway",
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        hedge: bool = False,
+        task: Optional[str] = None
+    ):
+        self.gateway = gateway
+        self.model_name = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.hedge = hedge
+        self.task = task
+    
+    @property
+    def spec(self) -> ModelSpec:
+        return (self.model_name, self.temperature, self.max_tokens)
+    
+    def invoke(self, messages: List[Any], use_cache: bool = True, on_token: Optional[TokenCallback] = None, **kwargs) -> Any:
+        """동기 호출 (use_cache=False면 응답 캐시를 우회, on_token이 있으면 토큰 스트리밍)"""
+        response = self.gateway.invoke(self.spec, messages, use_cache=use_cache, on_token=on_token, hedge=self.hedge, task=self.task, **kwargs)
+        return _mark_served(response, self.model_name)
+    
+    async def ainvoke(self, messages: List[Any], use_cache: bool = True, on_token: Optional[TokenCallback] = None, **kwargs) -> Any:
+        """비동기 호출 (use_cache=False면 응답 캐시를 우회, on_token이 있으면 토큰 스트리밍)"""
+        response = await self.gateway.ainvoke(self.spec, messages, use_cache=use_cache, on_token=on_token, hedge=self.hedge, task=self.task, **kwargs)
+        return _mark_served(response, self.model_name)
+
+
+class LLMGateway:
+    """동시성/분당 토큰 제한과 재시도를 적용하는 공용 LLM 게이트웨이"""
+    
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        model_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
+        """
+        Args:
+            max_concurrency: 전체 동시 요청 수
+            model_concurrency: 모델별 동시 요청 수
+            tokens_per_minute: 모델별 분당 토큰 한도 (0이면 제한 없음)
+            max_retries: 429/5xx 재시도 횟수
+            retry_backoff: 첫 재시도 대기 시간 (초, 이후 2배씩 증가)
+            response_cache: 프롬프트/응답 캐시 (None이면 설정에 따라 생성, False면 사용 안 함)
+        """
+        self.model_concurrency = model_concurrency or settings.llm_model_concurrency
+        self.tokens_per_minute = settings.llm_tokens_per_minute if tokens_per_minute is None else tokens_per_minute
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self.retry_backoff = settings.llm_retry_backoff if retry_backoff is None else retry_backoff
+        
+        # 같은 프롬프트 재호출 방지 (모델/temperature/프롬프트 내용 기준)
+        # 대체 서버 응답이 실제 응답 캐시에 섞이지 않도록 대체 서버 사용 시에는 기본 캐시를 만들지 않음
+        if response_cache is None and settings.llm_cache_enabled and not settings.llm_stub_enabled:
+            response_cache = LLMResponseCache()
+        self.response_cache = response_cache
+        
+        # 부하 테스트용 로컬 대체 서버 (실행 중이 아니면 현재 프로세스에서 시작)
+        self.base_url = ensure_stub_server() if settings.llm_stub_enabled else None
+        
+        self._global_limiter = ConcurrencyLimiter(max_concurrency or settings.llm_max_concurrency)
+        self._model_limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._rate_limiters: Dict[str, TokenRateLimiter] = {}
+        
+        # 동기 클라이언트는 공유 httpx.Client, 비동기 클라이언트는 이벤트 루프별로 보관
+        self._http_client: Optional[httpx.Client] = None
+        self._sync_clients: Dict[ModelSpec, ChatOpenAI] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ModelSpec, Tuple[httpx.AsyncClient, ChatOpenAI]]]" = weakref.WeakKeyDictionary()
+        
+        # 헤지 요청: (모델, 작업)별 최근 응답 시간 표본, 동기 호출의 요청 실행 스레드
+        self._latencies: Dict[LatencyKey, deque] = {}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "retries": 0, "failures": 0, "truncated": 0, "throttled_seconds": 0.0,
+            "hedgeable": 0, "hedged": 0, "hedge_wins": 0
+        }
+    
+    def chat_model(
+        self,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        hedge: bool = False,
+        task: Optional[str] = None
+    ) -> GatewayChatModel:
+        """게이트웨이를 사용하는 채팅 모델 반환 (API 키 등 설정 오류는 이 시점에 발생)
+        
+        hedge=True는 짧고 멱등인 호출(감성 점수 등)에만 사용하며, 헤지 대기 시간은 (모델, task)별로 계산합니다.
+        """
+        spec = (
+            model or settings.openai_model,
+            settings.openai_temperature if temperature is None else temperature,
+            max_tokens or settings.max_tokens
+        )
+        self._get_sync_client(spec)
+        return GatewayChatModel(self, *spec, hedge=hedge, task=task)
+    
+    # ---- 클라이언트 ----
+    
+    def _get_http_client(self) -> httpx.Client:
+        """프로세스 전역 동기 HTTP 커넥션 풀"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.Client(limits=DEFAULT_LIMITS, timeout=settings.llm_request_timeout)
+        return self._http_client
+    
+    def _create_client(self, spec: ModelSpec, http_async_client: Optional[httpx.AsyncClient] = None) -> ChatOpenAI:
+        """공유 커넥션 풀을 사용하는 ChatOpenAI 생성"""
+        model, temperature, max_tokens = spec
+        
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=get_openai_api_key(),
+            base_url=self.base_url,
+            timeout=settings.llm_request_timeout,
+            max_retries=0,  # 재시도는 게이트웨이에서 처리
+            stream_usage=True,  # 스트리밍 호출에도 토큰 사용량 포함
+            http_client=self._get_http_client(),
+            http_async_client=http_async_client
+        )
+    
+    def _get_sync_client(self, spec: ModelSpec) -> ChatOpenAI:
+        """동기 호출용 클라이언트"""
+        with self._lock:
+            client = self._sync_clients.get(spec)
+            if client is None or client.http_client.is_closed:
+                client = self._create_client(spec)
+                self._sync_clients[spec] = client
+            return client
+    
+    def _get_async_client(self, spec: ModelSpec) -> ChatOpenAI:
+        """현재 이벤트 루프의 공유 AsyncClient를 사용하는 클라이언트"""
+        loop = asyncio.get_running_loop()
+        http_async_client = get_async_client()
+        
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            cached = clients.get(spec)
+            # 공유 AsyncClient가 닫혀 새로 만들어진 경우 다시 생성
+            if cached is None or cached[0] is not http_async_client:
+                cached = (http_async_client, self._create_client(spec, http_async_client))
+                clients[spec] = cached
+            return cached[1]
+    
+    def _get_model_limiter(self, model: str) -> ConcurrencyLimiter:
+        """모델별 동시성 제한"""
+        with self._lock:
+            if model not in self._model_limiters:
+                self._model_limiters[model] = ConcurrencyLimiter(self.model_concurrency)
+            return self._model_limiters[model]
+    
+    def _get_rate_limiter(self, model: str) -> Optional[TokenRateLimiter]:
+        """모델별 분당 토큰 제한 (한도가 없으면 None)"""
+        if not self.tokens_per_minute:
+            return None
+        
+        with self._lock:
+            if model not in self._rate_limiters:
+                self._rate_limiters[model] = TokenRateLimiter(self.tokens_per_minute)
+            return self._rate_limiters[model]
+    
+    # ---- 호출 ----
+    
+    def invoke(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        use_cache: bool = True,
+        on_token: Optional[TokenCallback] = None,
+        hedge: bool = False,
+        task: Optional[str] = None,
+        max_prompt_tokens: Optional[int] = None,
+        on_usage: Optional[UsageCallback] = None,
+        **kwargs
+    ) -> Any:
+        """캐시, 제한, 재시도를 적용한 동기 호출 (on_token이 있으면 스트리밍, hedge=True면 헤지 요청)
+        
+        max_prompt_tokens를 넘기면 설정의 프롬프트 토큰 상한 대신 사용합니다 (비용 예산에 맞춘 축소).
+        on_usage는 실제로 응답을 받은 요청마다 호출됩니다 (캐시 응답은 호출하지 않음).
+        task는 헤지 응답 시간 표본 구분에 사용합니다.
+        """
+        messages, prompt_tokens = self._fit_to_budget(spec, messages, max_prompt_tokens)
+        
+        cache = self.response_cache if use_cache else None
+        if cache:
+            cached = cache.get(spec, messages)
+            if cached is not None:
+                if on_token:
+                    on_token(cached.content)
+                return cached
+        
+        # 스트리밍 호출은 토큰이 중복 전달되지 않도록 헤지하지 않음
+        if hedge and not on_token:
+            response = self._invoke_hedged(spec, messages, prompt_tokens, (spec[0], task), on_usage, **kwargs)
+        else:
+            response = self._invoke_with_retries(spec, messages, prompt_tokens, on_token, on_usage, **kwargs)
+        
+        if cache:
+            cache.set(spec, messages, response)
+        return response
+    
+    async def ainvoke(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        use_cache: bool = True,
+        on_token: Optional[TokenCallback] = None,
+        hedge: bool = False,
+        task: Optional[str] = None,
+        max_prompt_tokens: Optional[int] = None,
+        on_usage: Optional[UsageCallback] = None,
+        **kwargs
+    ) -> Any:
+        """캐시, 제한, 재시도를 적용한 비동기 호출 (on_token이 있으면 스트리밍, hedge=True면 헤지 요청)
+        
+        max_prompt_tokens를 넘기면 설정의 프롬프트 토큰 상한 대신 사용합니다 (비용 예산에 맞춘 축소).
+        on_usage는 실제로 응답을 받은 요청마다 호출됩니다 (캐시 응답은 호출하지 않음).
+        task는 헤지 응답 시간 표본 구분에 사용합니다.
+        응답 캐시(SQLite) 조회/저장은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        """
+        messages, prompt_tokens = self._fit_to_budget(spec, messages, max_prompt_tokens)
+        
+        cache = self.response_cache if use_cache else None
+        if cache:
+            cached = await asyncio.to_thread(cache.get, spec, messages)
+            if cached is not None:
+                if on_token:
+                    on_token(cached.content)
+                return cached
+        
+        if hedge and not on_token:
+            response = await self._ainvoke_hedged(spec, messages, prompt_tokens, (spec[0], task), on_usage, **kwargs)
+        else:
+            response = await self._ainvoke_with_retries(spec, messages, prompt_tokens, on_token, on_usage, **kwargs)
+        
+        if cache:
+            await asyncio.to_thread(cache.set, spec, messages, response)
+        return response
+    
+    def _invoke_with_retries(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        prompt_tokens: int,
+        on_token: Optional[TokenCallback] = None,
+        on_usage: Optional[UsageCallback] = None,
+        latency_key: Optional[LatencyKey] = None,
+        **kwargs
+    ) -> Any:
+        """동시성/분당 토큰 제한과 재시도를 적용한 요청 (동기, latency_key가 있으면 헤지용 응답 시간 기록)"""
+        model = spec[0]
+        rate_limiter = self._get_rate_limiter(model)
+        model_limiter = self._get_model_limiter(model)
+        reserved = prompt_tokens + spec[2]
+        
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter:
+                self._wait_for_tokens(rate_limiter, reserved)
+            
+            self._global_limiter.acquire()
+            model_limiter.acquire()
+            stream = _TokenRelay(on_token)
+            started = time.monotonic()
+            try:
+                self._count("requests")
+                client = self._get_sync_client(spec)
+                if on_token:
+                    response = stream.result(stream.feed(chunk) for chunk in client.stream(messages, **kwargs))
+                else:
+                    response = client.invoke(messages, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt, rate_limiter, reserved, stream.started)
+            else:
+                self._settle(rate_limiter, reserved, response)
+                if on_usage:
+                    on_usage(response_usage(response, prompt_tokens))
+                if latency_key:
+                    self._record_latency(latency_key, time.monotonic() - started)
+                break
+            finally:
+                model_limiter.release()
+                self._global_limiter.release()
+            
+            time.sleep(delay)
+        
+        return response
+    
+    async def _ainvoke_with_retries(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        prompt_tokens: int,
+        on_token: Optional[TokenCallback] = None,
+        on_usage: Optional[UsageCallback] = None,
+        latency_key: Optional[LatencyKey] = None,
+        **kwargs
+    ) -> Any:
+        """동시성/분당 토큰 제한과 재시도를 적용한 요청 (비동기, latency_key가 있으면 헤지용 응답 시간 기록)"""
+        model = spec[0]
+        rate_limiter = self._get_rate_limiter(model)
+        model_limiter = self._get_model_limiter(model)
+        reserved = prompt_tokens + spec[2]
+        
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter:
+                await self._await_tokens(rate_limiter, reserved)
+            
+            await self._global_limiter.aacquire()
+            try:
+                await model_limiter.aacquire()
+            except BaseException:
+                self._global_limiter.release()
+                raise
+            
+            stream = _TokenRelay(on_token)
+            started = time.monotonic()
+            try:
+                self._count("requests")
+                client = self._get_async_client(spec)
+                if on_token:
+                    response = stream.result([stream.feed(chunk) async for chunk in client.astream(messages, **kwargs)])
+                else:
+                    response = await client.ainvoke(messages, **kwargs)
+            except asyncio.CancelledError:
+                # 취소된 요청(늦은 헤지 요청)도 이미 보낸 프롬프트는 과금되므로 입력 토큰을 사용량으로 전달
+                if on_usage:
+                    on_usage({"input_tokens": prompt_tokens, "output_tokens": 0})
+                raise
+            except Exception as e:
+                delay = self._on_error(e, attempt, rate_limiter, reserved, stream.started)
+            else:
+                self._settle(rate_limiter, reserved, response)
+                if on_usage:
+                    on_usage(response_usage(response, prompt_tokens))
+                if latency_key:
+                    self._record_latency(latency_key, time.monotonic() - started)
+                break
+            finally:
+                model_limiter.release()
+                self._global_limiter.release()
+            
+            await asyncio.sleep(delay)
+        
+        return response
+    
+    # ---- 헤지 요청 ----
+    
+    def _invoke_hedged(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        prompt_tokens: int,
+        latency_key: LatencyKey,
+        on_usage: Optional[UsageCallback] = None,
+        **kwargs
+    ) -> Any:
+        """(모델, 작업)별 p95 안에 응답이 없으면 같은 요청을 한 번 더 보내 먼저 성공한 응답 반환 (동기)"""
+        self._count("hedgeable")
+        delay = self._hedge_delay(latency_key)
+        if delay is None:
+            return self._invoke_with_retries(spec, messages, prompt_tokens, on_usage=on_usage, latency_key=latency_key, **kwargs)
+        
+        executor = self._get_hedge_executor()
+        
+        def submit():
+            # 세션 마감 시각 등 contextvar를 요청 스레드에 전달
+            return executor.submit(
+                contextvars.copy_context().run, self._invoke_with_retries, spec, messages, prompt_tokens,
+                on_usage=on_usage, latency_key=latency_key, **kwargs
+            )
+        
+        futures = [submit()]
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._take_hedge_budget():
+            futures.append(submit())
+        
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count("hedge_wins")
+                    # 늦은 요청은 취소할 수 없으므로 완료 후 버려짐 (토큰 정산과 사용량 전달은 각 요청에서 처리)
+                    return future.result()
+                error = future.exception()
+        raise error
+    
+    async def _ainvoke_hedged(
+        self,
+        spec: ModelSpec,
+        messages: List[Any],
+        prompt_tokens: int,
+        latency_key: LatencyKey,
+        on_usage: Optional[UsageCallback] = None,
+        **kwargs
+    ) -> Any:
+        """(모델, 작업)별 p95 안에 응답이 없으면 같은 요청을 한 번 더 보내 먼저 성공한 응답 반환 (비동기, 늦은 요청은 취소)"""
+        self._count("hedgeable")
+        delay = self._hedge_delay(latency_key)
+        
+        def request():
+            return self._ainvoke_with_retries(spec, messages, prompt_tokens, on_usage=on_usage, latency_key=latency_key, **kwargs)
+        
+        if delay is None:
+            return await request()
+        
+        tasks = [asyncio.ensure_future(request())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._take_hedge_budget():
+                tasks.append(asyncio.ensure_future(request()))
+            
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _record_latency(self, key: LatencyKey, seconds: float):
+        """헤지 대상 호출에서 성공한 요청의 응답 시간 기록 (헤지 대기 시간 계산용)"""
+        with self._lock:
+            if key not in self._latencies:
+                self._latencies[key] = deque(maxlen=settings.llm_hedge_window)
+            self._latencies[key].append(seconds)
+    
+    def _hedge_delay(self, key: LatencyKey) -> Optional[float]:
+        """헤지 요청을 보내기 전 대기 시간 ((모델, 작업)별 관측 응답 시간의 분위수, 표본이 부족하면 None)"""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        
+        if len(samples) < max(1, settings.llm_hedge_min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * settings.llm_hedge_quantile))]
+    
+    def _take_hedge_budget(self) -> bool:
+        """헤지 예산 확인 (추가 요청 수가 헤지 대상 호출 수의 일정 비율을 넘지 않도록)"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > self._stats["hedgeable"] * settings.llm_hedge_budget_ratio:
+                return False
+            self._stats["hedged"] += 1
+            return True
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """동기 헤지 요청 실행 스레드 풀 (동시 요청 수 제한은 게이트웨이 리미터가 담당)"""
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=2 * self._global_limiter.limit,
+                    thread_name_prefix="llm-hedge"
+                )
+            return self._hedge_executor
+    
+    def _on_error(
+        self,
+        error: Exception,
+        attempt: int,
+        rate_limiter: Optional[TokenRateLimiter],
+        reserved: int,
+        streamed: bool = False
+    ) -> float:
+        """실패한 요청의 예약 토큰을 반환하고 재시도 대기 시간 결정 (재시도하지 않으면 예외 재발생)
+        
+        이미 토큰을 전달하기 시작한 스트리밍 호출은 중복 출력을 막기 위해 재시도하지 않습니다.
+        """
+        if rate_limiter:
+            rate_limiter.settle(reserved, 0)
+        
+        delay = None if streamed else self._retry_delay(error, attempt)
+        if delay is None:
+            self._count("failures")
+            raise error
+        
+        self._count("retries")
+        print(f"LLM 요청 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {type(error).__name__}")
+        return delay
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """재시도 대기 시간 (재시도하지 않으면 None)"""
+        if attempt >= self.max_retries or not is_retryable_error(error):
+            return None
+        
+        delay = _retry_after(error)
+        if delay is None:
+            # 지수 백오프 + 지터 (동시에 실패한 요청들이 한꺼번에 재시도하지 않도록)
+            delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+        delay = min(delay, MAX_RETRY_DELAY)
+        
+        # 세션 마감 전에 재시도할 수 없으면 포기
+        time_left = remaining()
+        if time_left is not None and delay >= time_left:
+            return None
+        
+        return delay
+    
+    def _token_wait(self, rate_limiter: TokenRateLimiter, tokens: int) -> float:
+        """토큰 예약 시도 후 대기 시간 반환 (마감 전에 확보할 수 없으면 DeadlineExceeded)"""
+        delay = rate_limiter.reserve(tokens)
+        if delay <= 0:
+            return 0.0
+        
+        time_left = remaining()
+        if time_left is not None and delay >= time_left:
+            raise DeadlineExceeded("분당 토큰 한도로 마감 전에 LLM을 호출할 수 없습니다")
+        
+        self._count("throttled_seconds", delay)
+        return delay
+    
+    def _wait_for_tokens(self, rate_limiter: TokenRateLimiter, tokens: int):
+        """분당 토큰 한도 내에서 토큰을 확보할 때까지 대기 (동기)"""
+        while True:
+            delay = self._token_wait(rate_limiter, tokens)
+            if not delay:
+                return
+            time.sleep(delay)
+    
+    async def _await_tokens(self, rate_limiter: TokenRateLimiter, tokens: int):
+        """분당 토큰 한도 내에서 토큰을 확보할 때까지 대기 (비동기)"""
+        while True:
+            delay = self._token_wait(rate_limiter, tokens)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+    
+    def _fit_to_budget(self, spec: ModelSpec, messages: List[Any], max_prompt_tokens: Optional[int] = None) -> Tuple[List[Any], int]:
+        """컨텍스트 윈도우/프롬프트 토큰 상한을 넘는 요청은 줄이거나 거부 (TokenBudgetExceeded)"""
+        model, _, max_tokens = spec
+        fitted, prompt_tokens = fit_messages_to_budget(messages, model, max_tokens, max_prompt_tokens or settings.max_prompt_tokens)
+        
+        if fitted is not messages:
+            self._count("truncated")
+            print(f"LLM 프롬프트가 토큰 예산을 초과하여 {prompt_tokens}토큰으로 축소했습니다.")
+        
+        return fitted, prompt_tokens
+    
+    def _settle(self, rate_limiter: Optional[TokenRateLimiter], reserved: int, response: Any):
+        """응답의 실제 토큰 사용량으로 예약량 정산"""
+        if not rate_limiter:
+            return
+        
+        usage = getattr(response, "usage_metadata", None) or {}
+        used = usage.get("total_tokens")
+        if used is None:
+            return
+        rate_limiter.settle(reserved, used)
+    
+    def _count(self, key: str, value: float = 1):
+        """통계 갱신"""
+        with self._lock:
+            self._stats[key] += value
+    
+    def stats(self) -> Dict[str, Any]:
+        """요청/재시도/실패/프롬프트 축소/헤지 횟수, 토큰 한도로 대기한 시간, 응답 캐시 적중률"""
+        with self._lock:
+            stats = dict(self._stats, throttled_seconds=round(self._stats["throttled_seconds"], 3))
+        
+        if self.response_cache:
+            stats["cache"] = self.response_cache.stats()
+        return stats
+    
+    def close(self):
+        """공유 동기 커넥션 풀, 클라이언트 캐시, 헤지 요청 스레드 풀 정리"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            self._sync_clients.clear()
+            self._async_clients.clear()
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+
+
+# 프로세스 전역 게이트웨이
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 전역 LLM 게이트웨이 반환"""
+    global _gateway
+    
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    
+    return _gateway
+
+
+def reset_llm_gateway():
+    """프로세스 전역 게이트웨이 제거 (설정 변경 후 재생성 또는 테스트용)"""
+    global _gateway
+    
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+        _gateway = None
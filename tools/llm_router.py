@@ -0,0 +1,292 @@
+"""
+Fashion AI Automation System - LLM Model Router
+
+노드와 MCP 도구별로 사용할 모델 등급(tier)을 정하는 라우팅 테이블입니다.
+
+- 등급별 모델, temperature, 최대 출력 토큰 수, 토큰 가격은 settings.llm_model_tiers에서 설정
+  (생략한 값은 openai_model/openai_temperature/max_tokens/token_cost_* 기본값 사용)
+- 작업 → 등급 매핑은 settings.llm_task_tiers (노드 이름, MCP 도구는 "mcp:<도구 이름>")
+- 호출마다 비용 예산(tools.llm_budget)을 검사하고 예상 비용을 예약 (검사와 예약은 원자적으로 처리)
+- 세션 마감까지 남은 시간이 부족하거나 남은 예산 비율이 낮으면
+  settings.llm_tier_fallbacks의 더 빠르고 저렴한 등급으로 대체하고, 그래도 예산을 넘으면
+  프롬프트를 예산에 맞게 축소하며, 축소 하한으로도 부족하면 호출하지 않음 (BudgetExceeded)
+- settings.llm_hedged_tasks의 작업(짧고 멱등인 호출)은 게이트웨이 헤지 요청 사용
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+from config.settings import settings
+from utils.deadline import remaining, mark_degraded
+from utils.token_counter import count_message_tokens
+from .llm_gateway import GatewayChatModel, TokenCallback, get_llm_gateway
+from .llm_budget import get_admission_controller, current_scope, usage_cost
+
+
+# 라우팅 테이블에 없는 작업의 기본 등급
+DEFAULT_TIER = "premium"
+
+
+def get_tier(task: Optional[str]) -> str:
+    """작업에 매핑된 모델 등급"""
+    tier = settings.llm_task_tiers.get(task or "", DEFAULT_TIER)
+    return tier if tier in settings.llm_model_tiers else DEFAULT_TIER
+
+
+def tier_config(tier: str) -> Dict[str, Any]:
+    """등급 설정 (생략한 값은 전역 기본값으로 채움)"""
+    config = settings.llm_model_tiers.get(tier) or {}
+    return {
+        "model": config.get("model") or settings.openai_model,
+        "temperature": config.get("temperature", settings.openai_temperature),
+        "max_tokens": config.get("max_tokens") or settings.max_tokens,
+        "cost_per_1k_input": config.get("cost_per_1k_input", settings.token_cost_per_1k_input),
+        "cost_per_1k_output": config.get("cost_per_1k_output", settings.token_cost_per_1k_output),
+    }
+
+
+def routing_table() -> Dict[str, Dict[str, Any]]:
+    """작업별로 실제 적용되는 등급 설정 (라우팅 테이블에 없는 작업은 "*"의 기본 등급)"""
+    tiers = {task: get_tier(task) for task in settings.llm_task_tiers}
+    tiers["*"] = DEFAULT_TIER
+    return {
+        task: {key: tier_config(tier)[key] for key in ("model", "temperature", "max_tokens")}
+        for task, tier in tiers.items()
+    }
+
+
+def model_pricing(model: Any) -> Tuple[float, float]:
+    """모델의 1K 토큰당 (입력, 출력) 가격 (등급 설정에 없는 모델은 기본 가격)"""
+    for tier in settings.llm_model_tiers:
+        config = tier_config(tier)
+        if config["model"] == model:
+            return config["cost_per_1k_input"], config["cost_per_1k_output"]
+    return settings.token_cost_per_1k_input, settings.token_cost_per_1k_output
+
+
+def fallback_reason(budget_ratio: float = 1.0) -> Optional[str]:
+    """더 빠른 등급으로 대체해야 하는 이유 (대체가 필요 없으면 None)
+    
+    Args:
+        budget_ratio: 가장 빠듯한 비용 예산의 남은 비율
+    """
+    if not settings.llm_routing_fallback_enabled:
+        return None
+    
+    time_left = remaining()
+    if time_left is not None and time_left < settings.llm_fallback_min_seconds:
+        return f"마감까지 {max(0.0, time_left):.1f}초"
+    
+    if budget_ratio < settings.budget_low_ratio:
+        return f"남은 예산 {budget_ratio:.0%}"
+    
+    return None
+
+
+class _AttemptBilling:
+    """호출 한 번에 보낸 요청별(헤지 요청 포함) 사용량을 모아 예약한 예산을 정산
+    
+    정산 뒤에 끝난 요청(동기 호출의 늦은 헤지 요청, 취소된 비동기 헤지 요청)은 추가 지출로 기록합니다.
+    """
+    
+    def __init__(self, reservation: Dict[str, Any], pricing: Tuple[float, float]):
+        self.reservation = reservation
+        self.pricing = pricing
+        self.cost = 0.0
+        self.settled = False
+        self._lock = threading.Lock()
+    
+    def __call__(self, usage: Dict[str, int]):
+        """게이트웨이의 요청별 사용량 콜백"""
+        cost = usage_cost(usage, self.pricing)
+        with self._lock:
+            if not self.settled:
+                self.cost += cost
+                return
+        get_admission_controller().charge(self.reservation, cost)
+    
+    def settle(self):
+        """지금까지 보고된 사용량 합계로 정산 (실패/캐시 응답은 비용 없음)"""
+        with self._lock:
+            self.settled = True
+            cost = self.cost
+        get_admission_controller().settle(self.reservation, cost)
+
+
+class RoutedChatModel(GatewayChatModel):
+    """작업별 등급 모델로 호출하고, 마감/예산이 부족하면 대체 등급 모델로 호출하는 채팅 모델
+    
+    model_name/temperature/max_tokens는 기본 등급 기준입니다. 호출마다 실제로 사용한 모델은
+    응답의 response_metadata["served_model"]에 기록되므로 비용/계측은 served_model(response)을 사용합니다.
+    """
+    
+    def __init__(self, task: str, primary: GatewayChatModel, fallback: Optional[GatewayChatModel] = None):
+        super().__init__(primary.gateway, primary.model_name, primary.temperature, primary.max_tokens, primary.hedge, task)
+        self.task = task
+        self.primary = primary
+        self.fallback = fallback
+    
+    def select(self, budget_ratio: float = 1.0) -> GatewayChatModel:
+        """이번 호출에 사용할 모델"""
+        if self.fallback is None:
+            return self.primary
+        
+        reason = fallback_reason(budget_ratio)
+        if reason is None:
+            return self.primary
+        
+        return self._downgrade(reason)
+    
+    def _downgrade(self, reason: str) -> GatewayChatModel:
+        """대체 등급 사용 기록 후 대체 모델 반환"""
+        mark_degraded(f"{self.task}: {self.primary.model_name} 대신 {self.fallback.model_name} 사용 ({reason})")
+        get_router().count_fallback(self.task)
+        return self.fallback
+    
+    def _estimate(self, model: GatewayChatModel, messages: List[Any]) -> Tuple[float, float, float]:
+        """(예상 비용, 최대 출력 비용, 1K 입력 토큰 가격) - 예상 비용은 프롬프트 토큰 + 최대 출력 토큰 기준"""
+        input_price, output_price = model_pricing(model.model_name)
+        output_cost = model.max_tokens * output_price / 1000
+        prompt_cost = count_message_tokens(messages, model.model_name) * input_price / 1000
+        return prompt_cost + output_cost, output_cost, input_price
+    
+    def _admit(self, messages: List[Any], scope: Dict[str, Any]) -> Tuple[GatewayChatModel, Dict[str, Any], Optional[Dict[str, Any]]]:
+        """예산 검사 후 (사용할 모델, 게이트웨이 추가 인자, 예약 정보) 결정 (예산이 부족하면 BudgetExceeded)"""
+        if not settings.budget_enabled:
+            return self.select(), {}, None
+        
+        controller = get_admission_controller()
+        _, ratio = controller.available(scope)
+        model = self.select(ratio)
+        
+        # 예상 비용이 남은 예산을 넘으면 대체 등급 → 프롬프트 축소 → 거부 순으로 적용 (응답 후 실제 사용량으로 정산)
+        estimate, output_cost, input_price = self._estimate(model, messages)
+        reservation, available = controller.admit(scope, estimate)
+        if reservation is None and model is self.primary and self.fallback is not None:
+            model = self._downgrade(f"남은 예산 ${available:.4f}")
+            estimate, output_cost, input_price = self._estimate(model, messages)
+            reservation, available = controller.admit(scope, estimate)
+        
+        extra = {}
+        if reservation is None:
+            # 남은 예산으로 보낼 수 있는 만큼 프롬프트 축소
+            affordable = int((available - output_cost) * 1000 / input_price) if input_price else 0
+            if affordable >= settings.budget_min_prompt_tokens:
+                reservation, _ = controller.admit(scope, available)
+            if reservation is None:
+                controller.reject(f"{self.task}: LLM 비용 예산 부족 (예상 ${estimate:.4f}, 남은 예산 ${available:.4f})")
+            
+            extra["max_prompt_tokens"] = affordable
+            mark_degraded(f"{self.task}: 비용 예산에 맞춰 프롬프트를 {affordable}토큰으로 축소")
+        
+        return model, extra, reservation
+    
+    def _billing(self, model: GatewayChatModel, reservation: Optional[Dict[str, Any]]) -> Tuple[Optional[_AttemptBilling], Dict[str, Any]]:
+        """예약 정산용 사용량 수집기와 게이트웨이 추가 인자 (예산을 사용하지 않으면 (None, {}))"""
+        if reservation is None:
+            return None, {}
+        billing = _AttemptBilling(reservation, model_pricing(model.model_name))
+        return billing, {"on_usage": billing}
+    
+    def invoke(self, messages: List[Any], use_cache: bool = True, on_token: Optional[TokenCallback] = None, **kwargs) -> Any:
+        """동기 호출 (예산 검사 후 마감/예산에 따라 대체 등급 사용)"""
+        scope = current_scope()
+        model, extra, reservation = self._admit(messages, scope)
+        billing, usage = self._billing(model, reservation)
+        
+        try:
+            if reservation is not None:
+                get_admission_controller().throttle(scope, reservation["cost"])
+            return model.invoke(messages, use_cache=use_cache, on_token=on_token, **extra, **usage, **kwargs)
+        finally:
+            if billing is not None:
+                billing.settle()
+    
+    async def ainvoke(self, messages: List[Any], use_cache: bool = True, on_token: Optional[TokenCallback] = None, **kwargs) -> Any:
+        """비동기 호출 (예산 검사 후 마감/예산에 따라 대체 등급 사용)
+        
+        예산 예약과 정산은 SQLite 트랜잭션이므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        """
+        scope = current_scope()
+        model, extra, reservation = await asyncio.to_thread(self._admit, messages, scope)
+        billing, usage = self._billing(model, reservation)
+        
+        try:
+            if reservation is not None:
+                await get_admission_controller().athrottle(scope, reservation["cost"])
+            return await model.ainvoke(messages, use_cache=use_cache, on_token=on_token, **extra, **usage, **kwargs)
+        finally:
+            if billing is not None:
+                await asyncio.to_thread(billing.settle)
+
+
+class LLMRouter:
+    """작업 → 모델 등급 라우팅"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fallbacks: Dict[str, int] = {}
+    
+    def _tier_model(self, tier: str, hedge: bool = False, task: Optional[str] = None) -> GatewayChatModel:
+        """등급 설정으로 게이트웨이 채팅 모델 생성"""
+        config = tier_config(tier)
+        return get_llm_gateway().chat_model(
+            temperature=config["temperature"],
+            model=config["model"],
+            max_tokens=config["max_tokens"],
+            hedge=hedge,
+            task=task
+        )
+    
+    def chat_model(self, task: str) -> RoutedChatModel:
+        """작업에 맞는 등급의 채팅 모델 (대체 등급이 있으면 함께 준비, 헤지 대상 작업은 헤지 요청 사용)"""
+        tier = get_tier(task)
+        hedge = task in settings.llm_hedged_tasks
+        primary = self._tier_model(tier, hedge, task)
+        
+        fallback = None
+        fallback_tier = settings.llm_tier_fallbacks.get(tier)
+        if fallback_tier and fallback_tier != tier and fallback_tier in settings.llm_model_tiers:
+            fallback = self._tier_model(fallback_tier, hedge, task)
+            if fallback.spec == primary.spec:
+                fallback = None
+        
+        return RoutedChatModel(task, primary, fallback)
+    
+    def count_fallback(self, task: str):
+        """대체 등급 사용 횟수 집계"""
+        with self._lock:
+            self._fallbacks[task] = self._fallbacks.get(task, 0) + 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """작업별 등급/모델과 대체 등급 사용 횟수"""
+        with self._lock:
+            fallbacks = dict(self._fallbacks)
+        
+        return {
+            "routes": {task: {"tier": get_tier(task), "model": tier_config(get_tier(task))["model"]} for task in settings.llm_task_tiers},
+            "fallbacks": fallbacks
+        }
+
+
+# 프로세스 전역 라우터
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> LLMRouter:
+    """프로세스 전역 라우터 반환"""
+    global _router
+    
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = LLMRouter()
+    
+    return _router
+
+
+def get_routed_llm(task: str) -> RoutedChatModel:
+    """작업에 맞는 등급의 공유 게이트웨이 채팅 모델"""
+    return get_router().chat_model(task)
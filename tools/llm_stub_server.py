@@ -0,0 +1,480 @@
+"""
+Fashion AI Automation System - Local LLM Stub Server
+
+OpenAI 호환 /v1/chat/completions를 흉내 내는 로컬 대체 서버입니다.
+실제 API 호출과 토큰 사용 없이 처리량과 꼬리 지연을 측정하기 위한 부하 테스트용입니다.
+
+- 첫 토큰까지 지연: 로그정규 분포 (중앙값 latency_ms, 꼬리 두께 latency_sigma)
+- 출력 토큰 생성 속도: tokens_per_second (스트리밍 시 청크 단위로 전송)
+- 오류 주입: error_rate 비율로 500, rate_limit_rate 비율로 429(retry-after-ms 포함)
+- 응답: 시스템/사용자 프롬프트로 작업 종류를 판별하여 prompts.yaml 형식의 한국어 응답 반환
+
+설정에서 LLM_STUB_ENABLED=true로 두면 게이트웨이가 모든 LLM 호출(노드, MCPClient)을
+이 서버로 보내며, 서버가 떠 있지 않으면 현재 프로세스에서 시작합니다.
+별도 프로세스로 실행하려면:
+    
+    python -m tools.llm_stub_server --port 8765 --latency-ms 400 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+
+from config.settings import settings
+from utils.token_counter import count_tokens, count_message_tokens, truncate_end
+
+
+# 작업 종류 판별 규칙 (시스템 프롬프트 우선, 먼저 일치한 규칙 사용)
+# 다른 작업의 프롬프트에도 "트렌드 분석", "감성 분석 결과" 등이 언급되므로 역할 표현 위주로 구체적인 것부터 검사
+TASK_RULES = [
+    ("human_feedback", ("피드백",)),
+    ("product_planning", ("기획 전문가", "제품 기획")),
+    ("content_suggestion", ("콘텐츠 전략", "콘텐츠 아이디어")),
+    ("marketing_copy", ("카피라이터", "마케팅 콘텐츠", "마케팅 문구")),
+    ("sentiment_scoring", ("감성 점수를 매겨",)),
+    ("sentiment_analysis", ("감성 분석 전문가", "감성을 분석")),
+    ("trend_analysis", ("트렌드 애널리스트", "트렌드 분석")),
+]
+
+# prompts.yaml 답변 형식에 맞춘 응답 ({category}, {score} 등은 요청마다 채움)
+CANNED_RESPONSES = {
+    "trend_analysis": """1. 주요 트렌드 요약
+- {category} 카테고리에서 린넨, 코튼 등 천연 소재 선호가 뚜렷합니다.
+- 오버사이즈 실루엣과 릴랙스드 핏이 20~30대를 중심으로 확산되고 있습니다.
+- 뉴트럴 톤에 비비드 포인트 컬러를 더한 스타일링이 늘고 있습니다.
+
+2. 타겟별 세분화 분석
+- 20대: SNS 인증 중심의 Y2K 아이템 구매가 많습니다.
+- 30대: 출근과 일상을 겸하는 미니멀 아이템 수요가 높습니다.
+
+3. 향후 3개월 예측
+- 간절기 레이어드 아이템 검색량이 약 {growth}% 증가할 것으로 예상됩니다.
+- 친환경 소재 제품의 가격 저항이 낮아질 전망입니다.
+
+4. 실행 가능한 비즈니스 제안
+- 천연 소재 베이직 라인을 3만~5만원대로 구성하세요.
+- 인플루언서 착용 콘텐츠로 초기 인지도를 확보하세요.""",
+    
+    "sentiment_analysis": """1. 전체 감성 점수: {score}
+2. 긍정/부정/중립 비율: 긍정 {positive}%, 부정 {negative}%, 중립 {neutral}%
+3. 주요 키워드 감성 분석
+- 착용감: 편안하다는 긍정적 반응이 많습니다.
+- 가격: 품질 대비 만족한다는 의견이 우세합니다.
+- 배송: 지연에 대한 부정적 언급이 일부 있습니다.
+4. 개선 포인트 제안
+- 사이즈 가이드를 보강하여 교환 문의를 줄이세요.
+- 배송 일정 안내를 강화하세요.""",
+    
+    "product_planning": """1. 제품명 및 컨셉
+- 제품명: {category} 데일리 린넨 라인
+- 컨셉: 출근과 주말을 모두 아우르는 편안한 미니멀 룩
+
+2. 타겟 고객 페르소나
+- 28세 직장인 여성, 실용성과 트렌드를 함께 고려하는 고객
+
+3. 주요 특징 및 차별점
+- 구김이 적은 린넨 혼방 소재
+- 체형을 가리는 릴랙스드 핏과 차별화된 컬러 구성
+
+4. 예상 가격 및 채널 전략
+- 가격: 49,000원~69,000원
+- 채널: 자사몰과 네이버 스마트스토어 중심, SNS 광고 병행
+
+5. 출시 일정 및 마케팅 포인트
+- 출시: 다음 시즌 4주 전 사전 예약
+- 마케팅: 인플루언서 착용 후기와 한정 컬러 프로모션""",
+    
+    "marketing_copy": """1. 메인 캐치프레이즈: 가볍게, 새로운 나의 {category}
+2. 서브 카피: 하루 종일 편안한 착용감, 세련된 실루엣을 지금 만나보세요.
+3. 상세 설명 문구: 통기성 좋은 천연 소재와 트렌디한 컬러로 완성한 특별한 데일리 아이템입니다. 한정 수량으로 준비했으니 놓치지 마세요.
+4. 해시태그 제안: #데일리룩 #린넨코디 #미니멀룩 #오오티디 #신상
+5. 채널별 최적화 버전
+- 인스타그램: 오늘의 룩, 새로운 {category}로 완성해보세요 ✨
+- 네이버 쇼핑: 편안한 착용감과 세련된 디자인, 지금 바로 특가로 만나보세요.""",
+    
+    "content_suggestion": """1. 주간 콘텐츠 캘린더: 월-신상 소개, 수-스타일링 팁, 금-고객 후기, 일-라이브 방송 일정 공지
+2. 플랫폼별 최적화 전략: 인스타그램은 릴스 중심, 유튜브는 코디 브이로그, 블로그는 상세 리뷰
+3. 시즌별 특별 기획안: 간절기 레이어드 코디 챌린지와 한정판 컬러 출시
+4. 인플루언서 협업 아이디어: 마이크로 인플루언서 10명과 착용 후기 협업
+5. 성과 측정 KPI 제안: 도달률, 저장 수, 구매 전환율, 재구매율 측정""",
+    
+    "human_feedback": """피드백을 반영하여 개선한 결과입니다.
+
+1. 변경사항
+- 요청하신 내용을 반영하여 핵심 메시지를 더 명확하게 다듬었습니다.
+- 행동 유도 문구를 추가했습니다: 지금 바로 만나보세요.
+
+2. 개선된 이유
+- 고객이 제품의 차별점과 혜택을 빠르게 이해할 수 있도록 구조를 정리했습니다.""",
+    
+    "default": """요청하신 내용에 대한 답변입니다.
+1. 핵심 요약: {category} 관련 수요가 꾸준히 증가하고 있습니다.
+2. 세부 내용: 천연 소재와 편안한 실루엣에 대한 선호가 높습니다.
+3. 제안: 데이터 기반으로 타겟 고객에 맞춘 기획을 권장합니다."""
+}
+
+# 요청에서 카테고리/브랜드를 찾는 패턴
+CATEGORY_PATTERN = re.compile(r"\*\*(?:타겟 카테고리|제품/브랜드|카테고리):\*\*\s*(.+)")
+
+# 감성 채점 요청의 텍스트 번호 ("3. 텍스트")
+ITEM_PATTERN = re.compile(r"^(\d+)\.\s", re.MULTILINE)
+
+
+def detect_task(messages: List[Dict[str, Any]]) -> str:
+    """프롬프트 내용으로 작업 종류 판별"""
+    system_text = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    all_text = " ".join(str(m.get("content", "")) for m in messages)
+    
+    for text in (system_text, all_text):
+        for task, keywords in TASK_RULES:
+            if any(keyword in text for keyword in keywords):
+                return task
+    return "default"
+
+
+def render_response(messages: List[Dict[str, Any]], rng: random.Random) -> str:
+    """작업 종류에 맞는 응답 생성"""
+    all_text = "\n".join(str(m.get("content", "")) for m in messages)
+    match = CATEGORY_PATTERN.search(all_text)
+    category = match.group(1).strip() if match else "패션"
+    
+    task = detect_task(messages)
+    if task == "sentiment_scoring":
+        # 텍스트 번호마다 [번호, 점수] 항목
+        return json.dumps({"scores": [[int(number), round(rng.uniform(-0.6, 0.9), 2)] for number in ITEM_PATTERN.findall(all_text)]})
+    
+    positive = rng.randint(45, 75)
+    negative = rng.randint(5, 20)
+    
+    return CANNED_RESPONSES[task].format(
+        category=category,
+        score=f"{rng.uniform(0.2, 0.8):.2f}",
+        positive=positive,
+        negative=negative,
+        neutral=100 - positive - negative,
+        growth=rng.randint(10, 40)
+    )
+
+
+class LLMStubServer:
+    """OpenAI 호환 로컬 대체 서버 (백그라운드 스레드에서 실행)"""
+    
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        latency_ms: Optional[float] = None,
+        latency_sigma: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        rate_limit_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            host, port: 바인딩 주소 (port=0이면 임의 포트)
+            latency_ms: 첫 토큰까지 지연 중앙값 (밀리초)
+            latency_sigma: 로그정규 분포 sigma (클수록 꼬리 지연이 길어짐, 0이면 고정 지연)
+            tokens_per_second: 출력 토큰 생성 속도 (0이면 지연 없음)
+            error_rate: 500 오류 비율
+            rate_limit_rate: 429 오류 비율
+            seed: 지연/오류 재현용 난수 시드
+        """
+        self.host = host or settings.llm_stub_host
+        self.port = settings.llm_stub_port if port is None else port
+        self.latency_ms = settings.llm_stub_latency_ms if latency_ms is None else latency_ms
+        self.latency_sigma = settings.llm_stub_latency_sigma if latency_sigma is None else latency_sigma
+        self.tokens_per_second = settings.llm_stub_tokens_per_second if tokens_per_second is None else tokens_per_second
+        self.error_rate = settings.llm_stub_error_rate if error_rate is None else error_rate
+        self.rate_limit_rate = settings.llm_stub_rate_limit_rate if rate_limit_rate is None else rate_limit_rate
+        
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "streamed": 0, "errors": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        """OpenAI 클라이언트 base_url"""
+        return f"http://{self.host}:{self.port}/v1"
+    
+    def start(self) -> "LLMStubServer":
+        """백그라운드 스레드에서 서버 시작"""
+        if self._httpd is not None:
+            return self
+        
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="llm_stub_server", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """서버 종료"""
+        if self._httpd is None:
+            return
+        
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        self._thread = None
+    
+    def serve_forever(self):
+        """현재 스레드에서 서버 실행 (CLI용)"""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stop()
+    
+    # ---- 요청 처리 ----
+    
+    def draw(self) -> Tuple[Optional[int], float]:
+        """이번 요청의 주입 오류 상태 코드(없으면 None)와 첫 토큰 지연(초)"""
+        with self._lock:
+            roll = self._rng.random()
+            if self.latency_ms <= 0:
+                latency = 0.0
+            elif self.latency_sigma <= 0:
+                latency = self.latency_ms / 1000
+            else:
+                latency = self._rng.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+        
+        if roll < self.rate_limit_rate:
+            return 429, latency
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500, latency
+        return None, latency
+    
+    def complete(self, request: Dict[str, Any]) -> Tuple[str, str, int, int]:
+        """(응답 텍스트, finish_reason, 입력 토큰 수, 출력 토큰 수)"""
+        messages = request.get("messages") or []
+        model = request.get("model")
+        
+        with self._lock:
+            content = render_response(messages, self._rng)
+        
+        finish_reason = "stop"
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens")
+        if max_tokens and count_tokens(content, model) > max_tokens:
+            content = truncate_end(content, max_tokens, model)
+            finish_reason = "length"
+        
+        prompt_tokens = count_message_tokens([m.get("content", "") for m in messages], model)
+        return content, finish_reason, prompt_tokens, count_tokens(content, model)
+    
+    def token_delay(self, tokens: int) -> float:
+        """토큰 생성에 걸리는 시간 (초)"""
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+    
+    def count(self, key: str, value: int = 1):
+        """통계 갱신"""
+        with self._lock:
+            self._stats[key] += value
+    
+    def stats(self) -> Dict[str, Any]:
+        """요청/스트리밍/주입 오류 횟수와 토큰 합계"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def _make_handler(server: LLMStubServer):
+    """서버 설정을 참조하는 요청 핸들러 클래스 생성"""
+    
+    class _StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def log_message(self, format, *args):
+            # 부하 테스트 중 요청마다 로그를 출력하지 않음
+            pass
+        
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                model = settings.openai_model
+                self._send_json(200, {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "stub"}]})
+            elif self.path.rstrip("/") in ("", "/health"):
+                self._send_json(200, {"status": "ok", **server.stats()})
+            else:
+                self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+        
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                return
+            
+            try:
+                request = json.loads(body or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": {"message": "invalid JSON body", "type": "invalid_request_error"}})
+                return
+            
+            server.count("requests")
+            status, latency = server.draw()
+            time.sleep(latency)
+            
+            if status == 429:
+                server.count("rate_limited")
+                self._send_json(429, {
+                    "error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}
+                }, headers={"retry-after-ms": str(int(max(100, server.latency_ms)))})
+                return
+            
+            if status == 500:
+                server.count("errors")
+                self._send_json(500, {"error": {"message": "Internal server error (stub)", "type": "server_error"}})
+                return
+            
+            content, finish_reason, prompt_tokens, completion_tokens = server.complete(request)
+            server.count("prompt_tokens", prompt_tokens)
+            server.count("completion_tokens", completion_tokens)
+            
+            completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+            model = request.get("model") or settings.openai_model
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+            
+            if request.get("stream"):
+                server.count("streamed")
+                include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+                self._stream(completion_id, model, content, finish_reason, usage if include_usage else None)
+                return
+            
+            time.sleep(server.token_delay(completion_tokens))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason
+                }],
+                "usage": usage
+            })
+        
+        def _stream(self, completion_id: str, model: str, content: str, finish_reason: str, usage: Optional[Dict[str, int]]):
+            """SSE 청크 전송 (단어 단위, 토큰 생성 속도에 맞춰 대기)"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            
+            def chunk(delta: Dict[str, Any], reason: Optional[str] = None, choices: bool = True, **extra):
+                return {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": reason}] if choices else [],
+                    **extra
+                }
+            
+            try:
+                self._send_event(chunk({"role": "assistant", "content": ""}))
+                for piece in re.findall(r"\s*\S+", content):
+                    time.sleep(server.token_delay(count_tokens(piece, model)))
+                    self._send_event(chunk({"content": piece}))
+                self._send_event(chunk({}, finish_reason))
+                if usage:
+                    self._send_event(chunk({}, choices=False, usage=usage))
+                self._send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # 클라이언트가 스트리밍 중 연결을 끊은 경우
+                pass
+        
+        def _send_event(self, payload: Any):
+            data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+            event = f"data: {data}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.flush()
+        
+        def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+    
+    return _StubHandler
+
+
+# 설정으로 활성화된 경우 현재 프로세스에서 실행 중인 서버
+_stub_server: Optional[LLMStubServer] = None
+_stub_lock = threading.Lock()
+
+
+def _is_listening(host: str, port: int) -> bool:
+    """주소에서 이미 서버가 연결을 받고 있는지"""
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def ensure_stub_server() -> str:
+    """설정된 주소에서 대체 서버가 실행 중이 아니면 현재 프로세스에서 시작하고 base_url 반환"""
+    global _stub_server
+    
+    with _stub_lock:
+        if _stub_server is None and not _is_listening(settings.llm_stub_host, settings.llm_stub_port):
+            _stub_server = LLMStubServer().start()
+            print(f"LLM 대체 서버 시작: {_stub_server.base_url}")
+    
+    return f"http://{settings.llm_stub_host}:{settings.llm_stub_port}/v1"
+
+
+def main():
+    """대체 서버 CLI"""
+    
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 LLM 대체 서버 (부하 테스트용)")
+    parser.add_argument("--host", default=None, help="바인딩 주소")
+    parser.add_argument("--port", type=int, default=None, help="포트")
+    parser.add_argument("--latency-ms", type=float, default=None, help="첫 토큰까지 지연 중앙값 (밀리초)")
+    parser.add_argument("--latency-sigma", type=float, default=None, help="지연 로그정규 분포 sigma")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="출력 토큰 생성 속도")
+    parser.add_argument("--error-rate", type=float, default=None, help="500 오류 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=None, help="429 오류 비율")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    args = parser.parse_args()
+    
+    server = LLMStubServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    server.start()
+    print(f"LLM 대체 서버 실행 중: {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ Fashion AI Automation System - MCP (Model Context Protocol) Client
 import json
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from config.settings import settings
+from utils.metrics import track, record_llm_call
+from .llm_router import get_routed_llm
+
+
+# LLM을 사용하는 도구 (라우팅 테이블의 "mcp:<도구 이름>" 등급 사용)
+LLM_TOOLS = ("trend_analyzer", "sentiment_analyzer", "content_generator")
 
 
 class MCPClient:
@@ -16,28 +20,15 @@ class MCPClient:
     
     def __init__(self):
         try:
-            # OpenAI 클라이언트 초기화
-            api_key = settings.openai_api_key
-            if not api_key:
-                try:
-                    import streamlit as st
-                    api_key = st.secrets.get("OPENAI_API_KEY", "")
-                except:
-                    pass
-            
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=settings.openai_temperature,
-                max_tokens=settings.max_tokens,
-                api_key=api_key
-            )
+            # 도구별 등급 모델로 공용 LLM 게이트웨이 사용 (동시성/분당 토큰 제한, 재시도)
+            self.llms = {tool_name: get_routed_llm(f"mcp:{tool_name}") for tool_name in LLM_TOOLS}
             
             # MCP 도구 등록
             self.available_tools = self._register_tools()
             
         except Exception as e:
             print(f"MCPClient 초기화 오류: {str(e)}")
-            self.llm = None
+            self.llms = {}
             self.available_tools = {}
     
     def _register_tools(self) -> Dict[str, Dict[str, Any]]:
@@ -211,13 +202,16 @@ class MCPClient:
             prompt = prompts.get(analysis_type, prompts["trend_summary"])
             
             # LLM 호출
-            if self.llm:
+            llm = self.llms.get("trend_analyzer")
+            if llm:
                 messages = [
                     SystemMessage(content="당신은 패션 트렌드 분석 전문가입니다."),
                     HumanMessage(content=prompt)
                 ]
                 
-                response = self.llm.invoke(messages)
+                with track("llm", "mcp_client", model=getattr(llm, "model_name", None)) as record:
+                    response = llm.invoke(messages)
+                    record_llm_call(record, messages, response)
                 
                 return {
                     "success": True,
@@ -265,13 +259,16 @@ class MCPClient:
 4. 개선점 제안"""
             
             # LLM 호출
-            if self.llm:
+            llm = self.llms.get("sentiment_analyzer")
+            if llm:
                 messages = [
                     SystemMessage(content="당신은 소비자 감성 분석 전문가입니다."),
                     HumanMessage(content=prompt)
                 ]
                 
-                response = self.llm.invoke(messages)
+                with track("llm", "mcp_client", model=getattr(llm, "model_name", None)) as record:
+                    response = llm.invoke(messages)
+                    record_llm_call(record, messages, response)
                 
                 return {
                     "success": True,
@@ -345,13 +342,16 @@ SNS 포스팅용 텍스트와 해시태그를 작성해주세요.""",
             prompt = prompts.get(content_type, prompts["marketing_copy"])
             
             # LLM 호출
-            if self.llm:
+            llm = self.llms.get("content_generator")
+            if llm:
                 messages = [
                     SystemMessage(content="당신은 패션 마케팅 콘텐츠 작성 전문가입니다."),
                     HumanMessage(content=prompt)
                 ]
                 
-                response = self.llm.invoke(messages)
+                with track("llm", "mcp_client", model=getattr(llm, "model_name", None)) as record:
+                    response = llm.invoke(messages)
+                    record_llm_call(record, messages, response)
                 
                 return {
                     "success": True,
@@ -596,4 +596,4 @@ SNS 포스팅용 텍스트와 해시태그를 작성해주세요.""",
     
     def is_connected(self) -> bool:
         """MCP 클라이언트 연결 상태 확인"""
-        return self.llm is not None 
\ No newline at end of file
+        return bool(self.llms) 
\ No newline at end of file
@@ -4,10 +4,18 @@ Fashion AI Automation System - Naver API Client
 
 import requests
 import urllib.parse
+import httpx
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 from config.settings import settings
+from utils.metrics import track, payload_size
+from utils.deadline import timeout_for, is_expired, mark_degraded
+from .async_http import get_async_client
+
+
+# 요청 타임아웃 (초, 세션 마감까지 남은 시간이 더 짧으면 그 값을 사용)
+REQUEST_TIMEOUT = 10
 
 
 class NaverAPIClient:
@@ -50,6 +58,10 @@ class NaverAPIClient:
                 print("네이버 API 키가 설정되지 않았습니다.")
                 return self._get_sample_shopping_data(query)
             
+            if is_expired():
+                mark_degraded("네이버 쇼핑 검색 생략 (마감 시간 초과, 샘플 데이터 사용)")
+                return self._get_sample_shopping_data(query)
+            
             # URL 인코딩
             encoded_query = urllib.parse.quote(query)
             
@@ -62,11 +74,18 @@ class NaverAPIClient:
                 "sort": sort
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
+            with track("tool", "naver_shop", query=query) as record:
+                response = requests.get(url, headers=self.headers, params=params, timeout=timeout_for(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                record["bytes_in"] = payload_size(params)
+                record["bytes_out"] = len(response.content)
             
             return response.json()
             
+        except requests.exceptions.Timeout as e:
+            print(f"네이버 쇼핑 API 시간 초과: {str(e)}")
+            mark_degraded("네이버 쇼핑 검색 시간 초과 (샘플 데이터 사용)")
+            return self._get_sample_shopping_data(query)
         except requests.exceptions.RequestException as e:
             print(f"네이버 쇼핑 API 오류: {str(e)}")
             return self._get_sample_shopping_data(query)
@@ -82,6 +101,10 @@ class NaverAPIClient:
                 print("네이버 API 키가 설정되지 않았습니다.")
                 return self._get_sample_blog_data(query)
             
+            if is_expired():
+                mark_degraded("네이버 블로그 검색 생략 (마감 시간 초과, 샘플 데이터 사용)")
+                return self._get_sample_blog_data(query)
+            
             # URL 인코딩
             encoded_query = urllib.parse.quote(query)
             
@@ -94,11 +117,18 @@ class NaverAPIClient:
                 "sort": sort
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
+            with track("tool", "naver_blog", query=query) as record:
+                response = requests.get(url, headers=self.headers, params=params, timeout=timeout_for(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                record["bytes_in"] = payload_size(params)
+                record["bytes_out"] = len(response.content)
             
             return response.json()
             
+        except requests.exceptions.Timeout as e:
+            print(f"네이버 블로그 API 시간 초과: {str(e)}")
+            mark_degraded("네이버 블로그 검색 시간 초과 (샘플 데이터 사용)")
+            return self._get_sample_blog_data(query)
         except requests.exceptions.RequestException as e:
             print(f"네이버 블로그 API 오류: {str(e)}")
             return self._get_sample_blog_data(query)
@@ -114,6 +144,10 @@ class NaverAPIClient:
                 print("네이버 API 키가 설정되지 않았습니다.")
                 return self._get_sample_news_data(query)
             
+            if is_expired():
+                mark_degraded("네이버 뉴스 검색 생략 (마감 시간 초과, 샘플 데이터 사용)")
+                return self._get_sample_news_data(query)
+            
             # URL 인코딩
             encoded_query = urllib.parse.quote(query)
             
@@ -126,11 +160,18 @@ class NaverAPIClient:
                 "sort": sort
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
+            with track("tool", "naver_news", query=query) as record:
+                response = requests.get(url, headers=self.headers, params=params, timeout=timeout_for(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                record["bytes_in"] = payload_size(params)
+                record["bytes_out"] = len(response.content)
             
             return response.json()
             
+        except requests.exceptions.Timeout as e:
+            print(f"네이버 뉴스 API 시간 초과: {str(e)}")
+            mark_degraded("네이버 뉴스 검색 시간 초과 (샘플 데이터 사용)")
+            return self._get_sample_news_data(query)
         except requests.exceptions.RequestException as e:
             print(f"네이버 뉴스 API 오류: {str(e)}")
             return self._get_sample_news_data(query)
@@ -138,6 +179,69 @@ class NaverAPIClient:
             print(f"네이버 뉴스 검색 오류: {str(e)}")
             return self._get_sample_news_data(query)
     
+    async def asearch_shopping(self, query: str, display: int = 10, start: int = 1, sort: str = "sim") -> Optional[Dict[str, Any]]:
+        """네이버 쇼핑 검색 API 비동기 호출"""
+        return await self._asearch("shop", "쇼핑", query, display, start, sort, self._get_sample_shopping_data)
+    
+    async def asearch_blog(self, query: str, display: int = 10, start: int = 1, sort: str = "sim") -> Optional[Dict[str, Any]]:
+        """네이버 블로그 검색 API 비동기 호출"""
+        return await self._asearch("blog", "블로그", query, display, start, sort, self._get_sample_blog_data)
+    
+    async def asearch_news(self, query: str, display: int = 10, start: int = 1, sort: str = "sim") -> Optional[Dict[str, Any]]:
+        """네이버 뉴스 검색 API 비동기 호출"""
+        return await self._asearch("news", "뉴스", query, display, start, sort, self._get_sample_news_data)
+    
+    async def _asearch(
+        self,
+        endpoint: str,
+        label: str,
+        query: str,
+        display: int,
+        start: int,
+        sort: str,
+        sample_fn
+    ) -> Optional[Dict[str, Any]]:
+        """네이버 검색 API 공통 비동기 호출 (공유 커넥션 풀 사용)"""
+        
+        try:
+            if not self.client_id or not self.client_secret:
+                print("네이버 API 키가 설정되지 않았습니다.")
+                return sample_fn(query)
+            
+            if is_expired():
+                mark_degraded(f"네이버 {label} 검색 생략 (마감 시간 초과, 샘플 데이터 사용)")
+                return sample_fn(query)
+            
+            # API 호출 (쿼리 인코딩은 httpx가 처리)
+            url = f"{self.base_url}/search/{endpoint}.json"
+            params = {
+                "query": query,
+                "display": display,
+                "start": start,
+                "sort": sort
+            }
+            
+            with track("tool", f"naver_{endpoint}", query=query) as record:
+                response = await get_async_client().get(
+                    url, headers=self.headers, params=params, timeout=timeout_for(REQUEST_TIMEOUT)
+                )
+                response.raise_for_status()
+                record["bytes_in"] = payload_size(params)
+                record["bytes_out"] = len(response.content)
+            
+            return response.json()
+            
+        except httpx.TimeoutException as e:
+            print(f"네이버 {label} API 시간 초과: {str(e)}")
+            mark_degraded(f"네이버 {label} 검색 시간 초과 (샘플 데이터 사용)")
+            return sample_fn(query)
+        except httpx.HTTPError as e:
+            print(f"네이버 {label} API 오류: {str(e)}")
+            return sample_fn(query)
+        except Exception as e:
+            print(f"네이버 {label} 검색 오류: {str(e)}")
+            return sample_fn(query)
+    
     def _get_sample_shopping_data(self, query: str) -> Dict[str, Any]:
         """샘플 쇼핑 데이터 반환 (API 키가 없을 때)"""
         
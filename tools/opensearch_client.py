@@ -2,6 +2,7 @@
 Fashion AI Automation System - OpenSearch Client
 """
 
+import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
@@ -14,6 +15,12 @@ except ImportError:
     OPENSEARCH_AVAILABLE = False
 
 from config.settings import settings
+from utils.metrics import track, payload_size
+from utils.deadline import timeout_for, is_expired, mark_degraded
+
+
+# 요청 타임아웃 (초, 세션 마감까지 남은 시간이 더 짧으면 그 값을 사용)
+REQUEST_TIMEOUT = 10
 
 
 class OpenSearchClient:
@@ -186,17 +193,25 @@ class OpenSearchClient:
                 print("OpenSearch 클라이언트가 연결되지 않았습니다.")
                 return False
             
+            # 마감 시간이 지난 경우 저장 생략 (결과 반환을 우선)
+            if is_expired():
+                mark_degraded(f"OpenSearch 저장 생략 (마감 시간 초과): {index_name}")
+                return False
+            
             # 인덱스가 존재하지 않으면 생성
             if not self.client.indices.exists(index=index_name):
                 self.create_index(index_name)
             
             # 문서 인덱싱
-            response = self.client.index(
-                index=index_name,
-                body=document,
-                id=doc_id,
-                refresh=True
-            )
+            with track("tool", "opensearch_index", index=index_name) as record:
+                response = self.client.index(
+                    index=index_name,
+                    body=document,
+                    id=doc_id,
+                    refresh=True,
+                    request_timeout=timeout_for(REQUEST_TIMEOUT)
+                )
+                record["bytes_in"] = payload_size(document)
             
             print(f"문서 인덱싱 완료: {response['_id']}")
             return True
@@ -205,6 +220,18 @@ class OpenSearchClient:
             print(f"문서 인덱싱 오류: {str(e)}")
             return False
     
+    async def aindex_document(self, index_name: str, document: Dict[str, Any], doc_id: Optional[str] = None) -> bool:
+        """문서 비동기 인덱싱
+        
+        opensearch-py의 비동기 클라이언트는 aiohttp 추가 설치가 필요하므로
+        기존 커넥션 풀을 공유하는 동기 클라이언트를 워커 스레드에서 실행합니다.
+        """
+        return await asyncio.to_thread(self.index_document, index_name, document, doc_id)
+    
+    async def asearch_documents(self, index_name: str, query: Dict[str, Any], size: int = 10) -> Optional[Dict[str, Any]]:
+        """문서 비동기 검색 (워커 스레드에서 실행)"""
+        return await asyncio.to_thread(self.search_documents, index_name, query, size)
+    
     def search_documents(self, index_name: str, query: Dict[str, Any], size: int = 10) -> Optional[Dict[str, Any]]:
         """문서 검색"""
         
@@ -213,11 +240,15 @@ class OpenSearchClient:
                 print("OpenSearch 클라이언트가 연결되지 않았습니다.")
                 return self._get_sample_search_results()
             
-            response = self.client.search(
-                index=index_name,
-                body=query,
-                size=size
-            )
+            with track("tool", "opensearch_search", index=index_name) as record:
+                response = self.client.search(
+                    index=index_name,
+                    body=query,
+                    size=size,
+                    request_timeout=timeout_for(REQUEST_TIMEOUT)
+                )
+                record["bytes_in"] = payload_size(query)
+                record["bytes_out"] = payload_size(response)
             
             return response
             
@@ -2,13 +2,72 @@
 Fashion AI Automation System - Web Scraper
 """
 
+import asyncio
 import requests
+import httpx
 from bs4 import BeautifulSoup
+import threading
 import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import re
 
+from utils.metrics import track
+from utils.deadline import timeout_for, is_expired, mark_degraded
+from utils.keyword_matcher import KeywordMatcher
+from .async_http import get_async_client
+
+
+# 같은 호스트 요청 간격 및 타임아웃 (초, 세션 마감까지 남은 시간이 더 짧으면 그 값을 사용)
+REQUEST_INTERVAL = 1
+REQUEST_TIMEOUT = 10
+
+# 패션 관련 키워드 (대소문자 무시, 매처는 모듈 로드 시 한 번만 생성)
+FASHION_KEYWORDS = [
+    # 의류 종류
+    "드레스", "원피스", "블라우스", "셔츠", "티셔츠", "니트", "스웨터",
+    "자켓", "코트", "카디건", "바지", "팬츠", "스커트", "청바지", "데님",
+    
+    # 스타일
+    "캐주얼", "포멀", "스트리트", "빈티지", "모던", "클래식", "미니멀",
+    "보헤미안", "페미닌", "머스큘린", "앤드로지너스",
+    
+    # 트렌드
+    "트렌드", "유행", "신상", "컬렉션", "시즌", "SS", "FW", "패션위크",
+    
+    # 색상
+    "블랙", "화이트", "네이비", "베이지", "그레이", "카키", "핑크",
+    "레드", "블루", "그린", "옐로우", "퍼플",
+    
+    # 소재
+    "코튼", "린넨", "실크", "울", "니트", "레더", "데님", "체크", "스트라이프"
+]
+FASHION_KEYWORD_MATCHER = KeywordMatcher(FASHION_KEYWORDS, ignore_case=True)
+
+
+class HostRateLimiter:
+    """호스트별 요청 간격 제한 (동시에 실행되는 요청도 같은 호스트는 interval 간격으로 시작)"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_start: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def reserve(self, url: str) -> float:
+        """호스트의 다음 요청 시작 시각을 예약하고 그때까지 기다려야 할 시간(초) 반환"""
+        host = urlparse(url).netloc.lower()
+        
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.interval
+            return start - now
+
+
+# 프로세스 전역 호스트별 요청 간격 제한 (스레드/이벤트 루프 공용)
+_host_limiter = HostRateLimiter(REQUEST_INTERVAL)
+
 
 class WebScraper:
     """패션 관련 웹사이트 스크래핑 도구"""
@@ -24,24 +83,24 @@ class WebScraper:
         """패션 웹사이트에서 콘텐츠 스크래핑"""
         
         try:
-            # 실제 환경에서는 robots.txt 확인 및 rate limiting 필요
-            time.sleep(1)  # 요청 간격 조절
+            # 같은 호스트 요청 간격 조절 (실제 환경에서는 robots.txt 확인 필요)
+            wait = _host_limiter.reserve(url)
+            if is_expired(wait):
+                mark_degraded(f"웹 스크래핑 생략 (마감 시간 초과, 샘플 데이터 사용): {url}")
+                return self._get_sample_content(url, keyword)
+            time.sleep(wait)
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 웹사이트별 맞춤 스크래핑 로직
-            if "vogue" in url.lower():
-                return self._scrape_vogue(soup, url, keyword)
-            elif "elle" in url.lower():
-                return self._scrape_elle(soup, url, keyword)
-            elif "harpersbazaar" in url.lower():
-                return self._scrape_harpers_bazaar(soup, url, keyword)
-            else:
-                return self._scrape_generic(soup, url, keyword)
+            with track("tool", "web_scraper", url=url) as record:
+                response = self.session.get(url, timeout=timeout_for(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                record["bytes_out"] = len(response.content)
+                
+                return self._parse_content(response.content, url, keyword)
                 
+        except requests.exceptions.Timeout as e:
+            print(f"웹 스크래핑 시간 초과 ({url}): {str(e)}")
+            mark_degraded(f"웹 스크래핑 시간 초과 (샘플 데이터 사용): {url}")
+            return self._get_sample_content(url, keyword)
         except requests.exceptions.RequestException as e:
             print(f"웹 스크래핑 네트워크 오류 ({url}): {str(e)}")
             return self._get_sample_content(url, keyword)
@@ -49,6 +108,50 @@ class WebScraper:
             print(f"웹 스크래핑 오류 ({url}): {str(e)}")
             return self._get_sample_content(url, keyword)
     
+    async def ascrape_fashion_content(self, url: str, keyword: str = "") -> Optional[Dict[str, Any]]:
+        """패션 웹사이트에서 콘텐츠 비동기 스크래핑 (공유 커넥션 풀 사용)"""
+        
+        try:
+            # 같은 호스트 요청 간격 조절 (동시에 실행되는 작업 간에도 적용, 다른 호스트 요청은 기다리지 않음)
+            wait = _host_limiter.reserve(url)
+            if is_expired(wait):
+                mark_degraded(f"웹 스크래핑 생략 (마감 시간 초과, 샘플 데이터 사용): {url}")
+                return self._get_sample_content(url, keyword)
+            await asyncio.sleep(wait)
+            
+            with track("tool", "web_scraper", url=url) as record:
+                response = await get_async_client().get(url, headers=self.headers, timeout=timeout_for(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                record["bytes_out"] = len(response.content)
+                
+                # HTML 파싱은 워커 스레드에서 실행 (이벤트 루프를 블로킹하지 않음)
+                return await asyncio.to_thread(self._parse_content, response.content, url, keyword)
+            
+        except httpx.TimeoutException as e:
+            print(f"웹 스크래핑 시간 초과 ({url}): {str(e)}")
+            mark_degraded(f"웹 스크래핑 시간 초과 (샘플 데이터 사용): {url}")
+            return self._get_sample_content(url, keyword)
+        except httpx.HTTPError as e:
+            print(f"웹 스크래핑 네트워크 오류 ({url}): {str(e)}")
+            return self._get_sample_content(url, keyword)
+        except Exception as e:
+            print(f"웹 스크래핑 오류 ({url}): {str(e)}")
+            return self._get_sample_content(url, keyword)
+    
+    def _parse_content(self, content: bytes, url: str, keyword: str) -> Dict[str, Any]:
+        """HTML을 파싱하여 웹사이트별 맞춤 스크래핑 로직 적용"""
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        if "vogue" in url.lower():
+            return self._scrape_vogue(soup, url, keyword)
+        elif "elle" in url.lower():
+            return self._scrape_elle(soup, url, keyword)
+        elif "harpersbazaar" in url.lower():
+            return self._scrape_harpers_bazaar(soup, url, keyword)
+        else:
+            return self._scrape_generic(soup, url, keyword)
+    
     def _scrape_vogue(self, soup: BeautifulSoup, url: str, keyword: str) -> Dict[str, Any]:
         """VOGUE 웹사이트 스크래핑"""
         
@@ -253,37 +356,27 @@ class WebScraper:
         
         return results
     
-    def extract_fashion_keywords(self, text: str) -> List[str]:
-        """텍스트에서 패션 관련 키워드 추출"""
+    async def ascrape_multiple_sites(self, urls: List[str], keyword: str = "") -> List[Dict[str, Any]]:
+        """여러 사이트를 동시에 비동기 스크래핑"""
         
-        fashion_keywords = [
-            # 의류 종류
-            "드레스", "원피스", "블라우스", "셔츠", "티셔츠", "니트", "스웨터",
-            "자켓", "코트", "카디건", "바지", "팬츠", "스커트", "청바지", "데님",
-            
-            # 스타일
-            "캐주얼", "포멀", "스트리트", "빈티지", "모던", "클래식", "미니멀",
-            "보헤미안", "페미닌", "머스큘린", "앤드로지너스",
-            
-            # 트렌드
-            "트렌드", "유행", "신상", "컬렉션", "시즌", "SS", "FW", "패션위크",
-            
-            # 색상
-            "블랙", "화이트", "네이비", "베이지", "그레이", "카키", "핑크",
-            "레드", "블루", "그린", "옐로우", "퍼플",
-            
-            # 소재
-            "코튼", "린넨", "실크", "울", "니트", "레더", "데님", "체크", "스트라이프"
-        ]
+        results = await asyncio.gather(
+            *(self.ascrape_fashion_content(url, keyword) for url in urls),
+            return_exceptions=True
+        )
         
-        found_keywords = []
-        text_lower = text.lower()
+        collected = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"사이트 스크래핑 오류 ({url}): {str(result)}")
+            elif result:
+                collected.append(result)
         
-        for keyword in fashion_keywords:
-            if keyword.lower() in text_lower:
-                found_keywords.append(keyword)
+        return collected
+    
+    def extract_fashion_keywords(self, text: str) -> List[str]:
+        """텍스트에서 패션 관련 키워드 추출"""
         
-        return list(set(found_keywords))  # 중복 제거
+        return FASHION_KEYWORD_MATCHER.find(text)
     
     def clean_text(self, text: str) -> str:
         """텍스트 정리 및 정규화"""
@@ -0,0 +1,85 @@
+"""
+마감 시간(deadline) 전파 모듈
+
+세션별 마감 시각을 contextvar로 노드와 도구 호출에 전달합니다.
+도구와 노드는 남은 시간으로 요청 타임아웃을 제한하고, 마감이 지나면
+샘플/부분 결과로 대체한 뒤 degraded 사유를 기록합니다.
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, List, Optional
+
+
+# 현재 실행 중인 세션의 마감 시각 (epoch 초) 및 품질 저하 사유 목록
+_deadline: ContextVar[Optional[float]] = ContextVar("session_deadline", default=None)
+_degraded: ContextVar[Optional[List[str]]] = ContextVar("session_degraded", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """세션 마감 시간 초과"""
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[List[str]]:
+    """블록 안의 호출에 마감 시각을 전달하고, 기록된 품질 저하 사유를 목록으로 수집"""
+    degraded: List[str] = []
+    deadline_token = _deadline.set(deadline)
+    degraded_token = _degraded.set(degraded)
+    
+    try:
+        yield degraded
+    finally:
+        _deadline.reset(deadline_token)
+        _degraded.reset(degraded_token)
+
+
+def remaining() -> Optional[float]:
+    """마감까지 남은 시간 (초, 마감이 없으면 None)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def is_expired(margin: float = 0.0) -> bool:
+    """마감 시간이 지났는지 (margin 초 이내로 남은 경우 포함)"""
+    time_left = remaining()
+    return time_left is not None and time_left <= margin
+
+
+def timeout_for(default: float, minimum: float = 0.1) -> float:
+    """기본 타임아웃과 남은 시간 중 짧은 값"""
+    time_left = remaining()
+    if time_left is None:
+        return default
+    return max(minimum, min(default, time_left))
+
+
+def mark_degraded(reason: str):
+    """마감 등으로 부분/샘플 결과를 사용했음을 기록"""
+    degraded = _degraded.get()
+    if degraded is not None:
+        degraded.append(reason)
+
+
+async def with_deadline(awaitable: Awaitable[Any]) -> Any:
+    """남은 시간 안에 완료되지 않으면 DeadlineExceeded 발생"""
+    time_left = remaining()
+    
+    if time_left is None:
+        return await awaitable
+    
+    if time_left <= 0:
+        # 실행되지 않은 코루틴 경고 방지
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("세션 마감 시간 초과")
+    
+    try:
+        return await asyncio.wait_for(awaitable, timeout=time_left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("세션 마감 시간 초과")
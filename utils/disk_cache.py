@@ -0,0 +1,188 @@
+"""
+디스크 캐시 모듈
+
+SQLite 기반의 키-값 캐시로 TTL 만료와 LRU(최근 사용 시각 기준) 제거를 지원합니다.
+값은 JSON으로 직렬화되며, 여러 프로세스/스레드에서 같은 파일을 공유할 수 있습니다.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# 여러 키를 한 번에 조회할 때 쿼리당 키 수 (SQLite 파라미터 수 제한)
+QUERY_CHUNK_SIZE = 500
+
+
+class DiskCache:
+    """TTL/LRU 디스크 캐시"""
+    
+    def __init__(self, db_path: str, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            db_path: SQLite 파일 경로
+            ttl_seconds: 항목 유효 시간 (None이면 만료 없음)
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 제거)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialize()
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """요청마다 새 연결 사용"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _initialize(self):
+        """테이블 생성"""
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+    
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        """TTL 경과 여부"""
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+    
+    def get(self, key: str) -> Optional[Any]:
+        """캐시 조회 (없거나 만료된 경우 None)"""
+        try:
+            now = time.time()
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                
+                if row is None:
+                    return None
+                
+                if self._is_expired(row[1], now):
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    return None
+                
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            
+            return json.loads(row[0])
+        
+        except (sqlite3.Error, ValueError) as e:
+            print(f"디스크 캐시 조회 오류: {e}")
+            return None
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """여러 키를 한 번에 조회 (없거나 만료된 키는 결과에서 제외)"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        
+        try:
+            now = time.time()
+            with self._lock, self._connect() as conn:
+                rows = []
+                for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+                    chunk = keys[start:start + QUERY_CHUNK_SIZE]
+                    rows.extend(conn.execute(
+                        f"SELECT key, value, created_at FROM cache WHERE key IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall())
+                
+                fresh = [(key, value) for key, value, created_at in rows if not self._is_expired(created_at, now)]
+                expired = [(key,) for key, _, created_at in rows if self._is_expired(created_at, now)]
+                
+                conn.executemany("DELETE FROM cache WHERE key = ?", expired)
+                conn.executemany("UPDATE cache SET accessed_at = ? WHERE key = ?", [(now, key) for key, _ in fresh])
+            
+            return {key: json.loads(value) for key, value in fresh}
+        
+        except (sqlite3.Error, ValueError) as e:
+            print(f"디스크 캐시 조회 오류: {e}")
+            return {}
+    
+    def set(self, key: str, value: Any) -> bool:
+        """캐시 저장 후 만료/초과 항목 정리"""
+        return self.set_many({key: value})
+    
+    def set_many(self, items: Dict[str, Any]) -> bool:
+        """여러 항목을 한 트랜잭션으로 저장 후 만료/초과 항목 정리"""
+        if not items:
+            return True
+        
+        try:
+            now = time.time()
+            rows = [(key, json.dumps(value, ensure_ascii=False, default=str), now, now) for key, value in items.items()]
+            
+            with self._lock, self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", rows)
+                
+                if self.ttl_seconds is not None:
+                    conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                
+                if self.max_entries is not None:
+                    conn.execute(
+                        """
+                        DELETE FROM cache WHERE key IN (
+                            SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_entries,)
+                    )
+            
+            return True
+        
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"디스크 캐시 저장 오류: {e}")
+            return False
+    
+    def delete(self, key: str) -> bool:
+        """항목 삭제"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return True
+        except sqlite3.Error as e:
+            print(f"디스크 캐시 삭제 오류: {e}")
+            return False
+    
+    def clear(self) -> bool:
+        """전체 항목 삭제"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute("DELETE FROM cache")
+            return True
+        except sqlite3.Error as e:
+            print(f"디스크 캐시 초기화 오류: {e}")
+            return False
+    
+    def stats(self) -> Dict[str, Any]:
+        """항목 수 등 캐시 상태"""
+        try:
+            with self._lock, self._connect() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {
+                "entries": count,
+                "ttl_seconds": self.ttl_seconds,
+                "max_entries": self.max_entries,
+                "path": str(self.db_path)
+            }
+        except sqlite3.Error as e:
+            print(f"디스크 캐시 상태 조회 오류: {e}")
+            return {}
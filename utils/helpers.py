@@ -61,12 +61,24 @@ def safe_json_loads(text: str, default: Any = None) -> Any:
     except (json.JSONDecodeError, TypeError):
         return default
 
+def safe_int(value: Any, default: int = 0) -> int:
+    """안전한 정수 변환 (API 응답의 문자열 가격/좋아요 수 등)"""
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return default
+
 def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
     """텍스트 자르기"""
     if len(text) <= max_length:
         return text
     return text[:max_length - len(suffix)] + suffix
 
+def content_hash(*parts: Any) -> str:
+    """입력/출력 내용의 해시 (변경 여부 비교용)"""
+    serialized = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
 def validate_api_key(api_key: str) -> bool:
     """API 키 유효성 검사"""
     if not api_key:
@@ -0,0 +1,188 @@
+"""
+다중 키워드 매칭 모듈
+
+어휘(키워드 목록)마다 매처를 한 번 만들어 두고 모든 키워드의 일치 위치를 찾습니다.
+어휘 크기에 따라 가장 빠른 방식을 사용합니다 (250K자 한국어 본문 측정 기준):
+
+- 작은 어휘: 키워드별 `in`/`str.find` 검색 (C 구현이라 어휘가 작으면 오토마톤보다 빠름)
+- 큰 어휘: Aho-Corasick 오토마톤으로 텍스트를 한 번만 훑음 (pyahocorasick C 구현,
+  설치되지 않았으면 순수 파이썬 구현 - 키워드 수와 무관하게 텍스트 길이에 비례)
+
+- 겹치는 일치도 모두 반환 ("니트"와 "니트웨어", "울"과 "울트라")
+- ignore_case=True이면 대소문자 무시 ("SS"와 "ss")
+- 결과 키워드 순서는 어휘 순서 (기존 `for keyword in keywords` 순회 결과와 같음)
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Iterable, Iterator, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# 키워드별 검색을 사용하는 어휘 크기 상한 (이보다 크면 오토마톤 사용)
+# 측정값: pyahocorasick는 약 200개, 순수 파이썬 오토마톤은 약 1000개부터 키워드별 검색보다 빠름
+SCAN_MAX_KEYWORDS = 200
+PYTHON_SCAN_MAX_KEYWORDS = 1000
+
+
+class KeywordMatcher:
+    """다중 키워드 매처 (어휘당 한 번 생성하여 재사용)"""
+    
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.keywords: List[str] = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._folded = [self._fold(keyword) for keyword in self.keywords]
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        
+        scan_limit = SCAN_MAX_KEYWORDS if AHOCORASICK_AVAILABLE else PYTHON_SCAN_MAX_KEYWORDS
+        if len(self.keywords) <= scan_limit:
+            self.backend = "scan"
+        elif AHOCORASICK_AVAILABLE:
+            self.backend = "ahocorasick"
+            self._build_native()
+        else:
+            self.backend = "automaton"
+            self._build()
+    
+    def _build_native(self):
+        """pyahocorasick 오토마톤 생성 (대소문자 무시로 같아지는 키워드는 함께 일치)"""
+        indices: Dict[str, List[int]] = {}
+        for index, folded in enumerate(self._folded):
+            indices.setdefault(folded, []).append(index)
+        
+        self._native = ahocorasick.Automaton()
+        for folded, group in indices.items():
+            self._native.add_word(folded, tuple(group))
+        self._native.make_automaton()
+    
+    def _fold(self, text: str) -> str:
+        """대소문자 무시 시 소문자로 변환 (글자 수가 바뀌는 문자는 그대로 두어 위치 유지)"""
+        if not self.ignore_case:
+            return text
+        
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        return folded
+    
+    def _build(self):
+        """순수 파이썬 오토마톤의 키워드 트라이와 실패 링크 생성 (너비 우선)"""
+        # 상태별 전이, 실패 링크, 해당 상태에서 끝나는 키워드 인덱스
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        
+        for index, keyword in enumerate(self._folded):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(index)
+        
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                
+                # 실패 링크 상태(더 짧은 접미사)에서 끝나는 키워드도 함께 일치
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+        
+        self._output = [tuple(output) for output in outputs]
+        
+        # 루트 상태에서 키워드 첫 글자가 나올 때까지 정규식으로 건너뜀 (일치와 무관한 구간은 C 수준에서 처리)
+        self._start = re.compile("[" + "".join(re.escape(char) for char in self._goto[0]) + "]") if self._goto[0] else None
+    
+    def _scan(self, text: str) -> Iterator[Tuple[int, int]]:
+        """모든 일치의 (끝 위치, 키워드 인덱스) 생성 (순서는 방식마다 다름)"""
+        text = self._fold(text)
+        
+        if self.backend == "scan":
+            for index, keyword in enumerate(self._folded):
+                position = text.find(keyword)
+                while position != -1:
+                    yield position + self._lengths[index], index
+                    position = text.find(keyword, position + 1)
+        
+        elif self.backend == "ahocorasick":
+            for end, group in self._native.iter(text):
+                for index in group:
+                    yield end + 1, index
+        
+        else:
+            yield from self._scan_automaton(text)
+    
+    def _scan_automaton(self, text: str) -> Iterator[Tuple[int, int]]:
+        """순수 파이썬 오토마톤으로 (끝 위치, 키워드 인덱스)를 텍스트 앞에서부터 차례로 생성"""
+        goto, fail, output, start = self._goto, self._fail, self._output, self._start
+        state, position, length = 0, 0, len(text)
+        
+        while position < length:
+            if not state:
+                candidate = start.search(text, position)
+                if candidate is None:
+                    return
+                position = candidate.start()
+            
+            char = text[position]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            position += 1
+            
+            for index in output[state]:
+                yield position, index
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """모든 일치의 (시작 위치, 끝 위치, 키워드) 목록 (끝 위치 순, 같으면 긴 키워드 먼저)"""
+        if not text or not self.keywords:
+            return []
+        return sorted(
+            ((end - self._lengths[index], end, self.keywords[index]) for end, index in self._scan(text)),
+            key=lambda match: (match[1], match[0])
+        )
+    
+    def find(self, text: str) -> List[str]:
+        """텍스트에 등장한 키워드 목록 (중복 없이 어휘 순서)"""
+        if not text or not self.keywords:
+            return []
+        
+        if self.backend == "scan":
+            text = self._fold(text)
+            return [keyword for keyword, folded in zip(self.keywords, self._folded) if folded in text]
+        
+        return [self.keywords[index] for index in sorted({index for _, index in self._scan(text)})]
+    
+    def contains_any(self, text: str) -> bool:
+        """키워드가 하나라도 등장하는지 (첫 일치에서 중단)"""
+        if not text or not self.keywords:
+            return False
+        
+        if self.backend == "scan":
+            text = self._fold(text)
+            return any(folded in text for folded in self._folded)
+        
+        return next(self._scan(text), None) is not None
+
+
+@lru_cache(maxsize=256)
+def get_keyword_matcher(keywords: Tuple[str, ...], ignore_case: bool = False) -> KeywordMatcher:
+    """어휘별 매처 (실행 중에 정해지는 어휘도 같은 목록이면 한 번만 생성)"""
+    return KeywordMatcher(keywords, ignore_case=ignore_case)
@@ -0,0 +1,221 @@
+"""
+성능 계측 모듈
+
+노드 실행과 도구 호출(네이버 API, 웹 스크래핑, OpenSearch, LLM) 단위로
+시작/종료 시각, 소요 시간, 입출력 바이트, 토큰 수, 메모리 사용량을 기록합니다.
+
+- bytes_in: 호출에 전달한 데이터 크기 (요청 본문, 프롬프트)
+- bytes_out: 호출이 반환한 데이터 크기 (응답 본문, LLM 응답)
+- memory_delta_kb: tracemalloc 추적 중일 때 구간 동안 늘어난 Python 힙 크기
+- memory_peak_kb: tracemalloc 추적 중일 때 구간 동안의 Python 힙 최대 증가량
+  (구간 시작 시 최대값을 초기화하므로, 동시에 실행되거나 중첩된 구간이 있으면 근사값)
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterator
+
+from .token_counter import count_tokens, count_message_tokens
+
+
+# 현재 실행 중인 노드의 계측 레코드 목록 (asyncio 태스크/스레드로 전파됨)
+_current_records: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("metrics_records", default=None)
+
+
+class MetricsCollector:
+    """프로세스 전역 계측 레코드 수집기"""
+    
+    def __init__(self, max_records: int = 10000):
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+    
+    def record(self, record: Dict[str, Any]):
+        """레코드 추가"""
+        with self._lock:
+            self.records.append(record)
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """(종류, 이름)별 집계"""
+        with self._lock:
+            records = list(self.records)
+        return summarize_metrics(records)
+    
+    def reset(self):
+        """수집된 레코드 초기화"""
+        with self._lock:
+            self.records.clear()
+
+
+_collector: Optional[MetricsCollector] = None
+_collector_lock = threading.Lock()
+
+
+def enable_collector(max_records: int = 10000, trace_memory: bool = False) -> MetricsCollector:
+    """프로세스 전역 수집기 활성화 (이미 활성화된 경우 기존 수집기 반환)"""
+    global _collector
+    
+    with _collector_lock:
+        if _collector is None:
+            _collector = MetricsCollector(max_records)
+        
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        
+        return _collector
+
+
+def disable_collector():
+    """프로세스 전역 수집기 비활성화"""
+    global _collector
+    
+    with _collector_lock:
+        _collector = None
+
+
+def get_collector() -> Optional[MetricsCollector]:
+    """프로세스 전역 수집기 반환 (비활성화 상태면 None)"""
+    return _collector
+
+
+@contextmanager
+def collect_metrics() -> Iterator[List[Dict[str, Any]]]:
+    """블록 안에서 생성된 계측 레코드를 목록으로 수집"""
+    records: List[Dict[str, Any]] = []
+    token = _current_records.set(records)
+    
+    try:
+        yield records
+    finally:
+        _current_records.reset(token)
+
+
+@contextmanager
+def track(kind: str, name: str, **attributes) -> Iterator[Dict[str, Any]]:
+    """호출 구간 계측
+    
+    yield된 레코드에 bytes_in, bytes_out, input_tokens, output_tokens 등을 채우면
+    구간 종료 시 시간/메모리 정보와 함께 기록됩니다.
+    """
+    record = {
+        "kind": kind,
+        "name": name,
+        "start": datetime.now().isoformat(),
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        **attributes
+    }
+    
+    started_at = time.perf_counter()
+    memory_before = None
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+    
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        record["end"] = datetime.now().isoformat()
+        record["duration_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+        
+        if memory_before is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            record["memory_delta_kb"] = round((current - memory_before) / 1024, 1)
+            record["memory_peak_kb"] = round(max(0, peak - memory_before) / 1024, 1)
+        
+        records = _current_records.get()
+        if records is not None:
+            records.append(record)
+        
+        collector = _collector
+        if collector is not None:
+            collector.record(record)
+
+
+def payload_size(payload: Any) -> int:
+    """데이터 크기(바이트) 추정"""
+    if payload is None:
+        return 0
+    if isinstance(payload, (bytes, bytearray)):
+        return len(payload)
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    
+    try:
+        return len(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(payload).encode("utf-8"))
+
+
+def record_llm_call(record: Dict[str, Any], messages: List[Any], response: Any):
+    """LLM 호출 레코드에 프롬프트/응답 크기와 토큰 수 기록
+    
+    응답에 usage_metadata가 있으면 실제 토큰 수를, 없으면 로컬 토크나이저로 계산한 값을 사용합니다.
+    응답 캐시에서 반환된 경우 토큰 수는 0이며 cache_hit으로 표시됩니다.
+    라우터가 대체 등급으로 호출한 경우 레코드의 model을 실제로 사용한 모델로 바꿉니다.
+    """
+    metadata = getattr(response, "response_metadata", None)
+    if isinstance(metadata, dict) and metadata.get("served_model"):
+        record["model"] = metadata["served_model"]
+    
+    prompt = "".join(str(getattr(message, "content", message)) for message in messages)
+    content = str(getattr(response, "content", response))
+    
+    record["bytes_in"] = payload_size(prompt)
+    record["bytes_out"] = payload_size(content)
+    
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage:
+        record["input_tokens"] = usage.get("input_tokens", 0)
+        record["output_tokens"] = usage.get("output_tokens", 0)
+    else:
+        model = record.get("model")
+        record["input_tokens"] = count_message_tokens(messages, model)
+        record["output_tokens"] = count_tokens(content, model)
+    
+    if isinstance(metadata, dict) and metadata.get("cache_hit"):
+        record["cache_hit"] = True
+
+
+def summarize_metrics(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """계측 레코드를 "종류:이름"별로 집계"""
+    summary: Dict[str, Dict[str, Any]] = {}
+    
+    for record in records:
+        key = f"{record.get('kind')}:{record.get('name')}"
+        entry = summary.setdefault(key, {
+            "count": 0,
+            "errors": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_hits": 0
+        })
+        
+        duration = record.get("duration_ms", 0.0)
+        entry["count"] += 1
+        entry["errors"] += 1 if record.get("error") else 0
+        entry["cache_hits"] += 1 if record.get("cache_hit") else 0
+        entry["total_ms"] = round(entry["total_ms"] + duration, 3)
+        entry["max_ms"] = max(entry["max_ms"], duration)
+        
+        for field in ("bytes_in", "bytes_out", "input_tokens", "output_tokens"):
+            entry[field] += record.get(field, 0) or 0
+    
+    for entry in summary.values():
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 3)
+    
+    return summary
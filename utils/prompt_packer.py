@@ -0,0 +1,181 @@
+"""
+프롬프트 데이터 패킹 모듈
+
+수집 데이터 항목들을 토큰 예산 안에 담을 때 어떤 항목을 얼마나 넣을지 결정합니다.
+
+- 불필요한 서식(HTML 태그, 반복 기호, 연속 공백) 제거
+- 중복/유사 항목 제거 (단어 집합 유사도 기준)
+- 신호(score)가 높은 항목 우선, 이미 선택된 그룹(출처, 브랜드, 가격대 등)은 감점하여 다양성 확보
+- 항목별 최대 토큰 수와 남은 예산에 맞춰 본문을 잘라 넣고, 예산을 절대 넘기지 않음
+
+항목 형식:
+    {"text": 본문, "prefix": 앞 표시, "suffix": 뒤 정보, "score": 신호 점수,
+     "groups": 다양성 그룹 목록, "section": 섹션 이름}
+"""
+
+import html
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from .helpers import clean_text
+from .token_counter import count_tokens, count_message_tokens, truncate_end, prompt_budget
+
+
+# 잘린 본문 표시
+ELLIPSIS = "…"
+
+
+def compact_text(text: Any) -> str:
+    """HTML 태그/엔티티, 반복 기호, 연속 공백 제거"""
+    text = html.unescape(re.sub(r"<[^>]+>", "", str(text or "")))
+    text = re.sub(r"([^\w\s])\1+", r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _word_set(text: str) -> Set[str]:
+    """유사도 비교용 단어 집합"""
+    return set(clean_text(text).lower().split())
+
+
+def _is_duplicate(words: Set[str], selected: List[Dict[str, Any]], threshold: float) -> bool:
+    """이미 선택된 항목과 단어 집합이 거의 같은지 (Jaccard 유사도)"""
+    if not words:
+        return False
+    
+    for item in selected:
+        other = item["words"]
+        if other and len(words & other) / len(words | other) >= threshold:
+            return True
+    return False
+
+
+def _fit_line(item: Dict[str, Any], max_tokens: int, min_tokens: int, model: Any) -> Optional[str]:
+    """예산에 맞춰 한 줄 구성 (본문만 자르며, 최소 본문 길이도 넣을 수 없으면 None)"""
+    prefix = item.get("prefix", "")
+    suffix = item.get("suffix", "")
+    line = f"{prefix}{item['text']}{suffix}"
+    if count_tokens(line, model) <= max_tokens:
+        return line
+    
+    body_budget = max_tokens - count_tokens(f"{prefix}{ELLIPSIS}{suffix}", model)
+    if body_budget < min_tokens:
+        return None
+    
+    line = f"{prefix}{truncate_end(item['text'], body_budget, model).rstrip()}{ELLIPSIS}{suffix}"
+    return line if count_tokens(line, model) <= max_tokens else None
+
+
+def pack_items(
+    items: List[Dict[str, Any]],
+    budget: int,
+    model: Any = None,
+    max_item_tokens: int = 150,
+    min_item_tokens: int = 8,
+    diversity_penalty: float = 0.5,
+    similarity_threshold: float = 0.8
+) -> List[Dict[str, Any]]:
+    """토큰 예산 안에서 항목 선택 (선택 순서대로 "line"이 추가된 항목 반환)
+    
+    Args:
+        items: 후보 항목 목록
+        budget: 전체 토큰 예산 (줄바꿈 포함)
+        model: 토큰 계산 기준 모델
+        max_item_tokens: 항목 하나에 쓸 수 있는 최대 토큰 수 (항목별 "max_tokens"로 덮어쓰기 가능)
+        min_item_tokens: 본문을 잘라 넣을 때 최소 토큰 수
+        diversity_penalty: 같은 그룹 항목이 이미 선택된 횟수당 감점 비율
+        similarity_threshold: 중복으로 보는 단어 집합 유사도
+    """
+    candidates = []
+    for item in items:
+        text = compact_text(item.get("text"))
+        if text:
+            candidates.append({**item, "text": text, "words": _word_set(text)})
+    
+    selected: List[Dict[str, Any]] = []
+    group_counts: Counter = Counter()
+    used = 0
+    
+    def effective_score(candidate: Dict[str, Any]) -> float:
+        repeats = sum(group_counts[group] for group in candidate.get("groups", ()))
+        return candidate.get("score", 1.0) / (1 + diversity_penalty * repeats)
+    
+    while candidates and budget - used > min_item_tokens:
+        best = max(candidates, key=effective_score)
+        candidates.remove(best)
+        
+        if _is_duplicate(best["words"], selected, similarity_threshold):
+            continue
+        
+        # 줄바꿈 토큰 1개를 남겨두고 항목 한도와 남은 예산 중 작은 값에 맞춤
+        line = _fit_line(best, min(best.get("max_tokens", max_item_tokens), budget - used - 1), min_item_tokens, model)
+        if line is None:
+            continue
+        
+        selected.append({**best, "line": line})
+        group_counts.update(best.get("groups", ()))
+        used += count_tokens(line, model) + 1
+    
+    return selected
+
+
+def pack_sections(
+    sections: List[Tuple[str, List[Dict[str, Any]]]],
+    budget: int,
+    model: Any = None,
+    **kwargs
+) -> str:
+    """여러 섹션의 항목을 하나의 예산으로 선택하여 "제목 (선택/전체건)" 형식으로 구성
+    
+    섹션 간에도 점수와 다양성으로 경쟁하므로 신호가 많은 출처가 더 많은 자리를 차지합니다.
+    """
+    sections = [(title, items) for title, items in sections if items]
+    if not sections:
+        return ""
+    
+    # 섹션 제목과 구분 줄 몫을 먼저 확보
+    header_tokens = sum(count_tokens(f"{title} (전체 {len(items)}건 중 {len(items)}건):", model) + 3 for title, items in sections)
+    pooled = [
+        {**item, "section": title, "groups": [f"section:{title}", *item.get("groups", ())]}
+        for title, items in sections
+        for item in items
+    ]
+    selected = pack_items(pooled, max(0, budget - header_tokens), model, **kwargs)
+    
+    parts = []
+    for title, items in sections:
+        lines = [item["line"] for item in selected if item["section"] == title]
+        if lines:
+            parts.append(f"{title} (전체 {len(items)}건 중 {len(lines)}건):\n" + "\n".join(lines))
+    
+    return "\n\n".join(parts)
+
+
+def signal_score(value: Any, max_value: Any, floor: float = 0.5) -> float:
+    """좋아요 수 등 신호 값을 로그 스케일로 floor~1.0 점수로 변환"""
+    try:
+        value, max_value = float(value or 0), float(max_value or 0)
+    except (TypeError, ValueError):
+        return floor
+    
+    if max_value <= 0:
+        return floor
+    return floor + (1 - floor) * math.log1p(max(0.0, value)) / math.log1p(max_value)
+
+
+def data_token_budget(
+    system_prompt: str,
+    empty_user_prompt: str,
+    model: Any,
+    max_output_tokens: int,
+    max_prompt_tokens: Optional[int] = None,
+    limit: Optional[int] = None
+) -> int:
+    """프롬프트 템플릿(데이터 제외)과 응답 몫을 뺀 데이터용 토큰 수"""
+    available = prompt_budget(model, max_output_tokens, max_prompt_tokens) - count_message_tokens(
+        [system_prompt, empty_user_prompt], model
+    )
+    if limit:
+        available = min(available, limit)
+    return max(0, available)
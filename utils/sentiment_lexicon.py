@@ -0,0 +1,160 @@
+"""
+한국어 패션 도메인 감성 사전 모듈
+
+감성 사전(어간 → 가중치)으로 텍스트별 감성 점수를 LLM 없이 계산합니다.
+
+- 모든 사전 어간을 하나의 정규식으로 묶어 텍스트마다 한 번만 훑고, 점수는 numpy로 일괄 집계
+- 부정 표현("안 예뻐요", "좋지 않아요", "불만 없어요")은 극성을 뒤집고,
+  강조/완화 표현("너무", "정말", "조금")은 가중치를 조정
+- 신뢰도는 감성 표현의 양과 긍정/부정 일치도로 계산하며, 감성 표현이 없는 텍스트는
+  짧을수록(상품명 등) 중립일 가능성이 높다고 봄
+
+점수 형식:
+    {"score": -1.0 ~ 1.0, "label": "positive"/"neutral"/"negative", "confidence": 0.0 ~ 1.0,
+     "positive_terms": 긍정 어간 목록, "negative_terms": 부정 어간 목록}
+"""
+
+import hashlib
+import json
+import re
+from typing import Dict, List, Any, Sequence, Tuple
+
+import numpy as np
+
+
+# 긍정 어간 → 가중치
+POSITIVE_TERMS = {
+    "예쁘": 1.0, "예뻐": 1.0, "예쁜": 1.0, "이쁘": 1.0, "이뻐": 1.0, "이쁜": 1.0,
+    "좋": 0.8, "만족": 1.0, "추천": 0.8, "최고": 1.2, "완벽": 1.2, "훌륭": 1.0, "대박": 1.0,
+    "편하": 0.8, "편해": 0.8, "편한": 0.8, "편안": 0.8, "부드럽": 0.7, "부드러": 0.7,
+    "고급스": 1.0, "세련": 0.8, "깔끔": 0.7, "멋지": 1.0, "멋있": 1.0, "귀엽": 0.8, "귀여": 0.8,
+    "시원": 0.6, "따뜻": 0.6, "튼튼": 0.7, "탄탄": 0.7, "가성비": 0.6, "정사이즈": 0.5,
+    "잘 맞": 0.8, "딱 맞": 0.8, "마음에 들": 1.0, "맘에 들": 1.0, "재구매": 1.0, "인생템": 1.2,
+    "사랑": 0.8, "감사": 0.5, "배송 빠": 0.6,
+}
+
+# 부정 어간 → 가중치
+NEGATIVE_TERMS = {
+    "별로": 1.0, "불만": 1.0, "불만족": 1.0, "실망": 1.2, "최악": 1.5, "후회": 1.2, "비추": 1.2,
+    "아쉽": 0.7, "아쉬": 0.7, "짜증": 1.2, "싫": 1.0, "나쁘": 1.0, "나빠": 1.0, "엉망": 1.2,
+    "불편": 1.0, "답답": 0.7, "까슬": 0.7, "따가": 0.7, "촌스": 1.0, "싸구려": 1.2, "저렴해 보": 1.0,
+    "비싸": 0.6, "비싼": 0.6, "비쌈": 0.6, "비침": 0.7, "비쳐": 0.7, "얇아": 0.5,
+    "보풀": 1.0, "늘어나": 0.8, "늘어남": 0.8, "구김": 0.6, "구겨": 0.6, "물빠짐": 1.0, "물 빠": 1.0,
+    "이염": 1.0, "냄새": 0.8, "실밥": 0.7, "찢어": 1.0, "뜯어": 0.8, "불량": 1.2, "하자": 1.0,
+    "환불": 1.0, "반품": 0.8, "지연": 0.7, "배송 늦": 0.7,
+}
+
+# 어간 앞의 부정어 ("안 예뻐요", "못 입겠어요") - 독립된 단어일 때만
+PREFIX_NEGATION = re.compile(r"(?:^|\s)(안|못)\s*$")
+
+# 어간 뒤의 부정 표현 ("좋지 않아요", "예쁘지는 않", "불만 없어요")
+SUFFIX_NEGATION = re.compile(r"^[가-힣]{0,3}?\s*(?:지\s*[는도]?\s*(?:않|못|말)|진\s*않)|^\s*[이은는도가]?\s*없")
+
+# 어간 앞의 강조/완화 표현
+INTENSIFIERS = re.compile(r"(너무|정말|진짜|매우|완전|엄청|아주|무척|진심|넘)\s*$")
+DOWNTONERS = re.compile(r"(조금|약간|살짝|좀|덜)\s*$")
+
+# 부정/강조 표현을 찾을 때 어간 앞뒤로 보는 글자 수
+PREFIX_WINDOW = 8
+SUFFIX_WINDOW = 8
+
+NEGATION_WEIGHT = 0.8
+INTENSIFIER_WEIGHT = 1.5
+DOWNTONER_WEIGHT = 0.5
+
+# 점수 = (긍정 - 부정) / (긍정 + 부정 + SMOOTHING) - 감성 표현이 하나뿐이면 ±0.5 안팎
+SMOOTHING = 1.0
+
+# 감성 표현이 없는 텍스트의 중립 신뢰도 = NEUTRAL_LENGTH / (NEUTRAL_LENGTH + 글자 수)
+NEUTRAL_LENGTH = 40.0
+
+# 라벨 기준 점수
+LABEL_THRESHOLD = 0.2
+
+# 긴 어간부터 시도하여 "불만족"이 "불만"으로, "비추천"이 "추천"으로 잘못 잡히지 않게 함
+_TERM_WEIGHTS = {**POSITIVE_TERMS, **{term: -weight for term, weight in NEGATIVE_TERMS.items()}}
+_TERM_PATTERN = re.compile("|".join(re.escape(term) for term in sorted(_TERM_WEIGHTS, key=len, reverse=True)))
+
+# 감성 사전 버전 (사전, 부정/강조 규칙, 점수 상수가 바뀌면 달라지며 채점 결과 캐시 키에 포함)
+LEXICON_VERSION = hashlib.sha256(json.dumps(
+    [
+        _TERM_WEIGHTS,
+        [PREFIX_NEGATION.pattern, SUFFIX_NEGATION.pattern, INTENSIFIERS.pattern, DOWNTONERS.pattern],
+        [PREFIX_WINDOW, SUFFIX_WINDOW, NEGATION_WEIGHT, INTENSIFIER_WEIGHT, DOWNTONER_WEIGHT, SMOOTHING, NEUTRAL_LENGTH, LABEL_THRESHOLD]
+    ],
+    ensure_ascii=False,
+    sort_keys=True
+).encode("utf-8")).hexdigest()[:12]
+
+
+def label_for(score: float) -> str:
+    """감성 점수를 라벨로 변환"""
+    if score > LABEL_THRESHOLD:
+        return "positive"
+    if score < -LABEL_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def _match_weight(text: str, start: int, end: int, term: str) -> Tuple[float, bool]:
+    """어간 하나의 (부호 있는 가중치, 부정 여부) - 주변의 부정/강조/완화 표현 반영"""
+    weight = _TERM_WEIGHTS[term]
+    before = text[max(0, start - PREFIX_WINDOW):start]
+    
+    negated = False
+    negation = PREFIX_NEGATION.search(before)
+    if negation:
+        negated = True
+        before = before[:negation.start()]
+    elif SUFFIX_NEGATION.match(text[end:end + SUFFIX_WINDOW]):
+        negated = True
+    
+    if INTENSIFIERS.search(before):
+        weight *= INTENSIFIER_WEIGHT
+    elif DOWNTONERS.search(before):
+        weight *= DOWNTONER_WEIGHT
+    
+    if negated:
+        weight *= -NEGATION_WEIGHT
+    return weight, negated
+
+
+def score_texts(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """텍스트별 감성 점수 (입력 순서 유지)"""
+    count = len(texts)
+    index: List[int] = []
+    weights: List[float] = []
+    terms: List[Tuple[List[str], List[str]]] = [([], []) for _ in range(count)]
+    
+    for i, text in enumerate(texts):
+        for match in _TERM_PATTERN.finditer(text):
+            weight, negated = _match_weight(text, match.start(), match.end(), match.group())
+            index.append(i)
+            weights.append(weight)
+            
+            # 부정되지 않은 어간만 키워드로 기록 ("보풀", "비침" 등 개선 포인트 집계용)
+            if not negated:
+                terms[i][0 if weight > 0 else 1].append(match.group())
+    
+    # 텍스트별 긍정/부정 가중치 합을 한 번에 집계
+    index_array = np.asarray(index, dtype=np.int64)
+    weight_array = np.asarray(weights, dtype=float)
+    positive = np.bincount(index_array, weights=np.clip(weight_array, 0.0, None), minlength=count)
+    negative = np.bincount(index_array, weights=np.clip(-weight_array, 0.0, None), minlength=count)
+    
+    mass = positive + negative
+    scores = (positive - negative) / (mass + SMOOTHING)
+    agreement = np.divide(np.abs(positive - negative), mass, out=np.zeros(count), where=mass > 0)
+    lengths = np.fromiter((len(text) for text in texts), dtype=float, count=count)
+    confidence = np.where(mass > 0, (1.0 - np.exp(-mass)) * agreement, NEUTRAL_LENGTH / (NEUTRAL_LENGTH + lengths))
+    
+    return [
+        {
+            "score": round(float(scores[i]), 3),
+            "label": label_for(scores[i]),
+            "confidence": round(float(confidence[i]), 3),
+            "positive_terms": terms[i][0],
+            "negative_terms": terms[i][1]
+        }
+        for i in range(count)
+    ]
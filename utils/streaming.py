@@ -0,0 +1,39 @@
+"""
+LLM 토큰 스트리밍 모듈
+
+워크플로우를 stream_tokens=True로 실행하면 노드가 LLM 응답 토큰을 생성되는 즉시
+LangGraph custom 스트림으로 전달하고, FashionWorkflow.astream은 이를
+(TOKEN_EVENT, {"node", "section", "text"}) 이벤트로 내보냅니다.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from langgraph.config import get_stream_writer
+
+
+# FashionWorkflow.astream이 토큰 이벤트에 사용하는 이름 (노드 이름과 겹치지 않음)
+TOKEN_EVENT = "__token__"
+
+
+def token_writer(state: Dict[str, Any], node: str, section: Optional[str] = None) -> Optional[Callable[[str], None]]:
+    """토큰을 스트림으로 전달하는 콜백 (스트리밍을 요청하지 않았거나 그래프 밖이면 None)"""
+    if not state.get("stream_tokens"):
+        return None
+    
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # 그래프 실행 컨텍스트 밖에서 노드를 직접 호출한 경우
+        return None
+    
+    def emit(text: str):
+        if text:
+            writer({"node": node, "section": section, "text": text})
+    
+    return emit
+
+
+def stream_kwargs(state: Dict[str, Any], node: str, section: Optional[str] = None) -> Dict[str, Any]:
+    """LLM 호출에 전달할 스트리밍 인자 (스트리밍하지 않으면 빈 dict)"""
+    on_token = token_writer(state, node, section)
+    return {"on_token": on_token} if on_token else {}
@@ -0,0 +1,199 @@
+"""
+토큰 계산 모듈
+
+tiktoken 토크나이저로 프롬프트/응답의 토큰 수를 계산합니다.
+같은 메시지(시스템 프롬프트 등 반복되는 앞부분)는 캐시된 결과를 재사용하며,
+토크나이저를 사용할 수 없는 환경에서는 문자 종류별 근사치를 사용합니다.
+
+LLM 호출 전 예산 검사(fit_messages_to_budget)에도 사용되어
+컨텍스트 윈도우나 프롬프트 토큰 상한을 넘는 요청은 줄이거나 거부합니다.
+"""
+
+import math
+from functools import lru_cache
+from typing import List, Any, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+# 모델별 컨텍스트 윈도우 (접두사 기준, 긴 접두사 우선)
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# 채팅 메시지 형식에 따른 추가 토큰 (메시지별, 응답 시작)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# 프롬프트를 줄일 때 생략 부분에 넣는 표시
+TRUNCATION_MARKER = "\n...(중략)...\n"
+
+
+class TokenBudgetExceeded(ValueError):
+    """프롬프트가 토큰 예산을 넘어 줄일 수 없음"""
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: Optional[str]):
+    """모델에 맞는 tiktoken 인코딩 (사용할 수 없으면 None)"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"토크나이저 로드 오류 (근사치 사용): {e}")
+        return None
+    
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # 인코딩 파일을 내려받을 수 없는 오프라인 환경 등
+        print(f"토크나이저 로드 오류 (근사치 사용): {e}")
+        return None
+
+
+def _model_key(model: Any) -> Optional[str]:
+    """모델명 정규화 (문자열이 아니면 기본 인코딩 사용)"""
+    return model if isinstance(model, str) else None
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수 근사 (영문/숫자 약 4자당 1토큰, 한글 등은 1자당 약 1토큰)"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def _count(text: str, model: Optional[str]) -> int:
+    """텍스트 토큰 수 (토크나이저가 없으면 근사치)"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=4096)
+def _count_cached(text: str, model: Optional[str]) -> int:
+    """텍스트 토큰 수 (같은 텍스트는 캐시 재사용)"""
+    return _count(text, model)
+
+
+def count_tokens(text: Any, model: Any = None) -> int:
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    return _count_cached(str(text), _model_key(model))
+
+
+def count_message_tokens(messages: List[Any], model: Any = None) -> int:
+    """채팅 메시지 목록의 입력 토큰 수 (메시지 형식 토큰 포함)"""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(getattr(message, "content", message), model)
+    return total
+
+
+def get_context_window(model: Any) -> int:
+    """모델 컨텍스트 윈도우 크기"""
+    if isinstance(model, str):
+        for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def truncate_middle(text: str, max_tokens: int, model: Any = None) -> str:
+    """앞뒤를 남기고 가운데를 생략하여 max_tokens 이하로 축소 (지시문은 보통 앞뒤에 위치)"""
+    model = _model_key(model)
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    
+    # 남길 글자 수를 이진 탐색 (후보 문자열은 한 번만 쓰이므로 캐시하지 않음)
+    low, high = 0, len(text)
+    while low < high:
+        keep = (low + high + 1) // 2
+        head = keep // 2
+        candidate = text[:head] + TRUNCATION_MARKER + text[len(text) - (keep - head):]
+        if _count(candidate, model) <= max_tokens:
+            low = keep
+        else:
+            high = keep - 1
+    
+    head = low // 2
+    return text[:head] + TRUNCATION_MARKER + text[len(text) - (low - head):]
+
+
+def truncate_end(text: str, max_tokens: int, model: Any = None) -> str:
+    """앞부분만 남겨 max_tokens 이하로 축소"""
+    model = _model_key(model)
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max(0, max_tokens)])
+    
+    # 토크나이저가 없으면 남길 글자 수를 이진 탐색
+    low, high = 0, len(text)
+    while low < high:
+        keep = (low + high + 1) // 2
+        if _count(text[:keep], model) <= max_tokens:
+            low = keep
+        else:
+            high = keep - 1
+    return text[:low]
+
+
+def prompt_budget(model: Any, max_output_tokens: int, max_prompt_tokens: Optional[int] = None) -> int:
+    """요청에 사용할 수 있는 입력 토큰 수 (컨텍스트 윈도우에서 출력 몫을 뺀 값과 상한 중 작은 값)"""
+    budget = get_context_window(model) - max_output_tokens
+    if max_prompt_tokens:
+        budget = min(budget, max_prompt_tokens)
+    return budget
+
+
+def fit_messages_to_budget(
+    messages: List[Any],
+    model: Any,
+    max_output_tokens: int,
+    max_prompt_tokens: Optional[int] = None
+) -> Tuple[List[Any], int]:
+    """예산을 넘는 요청의 마지막 사용자 메시지를 줄여서 반환 (줄여도 넘으면 TokenBudgetExceeded)
+    
+    Returns:
+        (메시지 목록, 입력 토큰 수)
+    """
+    budget = prompt_budget(model, max_output_tokens, max_prompt_tokens)
+    total = count_message_tokens(messages, model)
+    if total <= budget:
+        return messages, total
+    
+    # 데이터가 들어가는 마지막 사용자 메시지만 줄이고 시스템 프롬프트는 유지
+    index = next(
+        (i for i in range(len(messages) - 1, -1, -1) if getattr(messages[i], "type", None) == "human"),
+        None
+    )
+    if index is None:
+        raise TokenBudgetExceeded(f"프롬프트 토큰 수({total})가 예산({budget})을 초과합니다.")
+    
+    content = str(messages[index].content)
+    allowed = budget - (total - count_tokens(content, model))
+    if allowed <= count_tokens(TRUNCATION_MARKER, model):
+        raise TokenBudgetExceeded(f"프롬프트 토큰 수({total})가 예산({budget})을 초과합니다.")
+    
+    fitted = list(messages)
+    fitted[index] = messages[index].model_copy(update={"content": truncate_middle(content, allowed, model)})
+    return fitted, count_message_tokens(fitted, model)